@@ -13,7 +13,7 @@ import {
 import { formatCurrency } from "../../utils";
 
 type MonthlyPoint = {
-  month: string;
+  period: string;
   income?: number;
   expenses?: number;
 };
@@ -28,7 +28,7 @@ const IncomeExpensesChart: React.FC<IncomeExpensesChartProps> = ({
   const theme = useTheme();
 
   const data = userMonthly.slice(-6).map((m) => ({
-    month: new Date(`${m.month}-01`).toLocaleString("en-US", {
+    month: new Date(`${m.period}-01`).toLocaleString("en-US", {
       month: "short",
     }),
     income: m.income ?? 0,
@@ -39,6 +39,10 @@ interface RecentTransactionsTableProps {
   onAddClick?: () => void;
   onEditTransaction?: (transaction: Transaction) => void;
   onDeleteTransaction?: (transaction: Transaction) => void;
+  /** More transactions exist on the server than are loaded; search and filters only see loaded rows. */
+  hasMore?: boolean;
+  loadingMore?: boolean;
+  onLoadMore?: () => void;
   width?: string | number;
 }
 
@@ -96,6 +100,9 @@ const RecentTransactionsTable: React.FC<RecentTransactionsTableProps> = ({
   onAddClick,
   onEditTransaction,
   onDeleteTransaction,
+  hasMore = false,
+  loadingMore = false,
+  onLoadMore,
   width = "75%",
 }) => {
   const [menuAnchor, setMenuAnchor] = useState<null | HTMLElement>(null);
@@ -391,6 +398,18 @@ const RecentTransactionsTable: React.FC<RecentTransactionsTableProps> = ({
         })}
       </Box>
 
+      {hasMore && onLoadMore ? (
+        <Box sx={{ display: "flex", justifyContent: "center", py: 1.5 }}>
+          <Button
+            onClick={onLoadMore}
+            disabled={loadingMore}
+            sx={{ textTransform: "none" }}
+          >
+            {loadingMore ? "Loading..." : "Load more transactions"}
+          </Button>
+        </Box>
+      ) : null}
+
       <Menu
         anchorEl={menuAnchor}
         open={Boolean(menuAnchor)}
@@ -12,7 +12,7 @@ type UserSummary = {
 };
 
 type MonthlyPoint = {
-  month: string;
+  period: string;
   income?: number;
   expenses?: number;
 };
@@ -55,7 +55,13 @@ const Dashboard: React.FC = () => {
   const [editCategory, setEditCategory] = useState("");
   const [editDescription, setEditDescription] = useState("");
 
-  const { transactions = [], refetch: refetchTransactions } = useTransactions(walletId);
+  const {
+    transactions = [],
+    loading: transactionsLoading,
+    hasMore: hasMoreTransactions,
+    loadMore: loadMoreTransactions,
+    refetch: refetchTransactions,
+  } = useTransactions(walletId);
 
   const { userSummary, userMonthly, categories, refetch: refetchStatistics } = useStatistics(
     walletId || null,
@@ -131,7 +137,7 @@ const Dashboard: React.FC = () => {
   };
 
   const monthWithYear = `${new Date().getFullYear()}-${String(new Date().getMonth() + 1).padStart(2, "0")}`;
-  const currentMonthData = userMonthly.find((m) => m.month === monthWithYear);
+  const currentMonthData = userMonthly.find((m) => m.period === monthWithYear);
 
   const handleAddTransaction = async (payload: {
     amount: number;
@@ -282,6 +288,9 @@ const Dashboard: React.FC = () => {
               onCategoryFilterChange={setCategoryFilter}
               onEditTransaction={openEditTransaction}
               onDeleteTransaction={handleDeleteTransaction}
+              hasMore={hasMoreTransactions}
+              loadingMore={transactionsLoading}
+              onLoadMore={loadMoreTransactions}
               onAddClick={() => {
                 setAddTxError(null);
                 setAddTxOpen(true);
@@ -50,7 +50,7 @@ function TransactionTable({ walletId }: { walletId: string }) {
     sort_by: "date",
     order: "desc",
   });
-  const { transactions, loading, error } = useTransactions(walletId, filters);
+  const { transactions, loading, error, hasMore, loadMore } = useTransactions(walletId, filters);
 
   return (
     <Box>
@@ -125,9 +125,9 @@ function TransactionTable({ walletId }: { walletId: string }) {
         </FormControl>
       </Box>
 
-      {loading && <CircularProgress size={24} />}
+      {loading && transactions.length === 0 && <CircularProgress size={24} />}
       {error && <Alert severity="error">{error}</Alert>}
-      {!loading && !error && (
+      {!error && (!loading || transactions.length > 0) && (
         <Table size="small">
           <TableHead>
             <TableRow>
@@ -163,6 +163,13 @@ function TransactionTable({ walletId }: { walletId: string }) {
           </TableBody>
         </Table>
       )}
+      {!error && hasMore && (
+        <Box sx={{ display: "flex", justifyContent: "center", mt: 1 }}>
+          <Button onClick={loadMore} disabled={loading}>
+            {loading ? "Loading..." : "Load more"}
+          </Button>
+        </Box>
+      )}
     </Box>
   );
 }
@@ -92,7 +92,7 @@ const SummarySection: React.FC<{
           <ResponsiveContainer width="100%" height={200}>
             <BarChart data={monthlyData}>
               <CartesianGrid strokeDasharray="3 3" />
-              <XAxis dataKey="month" />
+              <XAxis dataKey="period" />
               <YAxis tickFormatter={(v) => formatCurrency(v)} width={80} />
               <Tooltip formatter={(v: number) => formatCurrency(v)} />
               <Bar dataKey="total" fill="#1976d2" radius={[4, 4, 0, 0]} />
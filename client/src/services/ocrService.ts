@@ -18,17 +18,51 @@ export interface OCRResult {
   error?: string;
 }
 
+export interface OCRPreprocessing {
+  bytes_before: number;
+  bytes_after: number;
+  applied: boolean;
+  duration_ms: number;
+  width?: number;
+  height?: number;
+  error?: string;
+}
+
 export interface OCRJob {
   id: string;
   user_id: string;
   image_path: string;
+  batch_id: string | null;
   status: 'pending' | 'processing' | 'completed' | 'failed';
   raw_text: string | null;
   extracted_data: ParsedReceiptData | null;
+  error: string | null;
+  preprocessing: OCRPreprocessing | null;
   created_at: string;
+  started_at: string | null;
   completed_at: string | null;
+  queue_position?: number;
 }
 
+export interface OCRBatch {
+  id: string;
+  created_at: string;
+  status: 'processing' | 'completed' | 'completed_with_errors' | 'failed';
+  total: number;
+  counts: Record<OCRJob['status'], number>;
+  jobs?: OCRJob[];
+}
+
+export interface OCRBatchUpload {
+  batch: OCRBatch;
+  jobs: { id: string; status: OCRJob['status']; filename: string }[];
+}
+
+const JOB_POLL_INTERVAL_MS = 1000;
+const JOB_POLL_TIMEOUT_MS = 120000;
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
 export interface ConfirmReceiptRequest {
   wallet_id: string;
   amount: number;
@@ -43,15 +77,29 @@ export interface ConfirmReceiptRequest {
 }
 
 export const ocrApi = {
-  process: async (file: File): Promise<{ job: OCRJob }> => {
+  process: async (file: File): Promise<{ job: OCRJob; cached: boolean }> => {
     const form = new FormData();
     form.append('file', file);
-    const { data } = await apiClient.post<{ job: OCRJob }>('/ocr/process', form, {
+    const { data } = await apiClient.post<{ job: OCRJob; cached: boolean }>('/ocr/process', form, {
       headers: { 'Content-Type': 'multipart/form-data' },
     });
     return data;
   },
 
+  processBatch: async (files: File[]): Promise<OCRBatchUpload> => {
+    const form = new FormData();
+    files.forEach((file) => form.append('files', file));
+    const { data } = await apiClient.post<OCRBatchUpload>('/ocr/batch', form, {
+      headers: { 'Content-Type': 'multipart/form-data' },
+    });
+    return data;
+  },
+
+  getBatch: async (id: string): Promise<OCRBatch> => {
+    const { data } = await apiClient.get<{ batch: OCRBatch }>(`/ocr/batches/${id}`);
+    return data.batch;
+  },
+
   getJobs: async (): Promise<OCRJob[]> => {
     const { data } = await apiClient.get<{ jobs: OCRJob[] }>('/ocr/jobs');
     return data.jobs;
@@ -62,6 +110,17 @@ export const ocrApi = {
     return data.job;
   },
 
+  waitForJob: async (id: string): Promise<OCRJob> => {
+    const deadline = Date.now() + JOB_POLL_TIMEOUT_MS;
+    let job = await ocrApi.getJob(id);
+    while (job.status === 'pending' || job.status === 'processing') {
+      if (Date.now() > deadline) throw new Error('OCR processing timed out');
+      await sleep(JOB_POLL_INTERVAL_MS);
+      job = await ocrApi.getJob(id);
+    }
+    return job;
+  },
+
   deleteJob: async (id: string): Promise<void> => {
     await apiClient.delete(`/ocr/jobs/${id}`);
   },
@@ -94,9 +153,15 @@ export function useOCR() {
     try {
       const result = await ocrApi.process(file);
       setJob(result.job);
-      return result.job;
+      const finished = await ocrApi.waitForJob(result.job.id);
+      setJob(finished);
+      if (finished.status === 'failed') {
+        setError(finished.error ?? 'OCR processing failed');
+        return null;
+      }
+      return finished;
     } catch (e: any) {
-      setError(e.response?.data?.error ?? 'OCR processing failed');
+      setError(e.response?.data?.error ?? e.message ?? 'OCR processing failed');
       return null;
     } finally {
       setLoading(false);
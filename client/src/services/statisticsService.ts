@@ -1,15 +1,31 @@
 import { useState, useEffect, useCallback, useRef } from "react";
 import { apiClient } from "./apiClient";
+import type { Transaction } from "./walletService";
 
 export interface Summary {
   total: number;
   income: number;
   expenses: number;
   transaction_count: number;
+  min_amount: number | null;
+  max_amount: number | null;
+  average_amount: number | null;
+}
+
+export type Granularity = "day" | "week" | "month" | "year";
+
+/** Inclusive ISO dates (YYYY-MM-DD) and the bucket size of the series. */
+export interface StatisticsRange {
+  from?: string;
+  to?: string;
+  granularity?: Granularity;
 }
 
 export interface MonthlyData {
-  month: string;
+  /** Bucket label: YYYY-MM-DD for days and weeks, YYYY-MM for months, YYYY for years. */
+  period: string;
+  /** Same as period; only present for monthly buckets. */
+  month?: string;
   total: number;
   expenses: number;
   income: number;
@@ -20,47 +36,73 @@ export interface CategoryData {
   total: number;
 }
 
+export interface WalletDashboard {
+  summary: Summary;
+  monthly: MonthlyData[];
+  categories: CategoryData[];
+  recent_transactions: Transaction[];
+}
+
 export const statisticsApi = {
-  getSummary: async (walletId: string): Promise<Summary> => {
+  getDashboard: async (
+    walletId: string,
+    range?: StatisticsRange,
+    recent?: number,
+  ): Promise<WalletDashboard> => {
+    const { data } = await apiClient.get<WalletDashboard>(
+      `/statistics/${walletId}/dashboard`,
+      { params: { ...range, recent } },
+    );
+    return data;
+  },
+
+  getSummary: async (walletId: string, range?: StatisticsRange): Promise<Summary> => {
     const { data } = await apiClient.get<Summary>(
       `/statistics/${walletId}/summary`,
+      { params: range },
     );
     return data;
   },
 
-  getMonthly: async (walletId: string): Promise<MonthlyData[]> => {
+  getMonthly: async (walletId: string, range?: StatisticsRange): Promise<MonthlyData[]> => {
     const { data } = await apiClient.get<{ monthly: MonthlyData[] }>(
       `/statistics/${walletId}/monthly`,
+      { params: range },
     );
     return data.monthly;
   },
 
-  getCategories: async (walletId: string): Promise<CategoryData[]> => {
+  getCategories: async (walletId: string, range?: StatisticsRange): Promise<CategoryData[]> => {
     const { data } = await apiClient.get<{ categories: CategoryData[] }>(
       `/statistics/${walletId}/categories`,
+      { params: range },
     );
     return data.categories;
   },
 
-  getUserSummary: async (): Promise<Summary> => {
-    const { data } = await apiClient.get<Summary>("/statistics/summary");
+  getUserSummary: async (range?: StatisticsRange): Promise<Summary> => {
+    const { data } = await apiClient.get<Summary>("/statistics/summary", {
+      params: range,
+    });
     return data;
   },
 
-  getUserMonthly: async (): Promise<MonthlyData[]> => {
+  getUserMonthly: async (range?: StatisticsRange): Promise<MonthlyData[]> => {
     const { data } = await apiClient.get<{ monthly: MonthlyData[] }>(
       "/statistics/monthly",
+      { params: range },
     );
     return data.monthly;
   },
 };
 
-export function useStatistics(walletId: string | null) {
+export function useStatistics(walletId: string | null, range?: StatisticsRange) {
   const [summary, setSummary] = useState<Summary | null>(null);
   const [monthly, setMonthly] = useState<MonthlyData[]>([]);
   const [userSummary, setUserSummary] = useState<Summary | null>(null);
   const [userMonthly, setUserMonthly] = useState<MonthlyData[]>([]);
   const [categories, setCategories] = useState<CategoryData[]>([]);
+  const [recentTransactions, setRecentTransactions] = useState<Transaction[]>([]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const requestCounterRef = useRef(0);
@@ -72,29 +114,22 @@ export function useStatistics(walletId: string | null) {
     setLoading(true);
     setError(null);
     try {
-      const walletRequests = walletId
-        ? [
-            statisticsApi.getSummary(walletId),
-            statisticsApi.getMonthly(walletId),
-            statisticsApi.getCategories(walletId),
-          ]
-        : [null, [], []];
-
-      const [s, m, c, us, um] = await Promise.all([
-        ...walletRequests,
-        statisticsApi.getUserSummary(),
-        statisticsApi.getUserMonthly(),
+      const [dashboard, us, um] = await Promise.all([
+        walletId ? statisticsApi.getDashboard(walletId, range) : Promise.resolve(null),
+        statisticsApi.getUserSummary(range),
+        statisticsApi.getUserMonthly(range),
       ]);
 
       if (requestId !== requestCounterRef.current) {
         return;
       }
 
-      setSummary(s as Summary | null);
-      setMonthly(m as MonthlyData[]);
-      setCategories(c as CategoryData[]);
-      setUserSummary(us as Summary | null);
-      setUserMonthly(um as MonthlyData[]);
+      setSummary(dashboard?.summary ?? null);
+      setMonthly(dashboard?.monthly ?? []);
+      setCategories(dashboard?.categories ?? []);
+      setRecentTransactions(dashboard?.recent_transactions ?? []);
+      setUserSummary(us);
+      setUserMonthly(um);
     } catch (e: any) {
       if (requestId !== requestCounterRef.current) {
         return;
@@ -105,7 +140,7 @@ export function useStatistics(walletId: string | null) {
         setLoading(false);
       }
     }
-  }, [walletId]);
+  }, [walletId, range?.from, range?.to, range?.granularity]);
 
   useEffect(() => {
     fetch();
@@ -117,6 +152,7 @@ export function useStatistics(walletId: string | null) {
     userSummary,
     userMonthly,
     categories,
+    recentTransactions,
     loading,
     error,
     refetch: fetch,
@@ -53,7 +53,7 @@ export interface Transaction {
   description: string | null;
   merchant_name: string | null;
   original_image_url: string | null;
-  ocr_raw_text: string | null;
+  ocr_raw_text?: string | null;
   created_by: string;
   created_at: string;
 }
@@ -64,10 +64,33 @@ export interface TransactionFilters {
   date_to?: string;
   min_amount?: number;
   max_amount?: number;
-  sort_by?: 'date' | 'amount' | 'category';
+  sort_by?: 'date' | 'amount' | 'category' | 'created_at';
   order?: 'asc' | 'desc';
+  limit?: number;
+  cursor?: string;
+  fields?: string;
 }
 
+export interface TransactionPage {
+  transactions: Transaction[];
+  next_cursor: string | null;
+}
+
+// Everything the list views render; leaves out the potentially large OCR text.
+export const TRANSACTION_LIST_FIELDS = [
+  'id',
+  'wallet_id',
+  'amount',
+  'currency',
+  'category',
+  'date',
+  'description',
+  'merchant_name',
+  'original_image_url',
+  'created_by',
+  'created_at',
+].join(',');
+
 export interface CreateTransactionRequest {
   amount: number;
   currency?: string;
@@ -79,6 +102,27 @@ export interface CreateTransactionRequest {
   ocr_raw_text?: string;
 }
 
+export interface TransactionImportResult {
+  imported: number;
+  failed: number;
+  // The first rows that were skipped; `line` is the line in the uploaded file.
+  errors: { line: number; error: string }[];
+  method: 'copy' | 'insert';
+}
+
+export type TransactionBatchOperation =
+  | { op: 'create'; data: CreateTransactionRequest }
+  | { op: 'update'; id: string; data: Partial<CreateTransactionRequest> }
+  | { op: 'delete'; id: string };
+
+export interface TransactionBatchResult {
+  status: number;
+  id?: string;
+  transaction?: Transaction;
+  deleted?: boolean;
+  error?: string;
+}
+
 export const walletApi = {
   getWallets: async (): Promise<Wallet[]> => {
     const { data } = await apiClient.get<{ wallets: Wallet[] }>('/wallets');
@@ -120,11 +164,17 @@ export const walletApi = {
   getInvitations: async (
     status: 'pending' | 'accepted' | 'declined' | 'all' = 'pending'
   ): Promise<WalletInvitation[]> => {
-    const { data } = await apiClient.get<{ invitations: WalletInvitation[] }>(
-      '/wallets/invitations',
-      { params: { status } }
-    );
-    return data.invitations;
+    const invitations: WalletInvitation[] = [];
+    let cursor: string | undefined;
+    do {
+      const { data } = await apiClient.get<{ invitations: WalletInvitation[]; next_cursor: string | null }>(
+        '/wallets/invitations',
+        { params: { status, cursor } }
+      );
+      invitations.push(...data.invitations);
+      cursor = data.next_cursor ?? undefined;
+    } while (cursor);
+    return invitations;
   },
 
   acceptInvitation: async (invitationId: string): Promise<void> => {
@@ -135,12 +185,12 @@ export const walletApi = {
     await apiClient.post(`/wallets/invitations/${invitationId}/decline`);
   },
 
-  getTransactions: async (walletId: string, filters?: TransactionFilters): Promise<Transaction[]> => {
-    const { data } = await apiClient.get<{ transactions: Transaction[] }>(
+  getTransactions: async (walletId: string, filters?: TransactionFilters): Promise<TransactionPage> => {
+    const { data } = await apiClient.get<TransactionPage>(
       `/wallets/${walletId}/transactions`,
       { params: filters }
     );
-    return data.transactions;
+    return data;
   },
 
   createTransaction: async (walletId: string, payload: CreateTransactionRequest): Promise<Transaction> => {
@@ -151,6 +201,30 @@ export const walletApi = {
     return data.transaction;
   },
 
+  // Applies the operations with one commit; results[i] reports operations[i].
+  batchTransactions: async (
+    walletId: string,
+    operations: TransactionBatchOperation[]
+  ): Promise<TransactionBatchResult[]> => {
+    const { data } = await apiClient.post<{ results: TransactionBatchResult[] }>(
+      `/wallets/${walletId}/transactions/batch`,
+      { operations }
+    );
+    return data.results;
+  },
+
+  // Bulk-imports a CSV or NDJSON bank export (.csv, .ndjson or .jsonl).
+  importTransactions: async (walletId: string, file: File): Promise<TransactionImportResult> => {
+    const form = new FormData();
+    form.append('file', file);
+    const { data } = await apiClient.post<TransactionImportResult>(
+      `/wallets/${walletId}/transactions/import`,
+      form,
+      { headers: { 'Content-Type': 'multipart/form-data' } }
+    );
+    return data;
+  },
+
   updateTransaction: async (
     walletId: string,
     transactionId: string,
@@ -191,12 +265,14 @@ export function useWallets() {
 
 export function useTransactions(walletId: string, filters?: TransactionFilters) {
   const [transactions, setTransactions] = useState<Transaction[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
-  const fetch = useCallback(async () => {
+  const loadPage = useCallback(async (cursor?: string) => {
     if (!walletId) {
       setTransactions([]);
+      setNextCursor(null);
       setLoading(false);
       setError(null);
       return;
@@ -204,7 +280,13 @@ export function useTransactions(walletId: string, filters?: TransactionFilters)
 
     try {
       setLoading(true);
-      setTransactions(await walletApi.getTransactions(walletId, filters));
+      const page = await walletApi.getTransactions(walletId, {
+        fields: TRANSACTION_LIST_FIELDS,
+        ...filters,
+        cursor,
+      });
+      setTransactions((prev) => (cursor ? [...prev, ...page.transactions] : page.transactions));
+      setNextCursor(page.next_cursor);
     } catch (e: any) {
       setError(e.response?.data?.error ?? 'Failed to load transactions');
     } finally {
@@ -212,9 +294,22 @@ export function useTransactions(walletId: string, filters?: TransactionFilters)
     }
   }, [walletId, JSON.stringify(filters)]);
 
+  const fetch = useCallback(() => loadPage(), [loadPage]);
+
+  const loadMore = useCallback(async () => {
+    if (nextCursor) await loadPage(nextCursor);
+  }, [loadPage, nextCursor]);
+
   useEffect(() => { fetch(); }, [fetch]);
 
-  return { transactions, loading, error, refetch: fetch };
+  return {
+    transactions,
+    loading,
+    error,
+    refetch: fetch,
+    hasMore: nextCursor !== null,
+    loadMore,
+  };
 }
 
 export function useWalletInvitations(
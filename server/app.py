@@ -1,12 +1,31 @@
 import os
-from flask import Flask
+from flask import Flask, Request, current_app
 from flask_cors import CORS
-from sqlalchemy import text
+from sqlalchemy import event
 from config import Config
 from extensions import db, migrate, jwt
 
+
+# Endpoints allowed a larger body than MAX_CONTENT_LENGTH, and the config key of their limit.
+BODY_LIMITS = {
+    'ocr.process_batch': 'OCR_BATCH_MAX_BYTES',
+    'transactions.import_transactions': 'TRANSACTION_IMPORT_MAX_BYTES',
+}
+
+
+class UploadLimitRequest(Request):
+    """Allows the bulk upload endpoints a larger body than MAX_CONTENT_LENGTH."""
+
+    @property
+    def max_content_length(self):
+        if current_app and self.endpoint in BODY_LIMITS:
+            return current_app.config[BODY_LIMITS[self.endpoint]]
+        return super().max_content_length
+
+
 def create_app():
     app = Flask(__name__, static_folder='../client/build/static')
+    app.request_class = UploadLimitRequest
     app.config.from_object(Config)
 
     CORS(app, origins=app.config['CORS_ORIGINS'], supports_credentials=True)
@@ -33,21 +52,44 @@ def create_app():
     app.register_blueprint(profile_bp)
     app.register_blueprint(spa_bp)
 
+    from ocr.jobs import worker_command
+    from ocr.parser_eval import ocr_cli
+    from services.rollups import rollups_cli
+
+    ocr_cli.add_command(worker_command)
+    app.cli.add_command(rollups_cli)
+    app.cli.add_command(ocr_cli)
+
+    # The schema is managed by the Flask-Migrate revisions in migrations/;
+    # run `flask db upgrade` before serving.
     with app.app_context():
-        db.create_all()
-        _run_column_migrations()
+        if db.engine.dialect.driver == 'psycopg2':
+            event.listen(db.engine, 'connect', _read_uuids_as_text)
+
+    from ocr.jobs import init_worker_pool
+    from ocr.parse_cache import parse_cache
+    from services.wallet_access import access_cache
+
+    parse_cache.configure(app)
+    access_cache.configure(app)
+    init_worker_pool(app)
 
     return app
 
 
-def _run_column_migrations():
-    """Add columns introduced after initial deploy (safe to run repeatedly)."""
-    migrations = [
-        "ALTER TABLE users ADD COLUMN IF NOT EXISTS profile_image_url VARCHAR(255)",
-    ]
-    with db.engine.connect() as conn:
-        for stmt in migrations:
-            conn.execute(text(stmt))
-        conn.commit()
+def _read_uuids_as_text(dbapi_connection, connection_record):
+    """Return uuid columns as strings instead of uuid.UUID objects.
+
+    Ids are strings everywhere in the app (models.UUIDString), but SQLAlchemy
+    registers psycopg2's UUID caster, so every id was parsed into a UUID and
+    formatted back. Replacing the caster skips both steps.
+    """
+    import psycopg2.extensions
+
+    uuid_type = psycopg2.extensions.new_type((2950,), 'UUID', lambda value, cursor: value)
+    uuid_array = psycopg2.extensions.new_array_type((2951,), 'UUID[]', uuid_type)
+    psycopg2.extensions.register_type(uuid_type, dbapi_connection)
+    psycopg2.extensions.register_type(uuid_array, dbapi_connection)
+
 
 app = create_app()
\ No newline at end of file
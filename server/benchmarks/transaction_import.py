@@ -0,0 +1,122 @@
+"""Measure bulk transaction import throughput against one-request-per-row.
+
+Generates a synthetic bank export, then loads it into a scratch wallet with
+TransactionImporter using COPY and using batched multi-row INSERTs, from both
+CSV and NDJSON. Each run is rolled back. For comparison a sample of the same
+rows is posted one by one to POST /api/wallets/<id>/transactions. The
+benchmark user and wallet are deleted afterwards. The database must be
+migrated with `flask db upgrade`.
+
+    cd server && python -m benchmarks.transaction_import --rows 100000
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault('OCR_WORKER_THREADS', '0')
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+from app import create_app  # noqa: E402
+from extensions import db  # noqa: E402
+from models import Transaction, User, Wallet, WalletMonthlyRollup  # noqa: E402
+from services.transaction_import import TransactionImporter, read_records  # noqa: E402
+
+CATEGORIES = ('Food', 'Transport', 'Bills', 'Fun', 'Health', 'Shopping', 'Salary', 'Other')
+FIELDS = ('amount', 'category', 'date', 'currency', 'description', 'merchant_name')
+
+
+def generate_rows(count):
+    rng = random.Random(7)
+    start = datetime(2022, 1, 1)
+    for i in range(count):
+        yield {
+            'amount': f'{rng.uniform(-150000, 50000):.2f}',
+            'category': rng.choice(CATEGORIES),
+            'date': (start + timedelta(minutes=i * 7)).isoformat(),
+            'currency': 'HUF',
+            'description': f'Card payment {i}, ref "{rng.randrange(10**8)}"',
+            'merchant_name': f'Merchant {rng.randrange(500)}',
+        }
+
+
+def to_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=FIELDS)
+    writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def to_ndjson(rows):
+    return ''.join(json.dumps(row) + '\n' for row in rows).encode()
+
+
+def time_import(wallet_id, user_id, body, fmt, use_copy):
+    started = time.perf_counter()
+    summary = TransactionImporter(wallet_id, user_id, use_copy=use_copy).run(read_records(io.BytesIO(body), fmt))
+    db.session.flush()
+    elapsed = time.perf_counter() - started
+    db.session.rollback()
+    return elapsed, summary
+
+
+def run(rows, sample):
+    app = create_app()
+    data = list(generate_rows(rows))
+    bodies = {'csv': to_csv(data), 'ndjson': to_ndjson(data)}
+
+    with app.app_context():
+        user = User(email=f'import-bench-{time.time_ns()}@example.com', name='Import Bench')
+        user.set_password('benchmark')
+        db.session.add(user)
+        db.session.flush()
+        wallet = Wallet(name='Import bench', type='personal', owner_id=user.id)
+        db.session.add(wallet)
+        db.session.commit()
+        user_id, wallet_id = user.id, wallet.id
+        token = create_access_token(identity=user_id)
+
+        try:
+            results = []
+            for fmt, use_copy in (('csv', True), ('ndjson', True), ('csv', False), ('ndjson', False)):
+                elapsed, summary = time_import(wallet_id, user_id, bodies[fmt], fmt, use_copy)
+                assert summary['imported'] == rows, summary
+                results.append((f"{fmt} via {summary['method']}", rows, elapsed))
+
+            client = app.test_client()
+            headers = {'Authorization': f'Bearer {token}'}
+            started = time.perf_counter()
+            for row in data[:sample]:
+                resp = client.post(f'/api/wallets/{wallet_id}/transactions', json=row, headers=headers)
+                assert resp.status_code == 201, resp.get_json()
+            results.append(('one POST per row', sample, time.perf_counter() - started))
+        finally:
+            db.session.rollback()
+            Transaction.query.filter_by(wallet_id=wallet_id).delete()
+            WalletMonthlyRollup.query.filter_by(wallet_id=wallet_id).delete()
+            Wallet.query.filter_by(id=wallet_id).delete()
+            User.query.filter_by(id=user_id).delete()
+            db.session.commit()
+
+    print(f"\n{'path':<20}{'rows':>10}{'seconds':>10}{'rows/s':>12}")
+    for label, count, elapsed in results:
+        print(f'{label:<20}{count:>10,}{elapsed:>10.2f}{count / elapsed:>12,.0f}')
+    print(f"\nCSV body {len(bodies['csv']) / 1024 / 1024:.1f} MB, NDJSON body {len(bodies['ndjson']) / 1024 / 1024:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--sample', type=int, default=1000, help='Rows posted one by one for the baseline.')
+    args = parser.parse_args()
+    run(args.rows, args.sample)
+
+
+if __name__ == '__main__':
+    main()
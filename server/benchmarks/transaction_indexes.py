@@ -0,0 +1,157 @@
+"""Compare transaction query plans with and without the access-pattern indexes.
+
+Seeds a synthetic dataset into the configured database inside a single
+transaction, runs EXPLAIN ANALYZE for the listing and statistics query
+shapes without the indexes and then with them, and rolls everything back.
+Point DATABASE_URL at a scratch database migrated with `flask db upgrade`:
+the run takes table locks.
+
+    cd server && python -m benchmarks.transaction_indexes --rows 1000000
+"""
+import argparse
+import os
+import re
+
+os.environ.setdefault('OCR_WORKER_THREADS', '0')
+
+from sqlalchemy import text  # noqa: E402
+
+from app import create_app  # noqa: E402
+from extensions import db  # noqa: E402
+from models import Transaction  # noqa: E402
+
+CATEGORIES = ('Food', 'Transport', 'Bills', 'Fun', 'Health', 'Shopping', 'Salary', 'Other')
+
+# Seeded users and wallets get recognizable ids: the prefix plus their number.
+USER_ID_PREFIX = '00000000-0000-7000-8000-1'
+WALLET_ID_PREFIX = '00000000-0000-7000-8000-2'
+
+# Query shapes issued by routes/transactions.py and services/aggregates.py.
+QUERIES = {
+    'list first page (date desc)': """
+        SELECT id, amount, category, date FROM transactions
+        WHERE wallet_id = :wallet
+        ORDER BY date DESC, id DESC LIMIT 101
+    """,
+    'list keyset page (date desc)': """
+        SELECT id, amount, category, date FROM transactions
+        WHERE wallet_id = :wallet AND (date, id) < (:boundary_date, :boundary_id)
+        ORDER BY date DESC, id DESC LIMIT 101
+    """,
+    'list by category': """
+        SELECT id, amount, category, date FROM transactions
+        WHERE wallet_id = :wallet AND category = 'Food'
+        ORDER BY date DESC, id DESC LIMIT 101
+    """,
+    'list sorted by amount': """
+        SELECT id, amount, category, date FROM transactions
+        WHERE wallet_id = :wallet
+        ORDER BY amount DESC, id DESC LIMIT 101
+    """,
+    'wallet summary': """
+        SELECT sum(amount), sum(CASE WHEN amount > 0 THEN amount ELSE 0 END),
+               sum(CASE WHEN amount < 0 THEN amount ELSE 0 END), count(id),
+               min(amount), max(amount), avg(amount)
+        FROM transactions WHERE wallet_id = :wallet
+    """,
+    'user summary in date range': """
+        SELECT sum(amount), count(id) FROM transactions
+        WHERE created_by = :user AND date >= now() - interval '90 days'
+    """,
+}
+
+
+def seed(conn, rows, wallets, users):
+    conn.execute(text("""
+        INSERT INTO users (id, email, name, password_hash, created_at)
+        SELECT CAST(:user_prefix || lpad(u::text, 11, '0') AS uuid), 'bench' || u || '@example.com', 'Bench ' || u, 'x', now()
+        FROM generate_series(1, :users) AS u
+    """), {'users': users, 'user_prefix': USER_ID_PREFIX})
+    conn.execute(text("""
+        INSERT INTO wallets (id, name, type, owner_id, created_at)
+        SELECT CAST(:wallet_prefix || lpad(w::text, 11, '0') AS uuid), 'Bench ' || w, 'personal',
+               CAST(:user_prefix || lpad((1 + w % :users)::text, 11, '0') AS uuid), now()
+        FROM generate_series(1, :wallets) AS w
+    """), {'wallets': wallets, 'users': users, 'user_prefix': USER_ID_PREFIX, 'wallet_prefix': WALLET_ID_PREFIX})
+    conn.execute(text("""
+        INSERT INTO transactions (id, wallet_id, amount, currency, category, date, created_by, created_at)
+        SELECT gen_random_uuid(),
+               CAST(:wallet_prefix || lpad((1 + g % :wallets)::text, 11, '0') AS uuid),
+               round((random() * 200000 - 150000)::numeric, 2),
+               'HUF',
+               (:categories)[1 + g % cardinality(:categories)],
+               now() - random() * interval '3 years',
+               CAST(:user_prefix || lpad((1 + (g % :wallets) % :users)::text, 11, '0') AS uuid),
+               now()
+        FROM generate_series(1, :rows) AS g
+    """), {
+        'rows': rows,
+        'wallets': wallets,
+        'users': users,
+        'categories': list(CATEGORIES),
+        'user_prefix': USER_ID_PREFIX,
+        'wallet_prefix': WALLET_ID_PREFIX,
+    })
+
+
+def explain_all(conn, params):
+    results = {}
+    for label, sql in QUERIES.items():
+        plan = conn.execute(text(f'EXPLAIN (ANALYZE, BUFFERS) {sql}'), params).scalars().all()
+        match = re.search(r'Execution Time: ([\d.]+) ms', plan[-1])
+        results[label] = (plan[0].strip(), float(match.group(1)) if match else None, plan)
+    return results
+
+
+def run(rows, wallets, users, verbose):
+    app = create_app()
+    indexes = sorted(Transaction.__table__.indexes, key=lambda index: index.name)
+    with app.app_context(), db.engine.connect() as conn:
+        trans = conn.begin()
+        try:
+            for index in indexes:
+                index.drop(conn, checkfirst=True)
+            print(f'Seeding {rows:,} transactions across {wallets} wallets...')
+            seed(conn, rows, wallets, users)
+            conn.execute(text('ANALYZE transactions'))
+
+            boundary = conn.execute(text("""
+                SELECT date, id FROM transactions WHERE wallet_id = :wallet
+                ORDER BY date DESC, id DESC OFFSET 100 LIMIT 1
+            """), {'wallet': f'{WALLET_ID_PREFIX}{1:011d}'}).one()
+            params = {
+                'wallet': f'{WALLET_ID_PREFIX}{1:011d}',
+                'user': f'{USER_ID_PREFIX}{1:011d}',
+                'boundary_date': boundary.date,
+                'boundary_id': boundary.id,
+            }
+
+            before = explain_all(conn, params)
+            for index in indexes:
+                index.create(conn)
+            conn.execute(text('ANALYZE transactions'))
+            after = explain_all(conn, params)
+        finally:
+            trans.rollback()
+
+    for label in QUERIES:
+        (plan_before, ms_before, full_before), (plan_after, ms_after, full_after) = before[label], after[label]
+        print(f'\n{label}')
+        print(f'  before: {ms_before:>10.2f} ms  {plan_before}')
+        print(f'  after:  {ms_after:>10.2f} ms  {plan_after}')
+        if verbose:
+            print('\n'.join(['  -- before'] + full_before + ['  -- after'] + full_after))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--wallets', type=int, default=200)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--verbose', action='store_true', help='Print the full plans.')
+    args = parser.parse_args()
+    run(args.rows, args.wallets, args.users, args.verbose)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""Compare VARCHAR(36) and native uuid keys: insert throughput and index size.
+
+Creates scratch copies of the transactions table shape in the configured
+database inside a single transaction, one per key variant:
+
+  * varchar_v4 -- the old layout, random UUIDv4 strings in VARCHAR(36)
+  * uuid_v4    -- native uuid, still random
+  * uuid_v7    -- native uuid with time-ordered UUIDv7 ids (the new default)
+
+Each variant gets the same rows in the same batches, then the script reports
+rows per second and the size of the table, its primary key and its
+(wallet_id, date, id) index. Everything is rolled back at the end.
+
+    cd server && python -m benchmarks.uuid_keys --rows 1000000
+"""
+import argparse
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+os.environ.setdefault('OCR_WORKER_THREADS', '0')
+
+from sqlalchemy import text  # noqa: E402
+
+from app import create_app  # noqa: E402
+from extensions import db  # noqa: E402
+from models import generate_uuid  # noqa: E402
+
+VARIANTS = {
+    'varchar_v4': ('VARCHAR(36)', lambda: str(uuid.uuid4())),
+    'uuid_v4': ('UUID', lambda: str(uuid.uuid4())),
+    'uuid_v7': ('UUID', generate_uuid),
+}
+
+
+def create_table(conn, name, key_type):
+    conn.execute(text(f"""
+        CREATE TABLE {name} (
+            id {key_type} PRIMARY KEY,
+            wallet_id {key_type} NOT NULL,
+            created_by {key_type} NOT NULL,
+            amount NUMERIC(12, 2) NOT NULL,
+            date TIMESTAMP NOT NULL
+        )
+    """))
+    conn.execute(text(f'CREATE INDEX {name}_wallet_date ON {name} (wallet_id, date DESC, id DESC)'))
+
+
+def insert_rows(conn, name, key_type, new_id, rows, batch_size, wallets, users):
+    keys = 'uuid[]' if key_type == 'UUID' else 'text[]'
+    insert = text(f"""
+        INSERT INTO {name} (id, wallet_id, created_by, amount, date)
+        SELECT * FROM unnest(
+            CAST(:ids AS {keys}), CAST(:wallets AS {keys}), CAST(:users AS {keys}),
+            CAST(:amounts AS numeric[]), CAST(:dates AS timestamp[])
+        ) AS r(id, wallet_id, created_by, amount, date)
+    """)
+    rng = random.Random(42)
+    started = datetime.utcnow()
+    elapsed = 0.0
+    for offset in range(0, rows, batch_size):
+        count = min(batch_size, rows - offset)
+        wallet_index = [rng.randrange(len(wallets)) for _ in range(count)]
+        params = {
+            'wallets': [wallets[i] for i in wallet_index],
+            'users': [users[i % len(users)] for i in wallet_index],
+            'amounts': [round(rng.uniform(-150000, 50000), 2) for _ in range(count)],
+            'dates': [started + timedelta(seconds=offset + i) for i in range(count)],
+        }
+        # Id generation is part of what an application insert pays for.
+        batch_started = time.perf_counter()
+        params['ids'] = [new_id() for _ in range(count)]
+        conn.execute(insert, params)
+        elapsed += time.perf_counter() - batch_started
+    return elapsed
+
+
+def sizes(conn, name):
+    return conn.execute(text("""
+        SELECT pg_relation_size(CAST(:table AS regclass)),
+               pg_relation_size(CAST(:pkey AS regclass)),
+               pg_relation_size(CAST(:secondary AS regclass))
+    """), {'table': name, 'pkey': f'{name}_pkey', 'secondary': f'{name}_wallet_date'}).one()
+
+
+def run(rows, batch_size, wallets, users):
+    app = create_app()
+    wallet_ids = [generate_uuid() for _ in range(wallets)]
+    user_ids = [generate_uuid() for _ in range(users)]
+    results = {}
+    with app.app_context(), db.engine.connect() as conn:
+        trans = conn.begin()
+        try:
+            for name, (key_type, new_id) in VARIANTS.items():
+                create_table(conn, name, key_type)
+                print(f'Inserting {rows:,} rows into {name}...')
+                elapsed = insert_rows(conn, name, key_type, new_id, rows, batch_size, wallet_ids, user_ids)
+                results[name] = (elapsed, *sizes(conn, name))
+        finally:
+            trans.rollback()
+
+    print(f"\n{'variant':<12}{'rows/s':>12}{'table':>12}{'pkey':>12}{'wallet_date':>14}")
+    for name, (elapsed, table_bytes, pkey_bytes, secondary_bytes) in results.items():
+        print(
+            f'{name:<12}{rows / elapsed:>12,.0f}{_mb(table_bytes):>12}'
+            f'{_mb(pkey_bytes):>12}{_mb(secondary_bytes):>14}'
+        )
+
+
+def _mb(size):
+    return f'{size / 1024 / 1024:.1f} MB'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--wallets', type=int, default=200)
+    parser.add_argument('--users', type=int, default=50)
+    args = parser.parse_args()
+    run(args.rows, args.batch_size, args.wallets, args.users)
+
+
+if __name__ == '__main__':
+    main()
@@ -16,6 +16,41 @@ class Config:
     UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', '/tmp/uploads')
     MAX_CONTENT_LENGTH = 5 * 1024 * 1024  # 5 MB — enforced by Flask itself
 
+    # Background OCR workers per process, started by its first request; 0 disables
+    # them (jobs stay queued for `flask ocr worker`).
+    OCR_WORKER_THREADS = int(os.getenv('OCR_WORKER_THREADS', 2))
+    OCR_JOB_POLL_INTERVAL = float(os.getenv('OCR_JOB_POLL_INTERVAL', 2))
+    OCR_JOB_STALE_AFTER = int(os.getenv('OCR_JOB_STALE_AFTER', 300))
+    OCR_JOB_MAX_ATTEMPTS = int(os.getenv('OCR_JOB_MAX_ATTEMPTS', 3))
+    # Jobs of one user processed at the same time, across all workers.
+    OCR_USER_MAX_CONCURRENT = int(os.getenv('OCR_USER_MAX_CONCURRENT', 2))
+    OCR_BATCH_MAX_FILES = int(os.getenv('OCR_BATCH_MAX_FILES', 50))
+    # Request size limit for POST /api/ocr/batch; every other request keeps MAX_CONTENT_LENGTH.
+    OCR_BATCH_MAX_BYTES = int(os.getenv('OCR_BATCH_MAX_BYTES', 100 * 1024 * 1024))
+    # Longest image side sent to the OCR providers; 0 sends uploads untouched.
+    OCR_IMAGE_MAX_SIDE = int(os.getenv('OCR_IMAGE_MAX_SIDE', 2000))
+    OCR_PREPROCESS_THREADS = int(os.getenv('OCR_PREPROCESS_THREADS', 2))
+    # Re-uploads of an identical file reuse a completed job this recent; 0 disables.
+    OCR_DEDUP_MAX_AGE_HOURS = int(os.getenv('OCR_DEDUP_MAX_AGE_HOURS', 168))
+    # LLM parse results cached by normalized OCR text; 0 entries disables the cache.
+    OCR_PARSE_CACHE_SIZE = int(os.getenv('OCR_PARSE_CACHE_SIZE', 1000))
+    OCR_PARSE_CACHE_TTL = int(os.getenv('OCR_PARSE_CACHE_TTL', 7 * 24 * 3600))
+    OCR_PARSE_CACHE_PERSIST = os.getenv('OCR_PARSE_CACHE_PERSIST', 'true').lower() == 'true'
+
+    # Shared secret for GET /api/ocr/metrics (X-Metrics-Token header); unset disables it.
+    OCR_METRICS_TOKEN = os.getenv('OCR_METRICS_TOKEN')
+
+    # Request size limit for POST /api/wallets/<id>/transactions/import.
+    TRANSACTION_IMPORT_MAX_BYTES = int(os.getenv('TRANSACTION_IMPORT_MAX_BYTES', 50 * 1024 * 1024))
+    TRANSACTION_BATCH_MAX_OPERATIONS = int(os.getenv('TRANSACTION_BATCH_MAX_OPERATIONS', 500))
+
+    # Longest statistics series, in buckets of the requested granularity.
+    STATISTICS_MAX_BUCKETS = int(os.getenv('STATISTICS_MAX_BUCKETS', 2000))
+
+    # Granted wallet roles cached per process; membership changes elsewhere show up within the TTL.
+    WALLET_ACCESS_CACHE_SIZE = int(os.getenv('WALLET_ACCESS_CACHE_SIZE', 10000))
+    WALLET_ACCESS_CACHE_TTL = float(os.getenv('WALLET_ACCESS_CACHE_TTL', 10))
+
     GROQ_API_KEY = os.getenv('GROQ_API_KEY')
     OCR_API_KEY = os.getenv('OCR_API_KEY')
     AZURE_VISION_KEY = os.getenv('AZURE_VISION_KEY')
@@ -0,0 +1,50 @@
+"""transaction access indexes
+
+Revision ID: 2065a17657fe
+Revises: b2ee60d531c8
+Create Date: 2026-10-18 11:40:56.699619
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2065a17657fe'
+down_revision = 'b2ee60d531c8'
+branch_labels = None
+depends_on = None
+
+# IF NOT EXISTS keeps the revision safe on databases that were created with
+# db.create_all() after these indexes were added to the models.
+INDEXES = (
+    ('ix_transactions_wallet_date', [sa.text('wallet_id'), sa.text('date DESC'), sa.text('id DESC')]),
+    ('ix_transactions_created_by_date', ['created_by', 'date']),
+    ('ix_transactions_wallet_category', ['wallet_id', 'category']),
+    ('ix_transactions_wallet_amount', ['wallet_id', 'amount', 'id']),
+)
+
+
+def upgrade():
+    # CONCURRENTLY keeps the table writable while large indexes build, but it
+    # cannot run inside the migration transaction.
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(
+                name,
+                'transactions',
+                columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name='transactions',
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
@@ -0,0 +1,37 @@
+"""invitation inbox index
+
+Revision ID: 382c511ca61d
+Revises: decebf6cb05d
+Create Date: 2026-10-18 12:00:24.623068
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '382c511ca61d'
+down_revision = 'decebf6cb05d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_wallet_invitations_invitee_created',
+            'wallet_invitations',
+            ['invited_user_id', 'created_at', 'id'],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_wallet_invitations_invitee_created',
+            table_name='wallet_invitations',
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
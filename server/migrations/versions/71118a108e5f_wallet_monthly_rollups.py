@@ -0,0 +1,53 @@
+"""wallet monthly rollups
+
+Revision ID: 71118a108e5f
+Revises: a4f0d8877736
+Create Date: 2026-10-18 12:39:37.394412
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '71118a108e5f'
+down_revision = 'a4f0d8877736'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'wallet_monthly_rollups',
+        sa.Column('wallet_id', sa.Uuid(), sa.ForeignKey('wallets.id'), primary_key=True),
+        sa.Column('month', sa.Date(), primary_key=True),
+        sa.Column('category', sa.String(50), primary_key=True),
+        sa.Column('currency', sa.String(10), primary_key=True),
+        sa.Column('created_by', sa.Uuid(), sa.ForeignKey('users.id'), primary_key=True),
+        sa.Column('total', sa.Numeric(14, 2), nullable=False),
+        sa.Column('income', sa.Numeric(14, 2), nullable=False),
+        sa.Column('expenses', sa.Numeric(14, 2), nullable=False),
+        sa.Column('transaction_count', sa.Integer(), nullable=False),
+    )
+    # Same aggregation as services.rollups.rebuild(), so existing wallets
+    # have their statistics as soon as the table exists.
+    op.execute("""
+        INSERT INTO wallet_monthly_rollups
+            (wallet_id, month, category, currency, created_by,
+             total, income, expenses, transaction_count)
+        SELECT wallet_id,
+               CAST(date_trunc('month', date) AS date),
+               category,
+               coalesce(currency, ''),
+               created_by,
+               sum(amount),
+               sum(CASE WHEN amount > 0 THEN amount ELSE 0 END),
+               sum(CASE WHEN amount < 0 THEN amount ELSE 0 END),
+               count(id)
+        FROM transactions
+        GROUP BY 1, 2, 3, 4, 5
+    """)
+
+
+def downgrade():
+    op.drop_table('wallet_monthly_rollups')
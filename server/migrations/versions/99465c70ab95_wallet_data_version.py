@@ -0,0 +1,28 @@
+"""wallet data version
+
+Revision ID: 99465c70ab95
+Revises: 382c511ca61d
+Create Date: 2026-10-18 12:39:39.664021
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '99465c70ab95'
+down_revision = '382c511ca61d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A constant default makes this a catalog-only change, without a rewrite.
+    op.add_column(
+        'wallets',
+        sa.Column('data_version', sa.BigInteger(), nullable=False, server_default='0'),
+    )
+
+
+def downgrade():
+    op.drop_column('wallets', 'data_version')
@@ -0,0 +1,31 @@
+"""ocr job payloads
+
+Revision ID: 9d132c430172
+Revises: 99465c70ab95
+Create Date: 2026-10-18 15:02:11.408215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d132c430172'
+down_revision = '99465c70ab95'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Jobs queued before this revision keep their file in UPLOAD_FOLDER; the
+    # workers still read it from there when a job has no payload.
+    op.create_table(
+        'ocr_job_payload_chunks',
+        sa.Column('job_id', sa.Uuid(), sa.ForeignKey('ocr_jobs.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('seq', sa.Integer(), primary_key=True),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table('ocr_job_payload_chunks')
@@ -0,0 +1,80 @@
+"""native uuid keys
+
+Revision ID: a4f0d8877736
+Revises: 2065a17657fe
+Create Date: 2026-10-18 11:46:38.217214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4f0d8877736'
+down_revision = '2065a17657fe'
+branch_labels = None
+depends_on = None
+
+# Every id and foreign key column of the baseline schema. Tables added by
+# later revisions are created with uuid keys; columns that are already uuid
+# are skipped.
+UUID_COLUMNS = {
+    'users': ['id'],
+    'wallets': ['id', 'owner_id'],
+    'wallet_members': ['wallet_id', 'user_id'],
+    'wallet_invitations': ['id', 'wallet_id', 'invited_user_id', 'invited_by_user_id'],
+    'transactions': ['id', 'wallet_id', 'created_by'],
+    'ocr_jobs': ['id', 'user_id'],
+}
+
+
+def _convert(target_type, cast, already_converted):
+    """Change the key columns' type, dropping the foreign keys around it.
+
+    PostgreSQL refuses to change one side of a foreign key at a time, so the
+    constraints are dropped, every column is rewritten, and the constraints
+    are recreated unchanged. Each ALTER rewrites its table and rebuilds its
+    indexes under an ACCESS EXCLUSIVE lock, so run this in a quiet period.
+    """
+    inspector = sa.inspect(op.get_bind())
+    pending = {}
+    for table, columns in UUID_COLUMNS.items():
+        if not inspector.has_table(table):
+            continue
+        types = {column['name']: column['type'] for column in inspector.get_columns(table)}
+        todo = [name for name in columns if name in types and not already_converted(types[name])]
+        if todo:
+            pending[table] = todo
+    if not pending:
+        return
+
+    foreign_keys = [
+        (table, fk)
+        for table in UUID_COLUMNS
+        if inspector.has_table(table)
+        for fk in inspector.get_foreign_keys(table)
+    ]
+    for table, fk in foreign_keys:
+        op.drop_constraint(fk['name'], table, type_='foreignkey')
+
+    for table, columns in pending.items():
+        for name in columns:
+            op.alter_column(table, name, type_=target_type, postgresql_using=f'{name}::{cast}')
+
+    for table, fk in foreign_keys:
+        op.create_foreign_key(
+            fk['name'],
+            table,
+            fk['referred_table'],
+            fk['constrained_columns'],
+            fk['referred_columns'],
+            **fk.get('options', {}),
+        )
+
+
+def upgrade():
+    _convert(sa.Uuid(), 'uuid', lambda column_type: isinstance(column_type, sa.Uuid))
+
+
+def downgrade():
+    _convert(sa.String(36), 'text', lambda column_type: isinstance(column_type, sa.String))
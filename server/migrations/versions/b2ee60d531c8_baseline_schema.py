@@ -0,0 +1,105 @@
+"""baseline schema
+
+Revision ID: b2ee60d531c8
+Revises:
+Create Date: 2026-10-18 12:39:35.081949
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2ee60d531c8'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# The schema the app used to build with db.create_all(), VARCHAR(36) keys
+# included; the native uuid keys revision converts them later. Databases
+# created that way already have these tables, so every step is skipped when
+# its object exists.
+
+
+def _key(*args, **kwargs):
+    return sa.Column(*args[:1], sa.String(36), *args[1:], **kwargs)
+
+
+def upgrade():
+    op.create_table(
+        'users',
+        _key('id', primary_key=True),
+        sa.Column('email', sa.String(120), nullable=False, unique=True),
+        sa.Column('name', sa.String(100), nullable=False),
+        sa.Column('password_hash', sa.String(255), nullable=False),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+        if_not_exists=True,
+    )
+    # Added after the first deploy by the old startup column migrations.
+    op.add_column('users', sa.Column('profile_image_url', sa.String(255)), if_not_exists=True)
+
+    op.create_table(
+        'wallets',
+        _key('id', primary_key=True),
+        sa.Column('name', sa.String(100), nullable=False),
+        sa.Column('type', sa.String(20), nullable=False),
+        _key('owner_id', sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+        if_not_exists=True,
+    )
+    op.create_table(
+        'wallet_members',
+        _key('wallet_id', sa.ForeignKey('wallets.id'), primary_key=True),
+        _key('user_id', sa.ForeignKey('users.id'), primary_key=True),
+        sa.Column('joined_at', sa.DateTime()),
+        if_not_exists=True,
+    )
+    op.create_table(
+        'wallet_invitations',
+        _key('id', primary_key=True),
+        _key('wallet_id', sa.ForeignKey('wallets.id'), nullable=False),
+        _key('invited_user_id', sa.ForeignKey('users.id'), nullable=False),
+        _key('invited_by_user_id', sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('responded_at', sa.DateTime()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+        sa.UniqueConstraint('wallet_id', 'invited_user_id', name='uq_wallet_invitee'),
+        if_not_exists=True,
+    )
+    op.create_table(
+        'transactions',
+        _key('id', primary_key=True),
+        _key('wallet_id', sa.ForeignKey('wallets.id'), nullable=False),
+        sa.Column('amount', sa.Numeric(10, 2), nullable=False),
+        sa.Column('currency', sa.String(10)),
+        sa.Column('category', sa.String(50), nullable=False),
+        sa.Column('date', sa.DateTime(), nullable=False),
+        sa.Column('description', sa.String(255)),
+        sa.Column('merchant_name', sa.String(100)),
+        sa.Column('original_image_url', sa.String(255)),
+        sa.Column('ocr_raw_text', sa.Text()),
+        _key('created_by', sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+        if_not_exists=True,
+    )
+    op.create_table(
+        'ocr_jobs',
+        _key('id', primary_key=True),
+        _key('user_id', sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('image_path', sa.String(255), nullable=False),
+        sa.Column('status', sa.String(20)),
+        sa.Column('raw_text', sa.Text()),
+        sa.Column('extracted_data', sa.JSON()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('completed_at', sa.DateTime()),
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    for table in ('ocr_jobs', 'transactions', 'wallet_invitations', 'wallet_members', 'wallets', 'users'):
+        op.drop_table(table)
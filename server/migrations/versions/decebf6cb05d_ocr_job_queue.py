@@ -0,0 +1,63 @@
+"""ocr job queue
+
+Revision ID: decebf6cb05d
+Revises: 71118a108e5f
+Create Date: 2026-10-18 12:39:38.521186
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'decebf6cb05d'
+down_revision = '71118a108e5f'
+branch_labels = None
+depends_on = None
+
+# Columns the background worker pool, upload dedup and preprocessing added to
+# ocr_jobs, plus the batch upload and parse cache tables.
+JOB_COLUMNS = (
+    sa.Column('error', sa.Text()),
+    sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('started_at', sa.DateTime()),
+    sa.Column('content_hash', sa.String(64)),
+    sa.Column('preprocessing', sa.JSON()),
+)
+
+
+def upgrade():
+    op.create_table(
+        'ocr_batches',
+        sa.Column('id', sa.Uuid(), primary_key=True),
+        sa.Column('user_id', sa.Uuid(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('created_at', sa.DateTime()),
+    )
+    op.create_index('ix_ocr_batches_user_id', 'ocr_batches', ['user_id'])
+
+    for column in JOB_COLUMNS:
+        op.add_column('ocr_jobs', column)
+    op.add_column('ocr_jobs', sa.Column('batch_id', sa.Uuid(), sa.ForeignKey('ocr_batches.id')))
+    op.create_index('ix_ocr_jobs_status_created_at', 'ocr_jobs', ['status', 'created_at'])
+    op.create_index('ix_ocr_jobs_content_hash', 'ocr_jobs', ['content_hash'])
+    op.create_index('ix_ocr_jobs_batch_id', 'ocr_jobs', ['batch_id'])
+
+    op.create_table(
+        'ocr_parse_cache',
+        sa.Column('key', sa.String(64), primary_key=True),
+        sa.Column('model', sa.String(100), nullable=False),
+        sa.Column('data', sa.JSON(), nullable=False),
+        sa.Column('latency_ms', sa.Float()),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_ocr_parse_cache_created_at', 'ocr_parse_cache', ['created_at'])
+
+
+def downgrade():
+    op.drop_table('ocr_parse_cache')
+    for name in ('ix_ocr_jobs_batch_id', 'ix_ocr_jobs_content_hash', 'ix_ocr_jobs_status_created_at'):
+        op.drop_index(name, table_name='ocr_jobs')
+    op.drop_column('ocr_jobs', 'batch_id')
+    for column in reversed(JOB_COLUMNS):
+        op.drop_column('ocr_jobs', column.name)
+    op.drop_table('ocr_batches')
@@ -1,19 +1,75 @@
+import os
+import threading
+import time
+import uuid
 from datetime import datetime
-from uuid import uuid4
 
 from extensions import db
 from werkzeug.security import check_password_hash, generate_password_hash
 
+NIL_UUID = "00000000-0000-0000-0000-000000000000"
+
+
+_uuid_lock = threading.Lock()
+_last_uuid_counter = 0
+
 
 def generate_uuid():
-    return str(uuid4())
+    """Return a new UUIDv7 (RFC 9562) as a string.
+
+    The first 48 bits are the Unix time in milliseconds, so new ids sort after
+    older ones and inserts append to the right edge of the primary key index
+    instead of landing on random pages. Within one process ids are strictly
+    increasing: the 74 bits after the timestamp are random, but bumped past
+    the previous id when several are created in the same millisecond.
+    """
+    global _last_uuid_counter
+    counter = (time.time_ns() // 1_000_000) << 74 | int.from_bytes(os.urandom(10), "big") >> 6
+    with _uuid_lock:
+        if counter <= _last_uuid_counter:
+            counter = _last_uuid_counter + 1
+        _last_uuid_counter = counter
+    high, rand_b = counter >> 62, counter & ((1 << 62) - 1)
+    value = (high >> 12) << 80 | 0x7 << 76 | (high & 0xFFF) << 64 | 0x2 << 62 | rand_b
+    return str(uuid.UUID(int=value))
+
+
+class UUIDString(db.TypeDecorator):
+    """Native ``uuid`` column whose values are canonical strings in Python.
+
+    Keeps ids as plain strings in models and in the JSON API while the
+    database stores 16 bytes. Values that are not UUIDs (a mistyped id in a
+    URL) are bound as the nil UUID, which no row uses, so lookups simply miss
+    instead of failing the statement.
+    """
+
+    impl = db.Uuid(as_uuid=False)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return canonical_uuid(value)
+
+
+def canonical_uuid(value):
+    """Return ``value`` as the lowercase, hyphenated string ``UUIDString`` binds.
+
+    Anything that is not a UUID becomes the nil UUID, which no row uses.
+    """
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    try:
+        return str(uuid.UUID(value))
+    except (TypeError, ValueError, AttributeError):
+        return NIL_UUID
 
 
 class WalletMember(db.Model):
     __tablename__ = "wallet_members"
 
-    wallet_id = db.Column(db.String(36), db.ForeignKey("wallets.id"), primary_key=True)
-    user_id = db.Column(db.String(36), db.ForeignKey("users.id"), primary_key=True)
+    wallet_id = db.Column(UUIDString, db.ForeignKey("wallets.id"), primary_key=True)
+    user_id = db.Column(UUIDString, db.ForeignKey("users.id"), primary_key=True)
     joined_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Association table only; relationships are defined on User/Wallet models.
@@ -23,15 +79,17 @@ class WalletInvitation(db.Model):
     __tablename__ = "wallet_invitations"
     __table_args__ = (
         db.UniqueConstraint("wallet_id", "invited_user_id", name="uq_wallet_invitee"),
+        # Invitation inbox: a user's invitations, newest first, paged by (created_at, id).
+        db.Index("ix_wallet_invitations_invitee_created", "invited_user_id", "created_at", "id"),
     )
 
-    id = db.Column(db.String(36), primary_key=True, default=generate_uuid)
-    wallet_id = db.Column(db.String(36), db.ForeignKey("wallets.id"), nullable=False)
+    id = db.Column(UUIDString, primary_key=True, default=generate_uuid)
+    wallet_id = db.Column(UUIDString, db.ForeignKey("wallets.id"), nullable=False)
     invited_user_id = db.Column(
-        db.String(36), db.ForeignKey("users.id"), nullable=False
+        UUIDString, db.ForeignKey("users.id"), nullable=False
     )
     invited_by_user_id = db.Column(
-        db.String(36), db.ForeignKey("users.id"), nullable=False
+        UUIDString, db.ForeignKey("users.id"), nullable=False
     )
     status = db.Column(db.String(20), default="pending", nullable=False)
     responded_at = db.Column(db.DateTime, nullable=True)
@@ -64,7 +122,7 @@ class WalletInvitation(db.Model):
 class User(db.Model):
     __tablename__ = "users"
 
-    id = db.Column(db.String(36), primary_key=True, default=generate_uuid)
+    id = db.Column(UUIDString, primary_key=True, default=generate_uuid)
     email = db.Column(db.String(120), unique=True, nullable=False)
     name = db.Column(db.String(100), nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
@@ -106,10 +164,12 @@ class User(db.Model):
 class Wallet(db.Model):
     __tablename__ = "wallets"
 
-    id = db.Column(db.String(36), primary_key=True, default=generate_uuid)
+    id = db.Column(UUIDString, primary_key=True, default=generate_uuid)
     name = db.Column(db.String(100), nullable=False)
     type = db.Column(db.String(20), nullable=False)  # 'personal' | 'group'
-    owner_id = db.Column(db.String(36), db.ForeignKey("users.id"), nullable=False)
+    owner_id = db.Column(UUIDString, db.ForeignKey("users.id"), nullable=False)
+    # Advanced by services.wallet_versions on every write the wallet's GETs can see.
+    data_version = db.Column(db.BigInteger, nullable=False, default=0, server_default="0")
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(
         db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
@@ -134,9 +194,17 @@ class Wallet(db.Model):
 
 class Transaction(db.Model):
     __tablename__ = "transactions"
+    # Shaped after the listing (keyset on sort column + id) and statistics
+    # queries; created by the Flask-Migrate revision of the same name.
+    __table_args__ = (
+        db.Index("ix_transactions_wallet_date", "wallet_id", db.text("date DESC"), db.text("id DESC")),
+        db.Index("ix_transactions_created_by_date", "created_by", "date"),
+        db.Index("ix_transactions_wallet_category", "wallet_id", "category"),
+        db.Index("ix_transactions_wallet_amount", "wallet_id", "amount", "id"),
+    )
 
-    id = db.Column(db.String(36), primary_key=True, default=generate_uuid)
-    wallet_id = db.Column(db.String(36), db.ForeignKey("wallets.id"), nullable=False)
+    id = db.Column(UUIDString, primary_key=True, default=generate_uuid)
+    wallet_id = db.Column(UUIDString, db.ForeignKey("wallets.id"), nullable=False)
     amount = db.Column(db.Numeric(10, 2), nullable=False)
     currency = db.Column(db.String(10), default="HUF")
     category = db.Column(db.String(50), nullable=False)
@@ -148,7 +216,7 @@ class Transaction(db.Model):
     original_image_url = db.Column(db.String(255), nullable=True)
     ocr_raw_text = db.Column(db.Text, nullable=True)
 
-    created_by = db.Column(db.String(36), db.ForeignKey("users.id"), nullable=False)
+    created_by = db.Column(UUIDString, db.ForeignKey("users.id"), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(
         db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
@@ -172,18 +240,38 @@ class Transaction(db.Model):
         }
 
 
+class OCRBatch(db.Model):
+    """A group of receipts uploaded together through POST /api/ocr/batch."""
+
+    __tablename__ = "ocr_batches"
+
+    id = db.Column(UUIDString, primary_key=True, default=generate_uuid)
+    user_id = db.Column(UUIDString, db.ForeignKey("users.id"), nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Relationships
+    jobs = db.relationship("OCRJob", backref="batch", lazy="dynamic")
+
+
 class OCRJob(db.Model):
     __tablename__ = "ocr_jobs"
+    __table_args__ = (db.Index("ix_ocr_jobs_status_created_at", "status", "created_at"),)
 
-    id = db.Column(db.String(36), primary_key=True, default=generate_uuid)
-    user_id = db.Column(db.String(36), db.ForeignKey("users.id"), nullable=False)
+    id = db.Column(UUIDString, primary_key=True, default=generate_uuid)
+    user_id = db.Column(UUIDString, db.ForeignKey("users.id"), nullable=False)
     image_path = db.Column(db.String(255), nullable=False)
+    content_hash = db.Column(db.String(64), nullable=True, index=True)  # sha256 of the upload
+    batch_id = db.Column(UUIDString, db.ForeignKey("ocr_batches.id"), nullable=True, index=True)
     status = db.Column(
         db.String(20), default="pending"
     )  # pending, processing, completed, failed
     raw_text = db.Column(db.Text, nullable=True)
     extracted_data = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    preprocessing = db.Column(db.JSON, nullable=True)  # image sizes and timing before OCR
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
     completed_at = db.Column(db.DateTime, nullable=True)
 
     # Functions
@@ -192,11 +280,58 @@ class OCRJob(db.Model):
             "id": self.id,
             "user_id": self.user_id,
             "image_path": self.image_path,
+            "batch_id": self.batch_id,
             "status": self.status,
             "raw_text": self.raw_text,
             "extracted_data": self.extracted_data,
+            "error": self.error,
+            "preprocessing": self.preprocessing,
             "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
             "completed_at": self.completed_at.isoformat()
             if self.completed_at
             else None,
         }
+
+
+class OCRJobPayloadChunk(db.Model):
+    """One piece of the uploaded file of a queued OCR job, kept until a worker has processed it.
+
+    Stored in the database instead of UPLOAD_FOLDER so that a job can be
+    claimed by any worker process and survives a restart; the file is split
+    into ``seq``-ordered chunks so neither side ever holds it whole.
+    """
+
+    __tablename__ = "ocr_job_payload_chunks"
+
+    job_id = db.Column(UUIDString, db.ForeignKey("ocr_jobs.id", ondelete="CASCADE"), primary_key=True)
+    seq = db.Column(db.Integer, primary_key=True)
+    data = db.Column(db.LargeBinary, nullable=False)
+
+
+class WalletMonthlyRollup(db.Model):
+    """Pre-aggregated transaction totals, maintained incrementally by services.rollups."""
+
+    __tablename__ = "wallet_monthly_rollups"
+
+    wallet_id = db.Column(UUIDString, db.ForeignKey("wallets.id"), primary_key=True)
+    month = db.Column(db.Date, primary_key=True)
+    category = db.Column(db.String(50), primary_key=True)
+    currency = db.Column(db.String(10), primary_key=True)
+    created_by = db.Column(UUIDString, db.ForeignKey("users.id"), primary_key=True)
+    total = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    income = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    expenses = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    transaction_count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class ParseCacheEntry(db.Model):
+    """Persisted LLM receipt-parse results, keyed by model and normalized OCR text."""
+
+    __tablename__ = "ocr_parse_cache"
+
+    key = db.Column(db.String(64), primary_key=True)  # sha256 of model + normalized text
+    model = db.Column(db.String(100), nullable=False)
+    data = db.Column(db.JSON, nullable=False)
+    latency_ms = db.Column(db.Float, nullable=True)  # how long the original LLM call took
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
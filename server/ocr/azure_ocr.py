@@ -1,32 +1,51 @@
 import os
 import time
-from typing import Dict
+from typing import Dict, Optional, Union
 
 from azure.cognitiveservices.vision.computervision import ComputerVisionClient
 from azure.cognitiveservices.vision.computervision.models import OperationStatusCodes
 from msrest.authentication import CognitiveServicesCredentials
 
+from ocr.metrics import poll_recorder
+from ocr.uploads import MappedUpload, open_receipt
+
 
 class AzureOCR:
-    def __init__(self):
-        key = os.getenv('AZURE_VISION_KEY')
-        endpoint = os.getenv('AZURE_VISION_ENDPOINT')
-        if not key or not endpoint:
-            raise ValueError('AZURE_VISION_KEY and AZURE_VISION_ENDPOINT must be set')
-        self.client = ComputerVisionClient(endpoint, CognitiveServicesCredentials(key))
-
-    def extract_text(self, image_path: str) -> Dict:
+    # Most receipts finish in well under a second, so start polling quickly
+    # and back off exponentially for the slow ones.
+    INITIAL_POLL_INTERVAL = 0.2
+    MAX_POLL_INTERVAL = 2.0
+    BACKOFF_FACTOR = 2.0
+
+    def __init__(self, client=None, sleep=time.sleep, clock=time.monotonic):
+        if client is None:
+            key = os.getenv('AZURE_VISION_KEY')
+            endpoint = os.getenv('AZURE_VISION_ENDPOINT')
+            if not key or not endpoint:
+                raise ValueError('AZURE_VISION_KEY and AZURE_VISION_ENDPOINT must be set')
+            client = ComputerVisionClient(endpoint, CognitiveServicesCredentials(key))
+            # msrest opens a fresh session per call unless keep-alive is enabled.
+            client.config.keep_alive = True
+        self.client = client
+        self.poll_deadline = float(os.getenv('AZURE_OCR_POLL_DEADLINE', 30))
+        self._sleep = sleep
+        self._clock = clock
+
+    def extract_text(self, source: Union[str, MappedUpload]) -> Dict:
         try:
-            with open(image_path, 'rb') as f:
+            with open_receipt(source) as f:
                 read_result = self.client.read_in_stream(f, raw=True)
 
             operation_id = read_result.headers['Operation-Location'].split('/')[-1]
+            result, timing = self._wait_for_result(operation_id)
 
-            while True:
-                result = self.client.get_read_result(operation_id)
-                if result.status not in ('notStarted', 'running'):
-                    break
-                time.sleep(1)
+            if result is None:
+                return {
+                    'success': False,
+                    'error': f'Azure OCR did not finish within {self.poll_deadline:g}s',
+                    'text': '',
+                    'timing': timing,
+                }
 
             if result.status == OperationStatusCodes.succeeded:
                 text = '\n'.join(
@@ -34,9 +53,68 @@ class AzureOCR:
                     for page in result.analyze_result.read_results
                     for line in page.lines
                 )
-                return {'success': True, 'text': text.strip()}
+                return {'success': True, 'text': text.strip(), 'timing': timing}
 
-            return {'success': False, 'error': f'Azure OCR status: {result.status}', 'text': ''}
+            return {
+                'success': False,
+                'error': f'Azure OCR status: {result.status}',
+                'text': '',
+                'timing': timing,
+            }
 
         except Exception as e:
-            return {'success': False, 'error': str(e), 'text': ''}
\ No newline at end of file
+            return {'success': False, 'error': str(e), 'text': ''}
+
+    def _wait_for_result(self, operation_id: str):
+        """Poll until the Read operation finishes or the deadline passes.
+
+        Returns ``(result, timing)``; ``result`` is None on timeout.
+        """
+        started = self._clock()
+        deadline = started + self.poll_deadline
+        interval = self.INITIAL_POLL_INTERVAL
+        attempts = []
+        result = None
+
+        while True:
+            attempt_started = self._clock()
+            response = self.client.get_read_result(operation_id, raw=True)
+            polled = response.output
+            attempt = {
+                'status': str(getattr(polled.status, 'value', polled.status)),
+                'request_ms': round((self._clock() - attempt_started) * 1000, 1),
+                'wait_ms': 0.0,
+            }
+            attempts.append(attempt)
+
+            if polled.status not in ('notStarted', 'running'):
+                result = polled
+                break
+
+            remaining = deadline - self._clock()
+            if remaining <= 0:
+                break
+
+            retry_after = _retry_after_seconds(response.response.headers)
+            wait = min(max(interval, retry_after or 0), remaining)
+            attempt['wait_ms'] = round(wait * 1000, 1)
+            self._sleep(wait)
+            interval = min(interval * self.BACKOFF_FACTOR, self.MAX_POLL_INTERVAL)
+
+        timing = {
+            'status': attempts[-1]['status'] if result is not None else 'timeout',
+            'total_ms': round((self._clock() - started) * 1000, 1),
+            'attempts': attempts,
+        }
+        poll_recorder.record(timing)
+        return result, timing
+
+
+def _retry_after_seconds(headers) -> Optional[float]:
+    value = headers.get('Retry-After') if headers else None
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return None
@@ -1,25 +1,32 @@
 import os
-from typing import Dict, List
+from typing import Dict, List, Optional, Union
 
+import requests
 from azure.ai.formrecognizer import DocumentAnalysisClient
 from azure.core.credentials import AzureKeyCredential
+from azure.core.pipeline.transport import RequestsTransport
+
+from ocr.uploads import MappedUpload, open_receipt
 
 
 class AzureReceiptService:
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None):
         endpoint = os.getenv('AZURE_FORM_RECOGNIZER_ENDPOINT')
         key = os.getenv('AZURE_FORM_RECOGNIZER_KEY')
         if not endpoint or not key:
             raise ValueError(
                 'AZURE_FORM_RECOGNIZER_ENDPOINT and AZURE_FORM_RECOGNIZER_KEY must be set'
             )
+        transport_options = {}
+        if session is not None:
+            transport_options['transport'] = RequestsTransport(session=session, session_owner=False)
         self.client = DocumentAnalysisClient(
-            endpoint=endpoint, credential=AzureKeyCredential(key)
+            endpoint=endpoint, credential=AzureKeyCredential(key), **transport_options
         )
 
-    def analyze_receipt(self, file_path: str) -> Dict:
+    def analyze_receipt(self, source: Union[str, MappedUpload]) -> Dict:
         try:
-            with open(file_path, 'rb') as f:
+            with open_receipt(source) as f:
                 result = self.client.begin_analyze_document('prebuilt-receipt', f).result()
             return self._parse_result(result)
         except Exception as e:
@@ -0,0 +1,64 @@
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import func
+
+from models import OCRJob
+
+
+class DedupStats:
+    """Process-wide hit/miss counters for the upload dedup cache."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+stats = DedupStats()
+
+
+def find_completed_job(user_id: str, content_hash: str, max_age_hours: int) -> Optional[OCRJob]:
+    """Latest completed job of ``user_id`` for the same file bytes, if still fresh.
+
+    Lookups are scoped to the uploading user so one user's receipt text is
+    never handed to another. Jobs completed without a result (marked done by
+    ``/confirm`` before a worker got to them, or a provider that returned no
+    parsed data) are skipped, so an upload is never answered with nothing.
+    """
+    if max_age_hours <= 0:
+        return None
+
+    cutoff = datetime.utcnow() - timedelta(hours=max_age_hours)
+    job = (
+        OCRJob.query.filter(
+            OCRJob.content_hash == content_hash,
+            OCRJob.user_id == user_id,
+            OCRJob.status == 'completed',
+            OCRJob.completed_at >= cutoff,
+            OCRJob.raw_text.is_not(None),
+            # Also false for a JSON null, which is how None is stored.
+            func.json_typeof(OCRJob.extracted_data) != 'null',
+        )
+        .order_by(OCRJob.completed_at.desc())
+        .first()
+    )
+    stats.record(job is not None)
+    return job
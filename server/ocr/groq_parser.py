@@ -1,22 +1,41 @@
 import os
 import json
 import re
-from typing import Dict
+import time
+from typing import Dict, Optional
 
-from groq import Groq
+import httpx
+from groq import DefaultHttpxClient, Groq
+
+from ocr.parse_cache import MAX_TEXT_CHARS, ParseCache, cache_key, parse_cache
 
 
 class GroqParser:
     MODEL = 'llama-3.1-8b-instant'
 
-    def __init__(self):
+    def __init__(self, pool_size: int = 10, cache: Optional[ParseCache] = None):
+        self.cache = parse_cache if cache is None else cache
         api_key = os.getenv('GROQ_API_KEY')
         if not api_key:
             raise ValueError('GROQ_API_KEY must be set')
-        self.client = Groq(api_key=api_key)
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        self.client = Groq(api_key=api_key, http_client=DefaultHttpxClient(limits=limits))
 
     def parse(self, ocr_text: str) -> Dict:
-        truncated = ocr_text[:3000]  # stay within token limits
+        key = cache_key(self.MODEL, ocr_text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return {'success': True, 'data': cached, 'cached': True}
+
+        started = time.perf_counter()
+        result = self._parse_uncached(ocr_text)
+        if result['success']:
+            latency_ms = (time.perf_counter() - started) * 1000
+            self.cache.put(key, self.MODEL, result['data'], latency_ms)
+        return result
+
+    def _parse_uncached(self, ocr_text: str) -> Dict:
+        truncated = ocr_text[:MAX_TEXT_CHARS]  # stay within token limits
 
         prompt = (
             'Extract the following from this receipt text as valid JSON:\n'
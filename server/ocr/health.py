@@ -0,0 +1,159 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Tuple
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Tracks the recent outcomes of one OCR provider.
+
+    The breaker opens once at least ``min_calls`` of the last ``window`` calls
+    were recorded and the share of unhealthy ones (failures, or successes slower
+    than ``slow_call_seconds``) reaches ``failure_threshold``. While open the
+    provider is skipped; after ``open_seconds`` a single probe call is let
+    through and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(
+        self,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_threshold: float = 0.5,
+        slow_call_seconds: float = 20.0,
+        open_seconds: float = 30.0,
+        clock=time.monotonic,
+    ):
+        self.min_calls = min_calls
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._calls = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may be made now; claims the probe when half-open."""
+        with self._lock:
+            self._refresh()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record(self, success: bool, latency: float):
+        with self._lock:
+            self._calls.append((success, latency))
+            if self._state == HALF_OPEN:
+                self._probe_in_flight = False
+                if success and latency < self.slow_call_seconds:
+                    self._close()
+                else:
+                    self._open()
+            elif self._state == CLOSED and self._should_open():
+                self._open()
+
+    def unhealthy_rate(self) -> float:
+        with self._lock:
+            return self._unhealthy_rate()
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            self._refresh()
+            latencies = [latency for _, latency in self._calls]
+            return {
+                'state': self._state,
+                'calls': len(self._calls),
+                'failures': sum(1 for success, _ in self._calls if not success),
+                'unhealthy_rate': round(self._unhealthy_rate(), 3),
+                'mean_latency_ms': (
+                    round(sum(latencies) / len(latencies) * 1000, 1) if latencies else None
+                ),
+            }
+
+    def _refresh(self):
+        if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+
+    def _should_open(self) -> bool:
+        return (
+            len(self._calls) >= self.min_calls
+            and self._unhealthy_rate() >= self.failure_threshold
+        )
+
+    def _unhealthy_rate(self) -> float:
+        if not self._calls:
+            return 0.0
+        unhealthy = sum(
+            1 for success, latency in self._calls
+            if not success or latency >= self.slow_call_seconds
+        )
+        return unhealthy / len(self._calls)
+
+    def _open(self):
+        self._state = OPEN
+        self._opened_at = self._clock()
+
+    def _close(self):
+        self._state = CLOSED
+        self._opened_at = None
+        self._calls.clear()
+
+
+class ProviderHealth:
+    """One circuit breaker per provider name, shared by the whole process."""
+
+    # Providers whose unhealthy rates fall in the same bucket keep their
+    # configured priority, so a single failure does not reshuffle the chain.
+    RATE_BUCKET = 0.1
+
+    def __init__(self, **breaker_options):
+        self._breaker_options = breaker_options
+        self._lock = threading.Lock()
+        self._breakers = {}
+
+    def breaker(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            if name not in self._breakers:
+                self._breakers[name] = CircuitBreaker(**self._breaker_options)
+            return self._breakers[name]
+
+    def rank(self, providers: List[Tuple[str, object]]) -> List[Tuple[str, object]]:
+        """Order providers by recent health, open circuits last."""
+        def key(item):
+            index, (name, _) = item
+            breaker = self.breaker(name)
+            return (
+                breaker.state == OPEN,
+                int(round(breaker.unhealthy_rate() / self.RATE_BUCKET, 6)),
+                index,
+            )
+
+        return [provider for _, provider in sorted(enumerate(providers), key=key)]
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {name: breaker.snapshot() for name, breaker in sorted(breakers.items())}
+
+    def reset(self):
+        with self._lock:
+            self._breakers.clear()
+
+
+provider_health = ProviderHealth()
@@ -0,0 +1,278 @@
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import and_, func, insert, or_, select, text
+
+from extensions import db
+from models import OCRJob, OCRJobPayloadChunk
+from ocr.preprocess import ImagePreprocessor
+from ocr.registry import get_receipt_service
+
+# Size of the pieces uploads are stored in and read back from the database.
+PAYLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class OCRWorkerPool:
+    """Processes queued OCR jobs on a fixed number of background threads.
+
+    The queue is the ``ocr_jobs`` table itself: workers claim the oldest
+    pending job with ``SELECT ... FOR UPDATE SKIP LOCKED``, so several
+    processes can share it without a broker and nothing is lost on restart.
+    Jobs left in ``processing`` by a crashed worker are reclaimed once they
+    are older than ``OCR_JOB_STALE_AFTER`` seconds. No user gets more than
+    ``OCR_USER_MAX_CONCURRENT`` jobs processed at once, so one large batch
+    cannot occupy every worker.
+
+    The uploads themselves are in ``ocr_job_payload_chunks``; a worker streams
+    the one it claimed into UPLOAD_FOLDER only while processing it. In the web
+    process the threads start with the first request, so CLI commands such as
+    ``flask db upgrade`` never run workers; ``flask ocr worker`` runs them in a
+    process of their own instead.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.size = app.config['OCR_WORKER_THREADS']
+        self.poll_interval = app.config['OCR_JOB_POLL_INTERVAL']
+        self.stale_after = app.config['OCR_JOB_STALE_AFTER']
+        self.max_attempts = app.config['OCR_JOB_MAX_ATTEMPTS']
+        self.per_user_limit = app.config['OCR_USER_MAX_CONCURRENT']
+        self.preprocessor = ImagePreprocessor(
+            max_side=app.config['OCR_IMAGE_MAX_SIDE'],
+            threads=app.config['OCR_PREPROCESS_THREADS'],
+        )
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._start_lock = threading.Lock()
+        self._started = False
+        self._threads = []
+
+    def start_once(self):
+        """Start the workers unless they are already running; a ``before_request`` hook."""
+        if self._started:
+            return
+        with self._start_lock:
+            if not self._started:
+                self._started = True
+                self.start()
+
+    def serve(self):
+        """Run the workers on this process until it is interrupted."""
+        self.start_once()
+        try:
+            while not self._stopping.wait(1):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def start(self):
+        for i in range(self.size):
+            thread = threading.Thread(target=self._run, name=f'ocr-worker-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5):
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def notify(self):
+        """Wake idle workers after a job has been queued."""
+        self._wakeup.set()
+
+    def run_pending(self) -> int:
+        """Process queued jobs on the calling thread until none are left."""
+        processed = 0
+        with self.app.app_context():
+            while (job_id := self._claim_next_job()) is not None:
+                self._process(job_id)
+                processed += 1
+        return processed
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                with self.app.app_context():
+                    job_id = self._claim_next_job()
+                    if job_id is not None:
+                        self._process(job_id)
+                        continue
+            except Exception as e:
+                print(f'OCR worker error: {e}')
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _claim_next_job(self) -> Optional[str]:
+        try:
+            while True:
+                cutoff = datetime.utcnow() - timedelta(seconds=self.stale_after)
+                busy_users = (
+                    select(OCRJob.user_id)
+                    .where(OCRJob.status == 'processing', OCRJob.started_at >= cutoff)
+                    .group_by(OCRJob.user_id)
+                    .having(func.count() >= self.per_user_limit)
+                )
+                job = (
+                    OCRJob.query.filter(
+                        or_(
+                            OCRJob.status == 'pending',
+                            and_(OCRJob.status == 'processing', OCRJob.started_at < cutoff),
+                        ),
+                        OCRJob.user_id.not_in(busy_users),
+                    )
+                    .order_by(OCRJob.created_at)
+                    .with_for_update(skip_locked=True)
+                    .first()
+                )
+                if job is None:
+                    db.session.rollback()
+                    return None
+
+                # Serialise claims per user so two workers cannot both take the
+                # user's last free slot; the lock is released on commit.
+                db.session.execute(
+                    text('SELECT pg_advisory_xact_lock(hashtext(:user_id))'),
+                    {'user_id': job.user_id},
+                )
+                if self._running_for_user(job.user_id, cutoff) >= self.per_user_limit:
+                    db.session.rollback()
+                    continue
+
+                job.attempts = (job.attempts or 0) + 1
+                if job.attempts > self.max_attempts:
+                    job.status = 'failed'
+                    job.error = f'Gave up after {self.max_attempts} attempts'
+                    job.completed_at = datetime.utcnow()
+                    OCRJobPayloadChunk.query.filter_by(job_id=job.id).delete()
+                    db.session.commit()
+                    _remove_upload(self.app, job.image_path)
+                    continue
+
+                job.status = 'processing'
+                job.started_at = datetime.utcnow()
+                job.error = None
+                db.session.commit()
+                return job.id
+        finally:
+            db.session.remove()
+
+    def _running_for_user(self, user_id: str, cutoff: datetime) -> int:
+        return OCRJob.query.filter(
+            OCRJob.user_id == user_id,
+            OCRJob.status == 'processing',
+            OCRJob.started_at >= cutoff,
+        ).count()
+
+    def _process(self, job_id: str):
+        job = db.session.get(OCRJob, job_id)
+        if job is None:
+            return
+        image_path = job.image_path
+        filepath = os.path.join(self.app.config['UPLOAD_FOLDER'], image_path)
+        restore_payload(job_id, filepath)
+        db.session.remove()
+
+        values = {}
+        try:
+            if not os.path.exists(filepath):
+                raise FileNotFoundError('The uploaded file is no longer available')
+            values['preprocessing'] = self.preprocessor.run(filepath)
+            result = get_receipt_service().process(filepath)
+            if result.get('success') is False:
+                values.update(status='failed', error=result.get('error'))
+            else:
+                values.update(
+                    status='completed',
+                    raw_text=result.get('ocr_text'),
+                    extracted_data=result.get('parsed_data'),
+                )
+        except Exception as e:
+            values.update(status='failed', error=str(e))
+        finally:
+            _remove_upload(self.app, image_path)
+
+        values['completed_at'] = datetime.utcnow()
+        # Update by id: the user may have deleted the job while it was running.
+        OCRJob.query.filter_by(id=job_id).update(values)
+        OCRJobPayloadChunk.query.filter_by(job_id=job_id).delete()
+        db.session.commit()
+        db.session.remove()
+
+
+def store_payload(job_id: str, filepath: str):
+    """Copy the file at ``filepath`` into the job's payload chunks, one chunk in memory at a time."""
+    with open(filepath, 'rb') as f:
+        seq = 0
+        while True:
+            chunk = f.read(PAYLOAD_CHUNK_SIZE)
+            if not chunk and seq:
+                break
+            db.session.execute(insert(OCRJobPayloadChunk), {'job_id': job_id, 'seq': seq, 'data': chunk})
+            seq += 1
+
+
+def restore_payload(job_id: str, filepath: str) -> bool:
+    """Stream the job's payload chunks into ``filepath``; False when it has none.
+
+    Jobs queued before payloads were stored have none and keep their file in
+    UPLOAD_FOLDER.
+    """
+    chunks = db.session.execute(
+        select(OCRJobPayloadChunk.data)
+        .where(OCRJobPayloadChunk.job_id == job_id)
+        .order_by(OCRJobPayloadChunk.seq)
+        .execution_options(yield_per=1)
+    ).scalars()
+    restored = False
+    with open(f'{filepath}.part', 'wb') as out:
+        for chunk in chunks:
+            out.write(chunk)
+            restored = True
+    if restored:
+        os.replace(f'{filepath}.part', filepath)
+    else:
+        os.remove(f'{filepath}.part')
+    return restored
+
+
+def _remove_upload(app, image_path: str):
+    filepath = os.path.join(app.config['UPLOAD_FOLDER'], image_path)
+    if os.path.exists(filepath):
+        os.remove(filepath)
+
+
+def init_worker_pool(app) -> OCRWorkerPool:
+    pool = OCRWorkerPool(app)
+    app.extensions['ocr_workers'] = pool
+    app.before_request(pool.start_once)
+    return pool
+
+
+@click.command('worker')
+@click.option('--threads', type=int, help='Worker threads; defaults to OCR_WORKER_THREADS.')
+@with_appcontext
+def worker_command(threads):
+    """Process queued OCR jobs in the foreground until interrupted."""
+    pool = current_app.extensions['ocr_workers']
+    if threads is not None:
+        pool.size = threads
+    if pool.size < 1:
+        raise click.UsageError('Set OCR_WORKER_THREADS or --threads to at least 1.')
+    click.echo(f'Processing OCR jobs on {pool.size} threads.')
+    pool.serve()
+
+
+def queue_position(job: OCRJob) -> int:
+    """How many pending jobs are ahead of ``job`` in the queue."""
+    return OCRJob.query.filter(
+        OCRJob.status == 'pending', OCRJob.created_at < job.created_at
+    ).count()
@@ -0,0 +1,39 @@
+import threading
+from collections import deque
+from typing import Dict, List
+
+
+class PollRecorder:
+    """Keeps the timings of recent Read operations for tuning the poll strategy."""
+
+    def __init__(self, maxlen: int = 500):
+        self._lock = threading.Lock()
+        self._records = deque(maxlen=maxlen)
+
+    def record(self, record: Dict):
+        with self._lock:
+            self._records.append(record)
+
+    def summary(self) -> Dict:
+        with self._lock:
+            records = list(self._records)
+        if not records:
+            return {'operations': 0}
+
+        totals = sorted(r['total_ms'] for r in records)
+        return {
+            'operations': len(records),
+            'timed_out': sum(1 for r in records if r['status'] == 'timeout'),
+            'mean_polls': round(sum(len(r['attempts']) for r in records) / len(records), 2),
+            'p50_ms': percentile(totals, 0.50),
+            'p95_ms': percentile(totals, 0.95),
+            'max_ms': totals[-1],
+        }
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+poll_recorder = PollRecorder()
@@ -1,18 +1,21 @@
 import os
 import requests
-from typing import Dict
+from typing import Dict, Optional, Union
+
+from ocr.uploads import MappedUpload, open_receipt
 
 
 class OCRSpaceService:
     API_URL = 'https://api.ocr.space/parse/image'
 
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None):
         self.api_key = os.getenv('OCR_API_KEY')
+        self.session = session or requests.Session()
 
-    def extract_text(self, file_path: str) -> Dict:
+    def extract_text(self, source: Union[str, MappedUpload]) -> Dict:
         try:
-            with open(file_path, 'rb') as f:
-                response = requests.post(
+            with open_receipt(source) as f:
+                response = self.session.post(
                     self.API_URL,
                     files={'file': f},
                     data={
@@ -28,8 +31,8 @@ class OCRSpaceService:
         except Exception as e:
             # retry with OCR Engine 3 if Engine 1 fails (the best engine ocr.space provides)
             try:
-                with open(file_path, 'rb') as f:
-                    response = requests.post(
+                with open_receipt(source) as f:
+                    response = self.session.post(
                         self.API_URL,
                         files={'file': f},
                         data={
@@ -0,0 +1,166 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import delete, or_, select
+from sqlalchemy.dialects.postgresql import insert
+
+from extensions import db
+from models import ParseCacheEntry
+
+# GroqParser only ever sends this much text, so longer tails cannot change the answer.
+MAX_TEXT_CHARS = 3000
+
+
+def cache_key(model: str, ocr_text: str) -> str:
+    """Key for ``ocr_text`` as seen by ``model``: whitespace collapsed, case folded."""
+    normalized = ' '.join(ocr_text[:MAX_TEXT_CHARS].split()).casefold()
+    return hashlib.sha256(f'{model}\0{normalized}'.encode()).hexdigest()
+
+
+class ParseCache:
+    """LRU + TTL cache of successful LLM parse results.
+
+    Entries live in memory (at most ``maxsize``) and, once ``configure`` has
+    been given an app with persistence enabled, also in the
+    ``ocr_parse_cache`` table so they survive restarts and are shared between
+    processes. Each write prunes the table to the newest ``maxsize`` rows
+    younger than ``ttl``. Database work runs in its own app context because
+    parsing may happen on provider threads that have none.
+    """
+
+    def __init__(self, maxsize: int = 1000, ttl: float = 7 * 24 * 3600, clock=time.time):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._app = None
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (stored_at, data, latency_ms)
+        self.hits = 0
+        self.misses = 0
+        self.saved_ms = 0.0
+
+    def configure(self, app):
+        self.maxsize = app.config['OCR_PARSE_CACHE_SIZE']
+        self.ttl = app.config['OCR_PARSE_CACHE_TTL']
+        self._app = app if app.config['OCR_PARSE_CACHE_PERSIST'] else None
+        self.clear()
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def get(self, key: str) -> Optional[Dict]:
+        if not self.enabled:
+            return None
+
+        entry = self._get_memory(key)
+        if entry is None and self._app is not None:
+            entry = self._get_persisted(key)
+            if entry is not None:
+                self._put_memory(key, entry)
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.saved_ms += entry[2] or 0.0
+        return copy.deepcopy(entry[1])
+
+    def put(self, key: str, model: str, data: Dict, latency_ms: float):
+        if not self.enabled:
+            return
+        entry = (self._clock(), copy.deepcopy(data), latency_ms)
+        self._put_memory(key, entry)
+        if self._app is not None:
+            self._persist(key, model, entry)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.saved_ms = 0.0
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+                'saved_ms': round(self.saved_ms, 1),
+            }
+
+    def _get_memory(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self._clock() - entry[0] > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _put_memory(self, key: str, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _get_persisted(self, key: str):
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl)
+        with self._app.app_context():
+            try:
+                row = db.session.get(ParseCacheEntry, key)
+            except Exception as e:
+                print(f'Parse cache read failed: {e}')
+                return None
+            if row is None or row.created_at < cutoff:
+                return None
+            age = (datetime.utcnow() - row.created_at).total_seconds()
+            return (self._clock() - age, row.data, row.latency_ms)
+
+    def _persist(self, key: str, model: str, entry):
+        _, data, latency_ms = entry
+        values = {
+            'key': key,
+            'model': model,
+            'data': data,
+            'latency_ms': latency_ms,
+            'created_at': datetime.utcnow(),
+        }
+        stmt = insert(ParseCacheEntry).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['key'],
+            set_={name: stmt.excluded[name] for name in ('data', 'latency_ms', 'created_at')},
+        )
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl)
+        newest = (
+            select(ParseCacheEntry.key)
+            .order_by(ParseCacheEntry.created_at.desc(), ParseCacheEntry.key)
+            .limit(self.maxsize)
+        )
+        with self._app.app_context():
+            try:
+                db.session.execute(stmt)
+                db.session.execute(
+                    delete(ParseCacheEntry).where(
+                        or_(ParseCacheEntry.created_at < cutoff, ParseCacheEntry.key.not_in(newest))
+                    )
+                )
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                print(f'Parse cache write failed: {e}')
+
+
+parse_cache = ParseCache()
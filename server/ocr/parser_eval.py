@@ -0,0 +1,129 @@
+import json
+import time
+from typing import Callable, Dict, List, Optional
+
+import click
+from flask.cli import AppGroup
+
+from ocr.metrics import percentile
+from ocr.rule_parser import RuleBasedParser
+
+FIELDS = ('merchant', 'total_amount', 'date', 'tax_amount', 'currency')
+
+
+def load_corpus(path: str) -> List[Dict]:
+    """Read a labelled corpus: a JSON list of ``{name, text, expected}``."""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def evaluate(parse: Callable[[str], Optional[Dict]], corpus: List[Dict]) -> Dict:
+    """Run ``parse`` over the corpus and report field accuracy and latency.
+
+    ``parse`` takes OCR text and returns the extracted data dict (or None).
+    A receipt counts as exact when every labelled field matches; a field's
+    accuracy only counts the receipts that label it.
+    """
+    correct = {field: 0 for field in FIELDS}
+    labelled = {field: 0 for field in FIELDS}
+    exact = 0
+    durations = []
+    failures = []
+
+    for case in corpus:
+        started = time.perf_counter()
+        data = parse(case['text']) or {}
+        durations.append((time.perf_counter() - started) * 1000)
+
+        wrong = [
+            field for field in FIELDS
+            if field in case['expected'] and not _matches(data.get(field), case['expected'][field])
+        ]
+        for field in FIELDS:
+            if field in case['expected']:
+                labelled[field] += 1
+                if field not in wrong:
+                    correct[field] += 1
+        if wrong:
+            failures.append({'name': case.get('name'), 'fields': wrong})
+        else:
+            exact += 1
+
+    count = len(corpus)
+    durations.sort()
+    return {
+        'receipts': count,
+        'exact': round(exact / count, 3) if count else None,
+        'fields': {
+            field: round(correct[field] / labelled[field], 3) if labelled[field] else None
+            for field in FIELDS
+        },
+        'mean_ms': round(sum(durations) / count, 3) if count else None,
+        'p95_ms': round(percentile(durations, 0.95), 3) if count else None,
+        'failures': failures,
+    }
+
+
+def _matches(actual, expected) -> bool:
+    if expected is None or actual is None:
+        return actual is None and expected is None
+    if isinstance(expected, (int, float)):
+        try:
+            return abs(float(actual) - expected) < 0.01
+        except (TypeError, ValueError):
+            return False
+    return str(actual).strip().casefold() == str(expected).strip().casefold()
+
+
+def rules_only(parser: RuleBasedParser) -> Callable[[str], Dict]:
+    return lambda text: parser.parse(text)['data']
+
+
+def hybrid(service, llm_parser, counter: Dict) -> Callable[[str], Dict]:
+    """The production path: ``SmartReceiptService.parse_text`` with call counting."""
+    class CountingParser:
+        def parse(self, text):
+            counter['llm_calls'] = counter.get('llm_calls', 0) + 1
+            return llm_parser.parse(text)
+
+    counting = CountingParser()
+    return lambda text: service.parse_text(text, counting)[0]
+
+
+ocr_cli = AppGroup('ocr', help='OCR pipeline maintenance commands.')
+
+
+@ocr_cli.command('evaluate-parsers')
+@click.argument('corpus_path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--llm/--no-llm', default=False, help='Also run the Groq parser (needs GROQ_API_KEY).')
+@click.option('--min-confidence', default=0.8, show_default=True, help='Rule parser confidence threshold.')
+def evaluate_parsers_command(corpus_path, llm, min_confidence):
+    """Report accuracy and latency of the receipt parsers on a labelled corpus."""
+    corpus = load_corpus(corpus_path)
+    if not isinstance(corpus, list) or not corpus:
+        raise click.UsageError(f'{corpus_path} must be a non-empty JSON list of receipts.')
+    parser = RuleBasedParser()
+    reports = {'rules': evaluate(rules_only(parser), corpus)}
+
+    counter = {}
+    if llm:
+        from ocr.groq_parser import GroqParser
+        from ocr.parse_cache import ParseCache
+        from ocr.smart_receipt_service import SmartReceiptService
+
+        # Uncached, so every pass (and every run) measures real LLM calls.
+        llm_parser = GroqParser(cache=ParseCache(maxsize=0))
+        reports['llm'] = evaluate(lambda text: llm_parser.parse(text).get('data'), corpus)
+        service = SmartReceiptService(providers=[], min_rule_confidence=min_confidence)
+        reports['hybrid'] = evaluate(hybrid(service, llm_parser, counter), corpus)
+
+    for path, report in reports.items():
+        click.echo(
+            f"{path:>6}: exact {report['exact']:.1%}  mean {report['mean_ms']:.2f}ms  "
+            f"p95 {report['p95_ms']:.2f}ms  "
+            + '  '.join(f'{field} {score:.0%}' for field, score in report['fields'].items() if score is not None)
+        )
+        for failure in report['failures']:
+            click.echo(f"        {failure['name']}: {', '.join(failure['fields'])}")
+    if llm:
+        click.echo(f"hybrid called the LLM for {counter.get('llm_calls', 0)} of {len(corpus)} receipts")
@@ -0,0 +1,100 @@
+import hashlib
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Environment variables the providers are built from; a change triggers a rebuild.
+PROVIDER_CONFIG_KEYS = (
+    'OCR_API_KEY',
+    'GROQ_API_KEY',
+    'AZURE_VISION_KEY',
+    'AZURE_VISION_ENDPOINT',
+    'AZURE_OCR_POLL_DEADLINE',
+    'AZURE_FORM_RECOGNIZER_KEY',
+    'AZURE_FORM_RECOGNIZER_ENDPOINT',
+    'OCR_HTTP_POOL_SIZE',
+    'OCR_HEDGE_AFTER',
+    'OCR_MAX_CONCURRENT_CALLS',
+    'OCR_RULE_PARSER_MIN_CONFIDENCE',
+)
+
+
+def build_http_session(pool_size: int) -> requests.Session:
+    """A keep-alive session whose per-host connection pool holds ``pool_size`` sockets."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+class ProviderRegistry:
+    """Holds one SmartReceiptService per process, built lazily on first use.
+
+    The service and its HTTP session are shared by every request and worker
+    thread so TLS connections to the providers are reused. The instance is
+    rebuilt when the provider configuration changes or ``reload()`` is called;
+    callers already holding the old service keep using it until they finish,
+    while its idle threads are released with ``shutdown(wait=False)``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._service = None
+        self._fingerprint = None
+
+    def get_receipt_service(self):
+        fingerprint = _config_fingerprint()
+        service = self._service
+        if service is not None and fingerprint == self._fingerprint:
+            return service
+
+        with self._lock:
+            if self._service is None or fingerprint != self._fingerprint:
+                self._replace(self._build())
+                self._fingerprint = fingerprint
+            return self._service
+
+    def reload(self):
+        with self._lock:
+            self._replace(None)
+            self._fingerprint = None
+
+    def _replace(self, service):
+        replaced, self._service = self._service, service
+        if replaced is not None:
+            replaced.shutdown(wait=False)
+
+    def _build(self):
+        from ocr.smart_receipt_service import SmartReceiptService
+
+        pool_size = int(os.getenv('OCR_HTTP_POOL_SIZE', 10))
+        # Seconds to wait on a provider before starting the next one; unset keeps
+        # the strictly sequential fallback.
+        hedge_after = os.getenv('OCR_HEDGE_AFTER')
+        max_calls = os.getenv('OCR_MAX_CONCURRENT_CALLS')
+        return SmartReceiptService(
+            session=build_http_session(pool_size),
+            pool_size=pool_size,
+            hedge_after=float(hedge_after) if hedge_after else None,
+            max_concurrent_calls=int(max_calls) if max_calls else None,
+            min_rule_confidence=float(os.getenv('OCR_RULE_PARSER_MIN_CONFIDENCE', 0.8)),
+        )
+
+
+def _config_fingerprint() -> str:
+    values = '\0'.join(os.getenv(key, '') for key in PROVIDER_CONFIG_KEYS)
+    return hashlib.sha256(values.encode()).hexdigest()
+
+
+registry = ProviderRegistry()
+
+
+def get_receipt_service():
+    return registry.get_receipt_service()
+
+
+def reload_providers():
+    registry.reload()
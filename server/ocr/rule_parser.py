@@ -0,0 +1,206 @@
+import re
+import unicodedata
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+# Keywords are matched against upper-cased text with accents removed, because
+# OCR output drops them inconsistently (ÖSSZESEN, OSSZESEN, 0SSZESEN...).
+GRAND_TOTAL_KEYWORDS = ('VEGOSSZEG', 'FIZETENDO', 'GRAND TOTAL', 'AMOUNT DUE', 'BALANCE DUE', 'TOTAL DUE')
+TOTAL_KEYWORDS = ('OSSZESEN', 'OSSZEG', 'TOTAL', 'SUMMA', 'SUMME')
+SUBTOTAL_KEYWORDS = ('RESZOSSZEG', 'SUBTOTAL', 'SUB TOTAL', 'SUB-TOTAL')
+VAT_KEYWORDS = ('AFA', 'VAT', 'TAX', 'MWST')
+VAT_ID_KEYWORDS = ('ADOSZAM', 'VAT NO', 'VAT REG', 'VAT ID', 'TAX ID', 'TAX NO', 'KOZOSSEGI')
+PAYMENT_KEYWORDS = (
+    'KESZPENZ', 'BANKKARTYA', 'KARTYA', 'VISSZAJARO', 'CASH', 'CHANGE', 'CARD', 'VISA',
+    'MASTERCARD', 'KEREKITES', 'ROUNDING', 'TENDERED',
+)
+HEADER_SKIP_KEYWORDS = ('NYUGTA', 'RECEIPT', 'SZAMLA', 'INVOICE', 'NAV', 'AP', 'ADOSZAM')
+
+CURRENCY_PATTERNS = (
+    ('HUF', re.compile(r'\bHUF\b|\bFT\b\.?|\d\s*FT\b')),
+    ('EUR', re.compile(r'€|\bEUR\b')),
+    ('GBP', re.compile(r'£|\bGBP\b')),
+    ('USD', re.compile(r'\$|\bUSD\b')),
+)
+
+# Thousands may be grouped with dots or commas, or with a single space
+# ("1 234"); a longer space-separated run is more likely two columns.
+AMOUNT_RE = re.compile(
+    r'(?<![\d.,])-?(?:\d{1,3}(?:[.,]\d{3})+|\d{1,3} \d{3}|\d+)(?:[.,]\d{1,2})?(?![\d%]|[.,]\d)'
+)
+POSTCODE_RE = re.compile(r'^\d{4}\s')
+TAX_NUMBER_RE = re.compile(r'\d{8}-\d-\d{2}')
+TIME_RE = re.compile(r'\b\d{1,2}:\d{2}(?::\d{2})?\b')
+YMD_RE = re.compile(r'\b(\d{4})\s?[.\-/]\s?(\d{1,2})\s?[.\-/]\s?(\d{1,2})\b')
+DMY_RE = re.compile(r'\b(\d{1,2})[.\-/](\d{1,2})[.\-/](\d{4})\b')
+VAT_CODE_SUFFIX_RE = re.compile(r'\s+(?:[A-E]\d{0,2}|\d+%)\s*$')
+
+
+class RuleBasedParser:
+    """Extracts receipt fields from OCR text with deterministic rules.
+
+    Covers the common Hungarian (NAV till receipt) and English layouts: a
+    merchant header, item lines with trailing prices, a total line, VAT lines,
+    the date and the currency. ``parse`` returns the same shape as
+    ``GroqParser.parse`` plus a ``confidence`` between 0 and 1 saying how
+    complete and self-consistent the extraction was.
+    """
+
+    # Weights of the individual signals; they add up to 1.
+    WEIGHTS = {
+        'total': 0.5,
+        'date': 0.2,
+        'currency': 0.1,
+        'merchant': 0.1,
+        'items_match_total': 0.1,
+    }
+
+    def parse(self, ocr_text: str) -> Dict:
+        lines = [line.strip() for line in (ocr_text or '').splitlines() if line.strip()]
+        normalized = [_normalize(line) for line in lines]
+
+        total, total_index = self._total(lines, normalized)
+        merchant = self._merchant(lines, normalized)
+        items = self._items(lines, normalized, total_index, merchant)
+        parsed_date = self._date(lines)
+        currency = self._currency('\n'.join(normalized))
+
+        signals = {
+            'total': total is not None,
+            'date': parsed_date is not None,
+            'currency': currency is not None,
+            'merchant': merchant is not None,
+            'items_match_total': bool(items) and total is not None
+            and abs(sum(item['price'] for item in items) - total) < 0.01,
+        }
+        confidence = sum(self.WEIGHTS[name] for name, found in signals.items() if found)
+
+        return {
+            'success': True,
+            'data': {
+                'merchant': merchant,
+                'total_amount': total,
+                'date': parsed_date,
+                'items': items,
+                'tax_amount': self._tax(lines, normalized),
+                'currency': currency,
+            },
+            'confidence': round(confidence, 2),
+        }
+
+    def _total(self, lines: List[str], normalized: List[str]) -> Tuple[Optional[float], Optional[int]]:
+        for keywords in (GRAND_TOTAL_KEYWORDS, TOTAL_KEYWORDS):
+            candidates = [
+                i for i, line in enumerate(normalized)
+                if _has_keyword(line, keywords)
+                and not _has_keyword(line, SUBTOTAL_KEYWORDS + VAT_KEYWORDS)
+            ]
+            for i in candidates:
+                amount = _last_amount(lines[i])
+                if amount is None and i + 1 < len(lines):
+                    amount = _last_amount(lines[i + 1])
+                if amount is not None:
+                    return amount, i
+        return None, None
+
+    def _items(
+        self, lines: List[str], normalized: List[str], total_index: Optional[int], merchant: Optional[str]
+    ) -> List[Dict]:
+        if total_index is None:
+            return []
+        items = []
+        for line, upper in zip(lines[:total_index], normalized[:total_index]):
+            if line == merchant or POSTCODE_RE.match(line):
+                continue
+            if _has_keyword(upper, VAT_KEYWORDS + VAT_ID_KEYWORDS + PAYMENT_KEYWORDS + SUBTOTAL_KEYWORDS):
+                continue
+            if YMD_RE.search(line) or DMY_RE.search(line) or TAX_NUMBER_RE.search(line):
+                continue
+            match = _last_amount_match(line)
+            if match is None:
+                continue
+            name = VAT_CODE_SUFFIX_RE.sub('', line[:match.start()]).strip(' .:*-\t')
+            if not re.search(r'[^\W\d_]{2,}', name):
+                continue
+            items.append({'name': name, 'price': _to_float(match.group())})
+        return items
+
+    def _merchant(self, lines: List[str], normalized: List[str]) -> Optional[str]:
+        for line, upper in zip(lines[:5], normalized[:5]):
+            if _has_keyword(upper, HEADER_SKIP_KEYWORDS) or POSTCODE_RE.match(line):
+                continue
+            letters = sum(ch.isalpha() for ch in line)
+            if letters >= 3 and letters >= len(line.replace(' ', '')) / 2:
+                return line
+        return None
+
+    def _date(self, lines: List[str]) -> Optional[str]:
+        for line in lines:
+            text = TIME_RE.sub(' ', line)
+            for match in YMD_RE.finditer(text):
+                parsed = _valid_date(*map(int, match.groups()))
+                if parsed:
+                    return parsed
+            for match in DMY_RE.finditer(text):
+                first, second, year = map(int, match.groups())
+                # Day first (European) unless that is impossible.
+                parsed = _valid_date(year, second, first) or _valid_date(year, first, second)
+                if parsed:
+                    return parsed
+        return None
+
+    def _tax(self, lines: List[str], normalized: List[str]) -> Optional[float]:
+        amounts = []
+        for line, upper in zip(lines, normalized):
+            if not _has_keyword(upper, VAT_KEYWORDS) or _has_keyword(upper, VAT_ID_KEYWORDS):
+                continue
+            if TAX_NUMBER_RE.search(line):
+                continue
+            amount = _last_amount(line)
+            if amount is None:
+                continue
+            if _has_keyword(upper, TOTAL_KEYWORDS):
+                return amount
+            amounts.append(amount)
+        return round(sum(amounts), 2) if amounts else None
+
+    def _currency(self, text: str) -> Optional[str]:
+        for code, pattern in CURRENCY_PATTERNS:
+            if pattern.search(text):
+                return code
+        return None
+
+
+def _normalize(line: str) -> str:
+    decomposed = unicodedata.normalize('NFKD', line.upper())
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def _has_keyword(upper: str, keywords) -> bool:
+    return any(re.search(rf'(?<![A-Z]){re.escape(k)}(?![A-Z])', upper) for k in keywords)
+
+
+def _last_amount_match(line: str):
+    matches = list(AMOUNT_RE.finditer(TIME_RE.sub(lambda m: ' ' * len(m.group()), line)))
+    return matches[-1] if matches else None
+
+
+def _last_amount(line: str) -> Optional[float]:
+    match = _last_amount_match(line)
+    return _to_float(match.group()) if match else None
+
+
+def _to_float(token: str) -> float:
+    token = token.replace(' ', '')
+    decimal_match = re.search(r'[.,](\d{1,2})$', token)
+    if decimal_match:
+        whole = re.sub(r'[.,]', '', token[:decimal_match.start()])
+        return float(f'{whole}.{decimal_match.group(1)}')
+    return float(re.sub(r'[.,]', '', token))
+
+
+def _valid_date(year: int, month: int, day: int) -> Optional[str]:
+    try:
+        return date(year, month, day).isoformat()
+    except ValueError:
+        return None
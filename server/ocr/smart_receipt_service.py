@@ -1,53 +1,186 @@
-from typing import Dict
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+
+from ocr.health import ProviderHealth, provider_health
+from ocr.rule_parser import RuleBasedParser
+from ocr.uploads import MappedUpload
 
 
 class SmartReceiptService:
-    def __init__(self):
+    """Runs a receipt through the configured OCR providers in priority order.
+
+    By default each provider is tried only after the previous one failed. With
+    ``hedge_after`` set, a provider that has not answered within that many
+    seconds gets the next one started alongside it; the first successful
+    result wins. Provider calls run on a pool of ``max_concurrent_calls``
+    threads shared by every caller, which bounds outbound requests per process.
+
+    Providers are ranked by their circuit breakers on every call: those with
+    open circuits are skipped and healthier providers move to the front.
+
+    OCR text is parsed locally by ``RuleBasedParser`` first; the LLM parser is
+    only called when the local result's confidence is below
+    ``min_rule_confidence``.
+    """
+
+    def __init__(
+        self,
+        session=None,
+        pool_size: int = 10,
+        hedge_after: Optional[float] = None,
+        max_concurrent_calls: Optional[int] = None,
+        providers: Optional[List[Tuple[str, object]]] = None,
+        health: Optional[ProviderHealth] = None,
+        min_rule_confidence: float = 0.8,
+    ):
+        self.hedge_after = hedge_after
+        self.health = health or provider_health
+        self.rule_parser = RuleBasedParser()
+        self.min_rule_confidence = min_rule_confidence
+        self._executor = None
+        if hedge_after is not None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max_concurrent_calls or pool_size,
+                thread_name_prefix='ocr-provider',
+            )
+
+        if providers is not None:
+            self.providers = list(providers)
+            return
+
         self.providers = []
 
-        # Primary: OCR.space + Groq
+        # One LLM parser instance is shared by every provider that needs it.
+        # Without it, text providers rely on the local rule-based parser alone.
         try:
-            from ocr.ocr_service import OCRSpaceService
             from ocr.groq_parser import GroqParser
-            self.providers.append(('ocr_space', {'ocr': OCRSpaceService(), 'parser': GroqParser()}))
+            parser = GroqParser(pool_size=pool_size)
+        except Exception as e:
+            parser = None
+            print(f'Groq parser unavailable: {e}')
+
+        # Primary: OCR.space + rules/Groq
+        try:
+            from ocr.ocr_service import OCRSpaceService
+            self.providers.append(('ocr_space', {'ocr': OCRSpaceService(session=session), 'parser': parser}))
         except Exception as e:
             print(f'OCR.space provider unavailable: {e}')
 
-        # Fallback 1: Azure Computer Vision + Groq
+        # Fallback 1: Azure Computer Vision + rules/Groq
         try:
             from ocr.azure_ocr import AzureOCR
-            from ocr.groq_parser import GroqParser
-            self.providers.append(('azure_vision', {'ocr': AzureOCR(), 'parser': GroqParser()}))
+            self.providers.append(('azure_vision', {'ocr': AzureOCR(), 'parser': parser}))
         except Exception as e:
             print(f'Azure Vision provider unavailable: {e}')
 
         # Fallback 2: Azure Form Recognizer (structured output, no Groq needed)
         try:
             from ocr.azure_receipt_service import AzureReceiptService
-            self.providers.append(('azure_form', AzureReceiptService()))
+            self.providers.append(('azure_form', AzureReceiptService(session=session)))
         except Exception as e:
             print(f'Azure Form Recognizer unavailable: {e}')
 
     def process(self, file_path: str) -> Dict:
-        for name, provider in self.providers:
-            print(f'Trying OCR provider: {name}')
+        # Map the file once; every provider reads the same pages.
+        with MappedUpload(file_path) as upload:
+            if self._executor is not None:
+                return self._process_hedged(upload)
+
+            for name, provider in self.health.rank(self.providers):
+                print(f'Trying OCR provider: {name}')
+                result = self._try_provider(name, provider, upload)
+                if result is not None:
+                    return result
+
+        return {'success': False, 'error': 'All OCR providers failed'}
+
+    def shutdown(self, wait: bool = True):
+        """Stop the hedging threads; calls already in ``process()`` finish unhedged."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+
+    def _process_hedged(self, upload: MappedUpload) -> Dict:
+        remaining = self.health.rank(self.providers)
+        running = set()
+
+        def launch_next():
+            name, provider = remaining.pop(0)
+            print(f'Trying OCR provider: {name} (hedged)')
+            # Abandoned calls may outlive process(); each holds the mapping open.
+            upload.acquire()
             try:
-                if name == 'azure_form':
-                    result = provider.analyze_receipt(file_path)
-                    if result['success']:
+                future = self._executor.submit(self._try_provider, name, provider, upload)
+            except RuntimeError:
+                # Shut down by the registry mid-call: run the provider here instead.
+                future = Future()
+                future.set_result(self._try_provider(name, provider, upload))
+            future.add_done_callback(lambda _: upload.release())
+            running.add(future)
+
+        try:
+            while remaining or running:
+                if not running:
+                    launch_next()
+                timeout = self.hedge_after if remaining else None
+                done, running = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    # Budget spent without an answer: start the next provider too.
+                    launch_next()
+                    continue
+                for future in done:
+                    result = future.result()
+                    if result is not None:
                         return result
-                else:
-                    ocr_result = provider['ocr'].extract_text(file_path)
-                    if ocr_result['success']:
-                        parsed = provider['parser'].parse(ocr_result['text'])
-                        return {
-                            'success': True,
-                            'ocr_text': ocr_result['text'],
-                            'parsed_data': parsed.get('data'),
-                            'provider': name,
-                        }
-            except Exception as e:
-                print(f'Provider {name} failed: {e}')
-                continue
-
-        return {'success': False, 'error': 'All OCR providers failed'}
\ No newline at end of file
+        finally:
+            # Queued calls never start; calls already in flight finish in the
+            # background and their results are discarded.
+            for future in running:
+                future.cancel()
+
+        return {'success': False, 'error': 'All OCR providers failed'}
+
+    def _try_provider(self, name: str, provider, upload: MappedUpload) -> Optional[Dict]:
+        """Run one provider; returns its result on success, otherwise None."""
+        breaker = self.health.breaker(name)
+        if not breaker.allow():
+            print(f'Skipping OCR provider {name}: circuit open')
+            return None
+
+        started = time.monotonic()
+        result = None
+        try:
+            if name == 'azure_form':
+                result = provider.analyze_receipt(upload)
+                if not result['success']:
+                    result = None
+            else:
+                ocr_result = provider['ocr'].extract_text(upload)
+                if ocr_result['success']:
+                    parsed_data, parser_name, confidence = self.parse_text(
+                        ocr_result['text'], provider['parser']
+                    )
+                    result = {
+                        'success': True,
+                        'ocr_text': ocr_result['text'],
+                        'parsed_data': parsed_data,
+                        'provider': name,
+                        'parser': parser_name,
+                        'parse_confidence': confidence,
+                    }
+        except Exception as e:
+            print(f'Provider {name} failed: {e}')
+        breaker.record(result is not None, time.monotonic() - started)
+        return result
+
+    def parse_text(self, text: str, llm_parser) -> Tuple[Optional[Dict], str, float]:
+        """Parse OCR text, calling the LLM only when the local rules are unsure."""
+        local = self.rule_parser.parse(text)
+        if local['confidence'] >= self.min_rule_confidence or llm_parser is None:
+            return local['data'], 'rules', local['confidence']
+
+        parsed = llm_parser.parse(text)
+        if parsed.get('data') is None:
+            # Better a partial local result than nothing to prefill the form with.
+            return local['data'], 'rules', local['confidence']
+        return parsed['data'], 'llm', local['confidence']
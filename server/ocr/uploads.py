@@ -0,0 +1,135 @@
+import hashlib
+import io
+import mmap
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import BinaryIO, Tuple, Union
+
+CHUNK_SIZE = 64 * 1024
+
+
+def save_upload(stream: BinaryIO, filepath: str) -> Tuple[str, int]:
+    """Copy an upload to ``filepath`` in chunks, hashing it on the way.
+
+    The bytes go to a temporary file next to ``filepath`` that is renamed into
+    place only once the whole body has been read, so a failed or aborted
+    upload never leaves a partial file behind. Returns the hex sha256 digest
+    and the size in bytes.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(filepath), suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while chunk := stream.read(CHUNK_SIZE):
+                digest.update(chunk)
+                size += len(chunk)
+                out.write(chunk)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return digest.hexdigest(), size
+
+
+class MappedUpload:
+    """A read-only memory map of a stored upload, shared by every provider.
+
+    The fallback and hedged provider chains used to re-open and re-read the
+    file once per provider (twice for OCR.space's engine retry). The file is
+    now mapped once and each caller gets an independent reader over the
+    mapping from ``reader()``.
+
+    Holders are reference counted: ``acquire()``/``release()`` let calls that
+    outlive the owner (abandoned hedged calls) keep the mapping alive, and the
+    mapping is closed deterministically when the last holder releases it.
+    """
+
+    def __init__(self, filepath: str):
+        self.path = filepath
+        self.name = os.path.basename(filepath)
+        self._lock = threading.Lock()
+        self._holders = 1
+        with open(filepath, 'rb') as f:
+            self.size = os.fstat(f.fileno()).st_size
+            # mmap cannot map an empty file.
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+
+    def reader(self) -> BinaryIO:
+        return _MappedReader(self)
+
+    def acquire(self) -> 'MappedUpload':
+        with self._lock:
+            if self._holders == 0:
+                raise ValueError('upload mapping already closed')
+            self._holders += 1
+        return self
+
+    def release(self):
+        with self._lock:
+            self._holders -= 1
+            if self._holders == 0 and isinstance(self._map, mmap.mmap):
+                self._map.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._holders == 0
+
+    def __enter__(self) -> 'MappedUpload':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class _MappedReader(io.RawIOBase):
+    """A file-like cursor over a ``MappedUpload``; ``name`` keeps the extension."""
+
+    def __init__(self, upload: MappedUpload):
+        self._upload = upload
+        self._pos = 0
+        self.name = upload.name
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._upload._map[self._pos:self._pos + len(buffer)]
+        buffer[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def readall(self) -> bytes:
+        data = self._upload._map[self._pos:]
+        self._pos += len(data)
+        return data
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = self._upload.size + offset
+        else:
+            raise ValueError(f'invalid whence: {whence}')
+        self._pos = max(self._pos, 0)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+
+@contextmanager
+def open_receipt(source: Union[str, MappedUpload]):
+    """Binary stream over a receipt given either as a path or a ``MappedUpload``."""
+    stream = source.reader() if isinstance(source, MappedUpload) else open(source, 'rb')
+    try:
+        yield stream
+    finally:
+        stream.close()
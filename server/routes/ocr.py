@@ -1,9 +1,20 @@
+import hmac
 import os
 from datetime import datetime
+from uuid import uuid4
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import func
 from extensions import db
-from models import OCRJob, Transaction, Wallet
+from models import OCRBatch, OCRJob, Transaction
+from ocr import dedup
+from ocr.dedup import find_completed_job
+from ocr.jobs import queue_position, store_payload
+from ocr.health import provider_health
+from ocr.metrics import poll_recorder
+from ocr.parse_cache import parse_cache
+from ocr.uploads import save_upload
+from services import periods, rollups, wallet_access, wallet_versions
 
 ocr_bp = Blueprint('ocr', __name__, url_prefix='/api/ocr')
 
@@ -14,16 +25,58 @@ def _allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
-def _can_access_wallet(wallet, user_id):
-    if not wallet:
-        return False
-    if wallet.owner_id == user_id:
-        return True
+class UploadTooLarge(Exception):
+    """An uploaded file exceeded MAX_CONTENT_LENGTH; carries its filename."""
 
-    members = wallet.members
-    if hasattr(members, 'filter_by'):
-        return members.filter_by(id=user_id).first() is not None
-    return any(m.id == user_id for m in members)
+
+def _store_upload(file, user_id, batch_id=None):
+    """Save one upload and add its job to the session without committing.
+
+    The file is hashed on its way to UPLOAD_FOLDER and then copied in chunks
+    into ``ocr_job_payload_chunks``, where any worker process can pick it up;
+    nothing is left on the local disk and the whole file is never in memory. Returns ``(job, cached)``; a cached job was
+    answered from an earlier identical upload and needs no worker.
+    """
+    filename = f"{user_id}_{uuid4().hex}_{file.filename}"
+    filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
+    try:
+        content_hash, size = save_upload(file.stream, filepath)
+        if size > current_app.config['MAX_CONTENT_LENGTH']:
+            raise UploadTooLarge(file.filename)
+
+        cached = find_completed_job(
+            user_id, content_hash, current_app.config['OCR_DEDUP_MAX_AGE_HOURS']
+        )
+        if cached:
+            now = datetime.utcnow()
+            job = OCRJob(
+                user_id=user_id,
+                batch_id=batch_id,
+                image_path=filename,
+                content_hash=content_hash,
+                status='completed',
+                raw_text=cached.raw_text,
+                extracted_data=cached.extracted_data,
+                started_at=now,
+                completed_at=now,
+            )
+            db.session.add(job)
+            return job, True
+
+        job = OCRJob(
+            user_id=user_id,
+            batch_id=batch_id,
+            image_path=filename,
+            content_hash=content_hash,
+            status='pending',
+        )
+        db.session.add(job)
+        db.session.flush()
+        store_payload(job.id, filepath)
+        return job, False
+    finally:
+        if os.path.exists(filepath):
+            os.remove(filepath)
 
 
 @ocr_bp.route('/process', methods=['POST'])
@@ -38,33 +91,122 @@ def process_receipt():
     if not file.filename or not _allowed_file(file.filename):
         return jsonify({'error': 'Invalid file type. Allowed: jpg, jpeg, png, pdf'}), 400
 
-    upload_folder = current_app.config['UPLOAD_FOLDER']
-    filename = f"{user_id}_{int(datetime.utcnow().timestamp())}_{file.filename}"
-    filepath = os.path.join(upload_folder, filename)
-    file.save(filepath)
-
-    job = OCRJob(user_id=user_id, image_path=filename, status='processing')
-    db.session.add(job)
+    job, cached = _store_upload(file, user_id)
     db.session.commit()
+    if cached:
+        return jsonify({'job': job.to_dict(), 'cached': True}), 201
+
+    current_app.extensions['ocr_workers'].notify()
+    return jsonify({'job': job.to_dict(), 'cached': False}), 202
+
+
+@ocr_bp.route('/batch', methods=['POST'])
+@jwt_required()
+def process_batch():
+    user_id = get_jwt_identity()
+
+    files = request.files.getlist('files')
+    if not files:
+        return jsonify({'error': 'No files provided'}), 400
+
+    max_files = current_app.config['OCR_BATCH_MAX_FILES']
+    if len(files) > max_files:
+        return jsonify({'error': f'At most {max_files} files per batch'}), 400
+
+    invalid = [f.filename for f in files if not f.filename or not _allowed_file(f.filename)]
+    if invalid:
+        return jsonify({
+            'error': 'Invalid file type. Allowed: jpg, jpeg, png, pdf',
+            'files': invalid,
+        }), 400
+
+    batch = OCRBatch(user_id=user_id)
+    db.session.add(batch)
+    db.session.flush()
 
+    jobs = []
     try:
-        from ocr.smart_receipt_service import SmartReceiptService
-        result = SmartReceiptService().process(filepath)
-        job.status = 'completed'
-        job.raw_text = result.get('ocr_text')
-        job.extracted_data = result.get('parsed_data')
-        job.completed_at = datetime.utcnow()
-    except Exception as e:
-        job.status = 'failed'
-        job.completed_at = datetime.utcnow()
-        db.session.commit()
-        return jsonify({'error': 'OCR processing failed', 'detail': str(e)}), 500
-    finally:
-        if os.path.exists(filepath):
-            os.remove(filepath)
+        for file in files:
+            job, _ = _store_upload(file, user_id, batch_id=batch.id)
+            jobs.append(job)
+    except UploadTooLarge as e:
+        db.session.rollback()
+        return jsonify({'error': 'File too large', 'files': [str(e)]}), 413
 
     db.session.commit()
-    return jsonify({'job': job.to_dict()}), 201
+    current_app.extensions['ocr_workers'].notify()
+    return jsonify({
+        'batch': _batch_summary(batch),
+        'jobs': [
+            {'id': job.id, 'status': job.status, 'filename': file.filename}
+            for job, file in zip(jobs, files)
+        ],
+    }), 202
+
+
+@ocr_bp.route('/batches/<batch_id>', methods=['GET'])
+@jwt_required()
+def get_batch(batch_id):
+    user_id = get_jwt_identity()
+    batch = OCRBatch.query.filter_by(id=batch_id, user_id=user_id).first()
+    if not batch:
+        return jsonify({'error': 'Batch not found'}), 404
+
+    summary = _batch_summary(batch)
+    summary['jobs'] = [
+        job.to_dict() for job in batch.jobs.order_by(OCRJob.created_at, OCRJob.id)
+    ]
+    return jsonify({'batch': summary})
+
+
+def _batch_summary(batch):
+    counts = dict.fromkeys(('pending', 'processing', 'completed', 'failed'), 0)
+    rows = (
+        db.session.query(OCRJob.status, func.count())
+        .filter(OCRJob.batch_id == batch.id)
+        .group_by(OCRJob.status)
+    )
+    for status, count in rows:
+        counts[status] = count
+
+    total = sum(counts.values())
+    if counts['pending'] + counts['processing']:
+        status = 'processing'
+    elif counts['failed'] == total:
+        status = 'failed'
+    elif counts['failed']:
+        status = 'completed_with_errors'
+    else:
+        status = 'completed'
+
+    return {
+        'id': batch.id,
+        'created_at': batch.created_at.isoformat(),
+        'status': status,
+        'total': total,
+        'counts': counts,
+    }
+
+
+@ocr_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Process-wide OCR counters, for monitoring rather than app users.
+
+    Requires the ``X-Metrics-Token`` header to match ``OCR_METRICS_TOKEN``;
+    without a configured token the endpoint does not exist.
+    """
+    token = current_app.config['OCR_METRICS_TOKEN']
+    if not token:
+        return jsonify({'error': 'Not found'}), 404
+    if not hmac.compare_digest(request.headers.get('X-Metrics-Token', '').encode(), token.encode()):
+        return jsonify({'error': 'Invalid metrics token'}), 403
+
+    return jsonify({
+        'dedup': dedup.stats.snapshot(),
+        'azure_read_polling': poll_recorder.summary(),
+        'providers': provider_health.snapshot(),
+        'llm_parse_cache': parse_cache.snapshot(),
+    })
 
 
 @ocr_bp.route('/jobs', methods=['GET'])
@@ -82,7 +224,11 @@ def get_job(job_id):
     job = db.session.get(OCRJob, job_id)
     if not job or job.user_id != user_id:
         return jsonify({'error': 'Job not found'}), 404
-    return jsonify({'job': job.to_dict()})
+
+    job_dict = job.to_dict()
+    if job.status == 'pending':
+        job_dict['queue_position'] = queue_position(job)
+    return jsonify({'job': job_dict})
 
 
 @ocr_bp.route('/jobs/<string:job_id>', methods=['DELETE'])
@@ -92,6 +238,7 @@ def delete_job(job_id):
     job = db.session.get(OCRJob, job_id)
     if not job or job.user_id != user_id:
         return jsonify({'error': 'Job not found'}), 404
+    # The payload of a pending job goes with it (ON DELETE CASCADE).
     db.session.delete(job)
     db.session.commit()
     return jsonify({'message': 'Job deleted'})
@@ -113,8 +260,7 @@ def confirm_receipt():
     if not wallet_id or amount is None or not category or not date_str:
         return jsonify({'error': 'wallet_id, amount, category and date are required'}), 400
 
-    wallet = db.session.get(Wallet, wallet_id)
-    if not _can_access_wallet(wallet, user_id):
+    if not wallet_access.can_access(wallet_id, user_id, fresh=True):
         return jsonify({'error': 'Wallet not found'}), 404
 
     description = (data.get('description') or '').strip() or data.get('merchant_name') or 'OCR receipt'
@@ -124,7 +270,7 @@ def confirm_receipt():
         amount=float(amount),
         currency=data.get('currency', 'HUF'),
         category=category,
-        date=datetime.fromisoformat(date_str),
+        date=periods.utc_naive(datetime.fromisoformat(date_str)),
         description=description,
         merchant_name=data.get('merchant_name'),
         original_image_url=data.get('original_image_url'),
@@ -132,6 +278,7 @@ def confirm_receipt():
         created_by=user_id,
     )
     db.session.add(transaction)
+    rollups.record_created(transaction)
 
     if job_id := data.get('job_id'):
         job = db.session.get(OCRJob, job_id)
@@ -139,5 +286,6 @@ def confirm_receipt():
             job.status = 'completed'
             job.completed_at = datetime.utcnow()
 
+    wallet_versions.bump(wallet_id)
     db.session.commit()
     return jsonify({'transaction': transaction.to_dict()}), 201
\ No newline at end of file
@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from extensions import db
 from models import User
+from services import wallet_versions
 
 profile_bp = Blueprint('profile', __name__, url_prefix='/api/users')
 
@@ -39,6 +40,8 @@ def upload_profile_picture():
         return jsonify({'error': 'Upload failed', 'detail': str(e)}), 500
 
     user.profile_image_url = image_url
+    # Member lists show the picture.
+    wallet_versions.bump_for_user(user_id)
     db.session.commit()
     return jsonify({'image_url': image_url})
 
@@ -1,185 +1,158 @@
 from extensions import db
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
-from models import Transaction, User, Wallet
-from sqlalchemy import case, func
+from models import Transaction
+from services import aggregates, rollups, wallet_access, wallet_versions
+from services.periods import Period, PeriodError
+from sqlalchemy import and_
 
 statistics_bp = Blueprint("statistics", __name__, url_prefix="/api/statistics")
 
+DEFAULT_RECENT_TRANSACTIONS = 10
+MAX_RECENT_TRANSACTIONS = 50
 
-def _check_wallet_access(wallet_id, user_id):
-    wallet = db.session.get(Wallet, wallet_id)
-    if not wallet:
-        return None
-    if wallet.owner_id == user_id:
-        return wallet
+# Every endpoint accepts ``from`` and ``to`` (inclusive ISO dates) and
+# ``granularity`` (day, week, month or year) for the series.
 
-    members = wallet.members
-    if hasattr(members, "filter_by"):
-        return wallet if members.filter_by(id=user_id).first() else None
-    return wallet if any(member.id == user_id for member in members) else None
+
+@statistics_bp.errorhandler(PeriodError)
+def period_error(error):
+    return jsonify({"error": str(error)}), 400
 
 
 @statistics_bp.route("/<string:wallet_id>/summary", methods=["GET"])
 @jwt_required()
+@wallet_versions.conditional
 def summary(wallet_id):
     user_id = get_jwt_identity()
-    if not _check_wallet_access(wallet_id, user_id):
+    if not wallet_access.can_access(wallet_id, user_id):
         return jsonify({"error": "Wallet not found"}), 404
 
-    transaction_query = db.session.query(func.sum(Transaction.amount))
-    total = transaction_query.filter_by(wallet_id=wallet_id).scalar() or 0
-    income = (
-        transaction_query.filter(
-            Transaction.wallet_id == wallet_id, Transaction.amount > 0
-        ).scalar()
-        or 0
-    )
-    expenses = (
-        transaction_query.filter(
-            Transaction.wallet_id == wallet_id, Transaction.amount < 0
-        ).scalar()
-        or 0
-    )
-    count = Transaction.query.filter_by(wallet_id=wallet_id).count()
-
-    return jsonify(
-        {
-            "total": float(total),
-            "income": float(income),
-            "expenses": float(expenses),
-            "transaction_count": count,
-        }
-    )
+    period = Period.from_args(request.args)
+    return jsonify(_summary(period, aggregates.wallet_scope(wallet_id)))
 
 
 @statistics_bp.route("/<string:wallet_id>/monthly", methods=["GET"])
 @jwt_required()
+@wallet_versions.conditional
 def monthly(wallet_id):
     user_id = get_jwt_identity()
-    if not _check_wallet_access(wallet_id, user_id):
+    if not wallet_access.can_access(wallet_id, user_id):
         return jsonify({"error": "Wallet not found"}), 404
 
-    rows = (
-        db.session.query(
-            func.date_trunc("month", Transaction.date).label("month"),
-            func.sum(Transaction.amount).label("total"),
-            func.sum(case((Transaction.amount > 0, Transaction.amount), else_=0)).label(
-                "income"
-            ),
-            func.sum(case((Transaction.amount < 0, Transaction.amount), else_=0)).label(
-                "expenses"
-            ),
-        )
-        .filter_by(wallet_id=wallet_id)
-        .group_by("month")
-        .order_by("month")
-        .all()
-    )
-
+    period = Period.from_args(request.args)
     return jsonify(
         {
-            "monthly": [
-                {
-                    "month": row.month.strftime("%Y-%m"),
-                    "total": float(row.total),
-                    "income": float(row.income or 0),
-                    "expenses": float(row.expenses or 0),
-                }
-                for row in rows
-            ]
+            "granularity": period.granularity,
+            "monthly": _series(
+                period, rollups.wallet_scope(wallet_id), aggregates.wallet_scope(wallet_id)
+            ),
         }
     )
 
 
 @statistics_bp.route("/<string:wallet_id>/categories", methods=["GET"])
 @jwt_required()
+@wallet_versions.conditional
 def categories(wallet_id):
     user_id = get_jwt_identity()
-    if not _check_wallet_access(wallet_id, user_id):
+    if not wallet_access.can_access(wallet_id, user_id):
         return jsonify({"error": "Wallet not found"}), 404
 
-    rows = (
-        db.session.query(
-            Transaction.category,
-            func.sum(Transaction.amount).label("total"),
-        )
-        .filter_by(wallet_id=wallet_id)
-        .group_by(Transaction.category)
-        .all()
-    )
-
+    period = Period.from_args(request.args)
     return jsonify(
         {
-            "categories": [
-                {"category": row.category, "total": float(row.total)} for row in rows
-            ]
+            "categories": _category_totals(
+                period, rollups.wallet_scope(wallet_id), aggregates.wallet_scope(wallet_id)
+            )
         }
     )
 
 
-@statistics_bp.route("/summary", methods=["GET"])
+@statistics_bp.route("/<string:wallet_id>/dashboard", methods=["GET"])
 @jwt_required()
-def user_summary():
+@wallet_versions.conditional
+def dashboard(wallet_id):
+    """Summary, monthly series, category totals and latest transactions at once.
+
+    Access is checked once and every part is read through the request's
+    session, so the whole payload costs one HTTP round trip and one pooled
+    connection instead of one of each per widget.
+    """
     user_id = get_jwt_identity()
-    transaction_query = db.session.query(func.sum(Transaction.amount))
-    total = transaction_query.filter_by(created_by=user_id).scalar() or 0
-    income = (
-        transaction_query.filter(
-            Transaction.created_by == user_id, Transaction.amount > 0
-        ).scalar()
-        or 0
-    )
-    expenses = (
-        transaction_query.filter(
-            Transaction.created_by == user_id, Transaction.amount < 0
-        ).scalar()
-        or 0
-    )
-    count = Transaction.query.filter_by(created_by=user_id).count()
+    if not wallet_access.can_access(wallet_id, user_id):
+        return jsonify({"error": "Wallet not found"}), 404
+
+    try:
+        recent = int(request.args.get("recent", DEFAULT_RECENT_TRANSACTIONS))
+    except ValueError:
+        return jsonify({"error": "recent must be an integer"}), 400
+    recent = max(0, min(recent, MAX_RECENT_TRANSACTIONS))
 
+    period = Period.from_args(request.args)
+    rollup_scope = rollups.wallet_scope(wallet_id)
+    transaction_scope = aggregates.wallet_scope(wallet_id)
     return jsonify(
         {
-            "total": float(total),
-            "income": float(income),
-            "expenses": float(expenses),
-            "transaction_count": count,
+            "granularity": period.granularity,
+            "summary": _summary(period, transaction_scope),
+            "monthly": _series(period, rollup_scope, transaction_scope),
+            "categories": _category_totals(period, rollup_scope, transaction_scope),
+            "recent_transactions": _recent_transactions(
+                and_(transaction_scope, aggregates.period_scope(period)), recent
+            ),
         }
     )
 
 
-@statistics_bp.route("/monthly", methods=["GET"])
+@statistics_bp.route("/summary", methods=["GET"])
 @jwt_required()
-def user_monthly():
+def user_summary():
     user_id = get_jwt_identity()
+    period = Period.from_args(request.args)
+    return jsonify(_summary(period, aggregates.creator_scope(user_id)))
 
-    rows = (
-        db.session.query(
-            func.date_trunc("month", Transaction.date).label("month"),
-            func.sum(Transaction.amount).label("total"),
-            func.sum(case((Transaction.amount > 0, Transaction.amount), else_=0)).label(
-                "income"
-            ),
-            func.sum(case((Transaction.amount < 0, Transaction.amount), else_=0)).label(
-                "expenses"
-            ),
-        )
-        .filter_by(created_by=user_id)
-        .group_by("month")
-        .order_by("month")
-        .all()
-    )
 
+@statistics_bp.route("/monthly", methods=["GET"])
+@jwt_required()
+def user_monthly():
+    user_id = get_jwt_identity()
+    period = Period.from_args(request.args)
     return jsonify(
         {
-            "monthly": [
-                {
-                    "month": row.month.strftime("%Y-%m"),
-                    "total": float(row.total),
-                    "income": float(row.income or 0),
-                    "expenses": float(row.expenses or 0),
-                }
-                for row in rows
-            ]
+            "granularity": period.granularity,
+            "monthly": _series(
+                period, rollups.creator_scope(user_id), aggregates.creator_scope(user_id)
+            ),
         }
     )
+
+
+def _summary(period, transaction_scope):
+    return aggregates.summarize(and_(transaction_scope, aggregates.period_scope(period)))
+
+
+def _series(period, rollup_scope, transaction_scope):
+    """Read whole months and years from the rollups, anything finer from the transactions."""
+    if rollups.covers(period):
+        return rollups.series(and_(rollup_scope, rollups.period_scope(period)), period)
+    return aggregates.series(and_(transaction_scope, aggregates.period_scope(period)), period)
+
+
+def _category_totals(period, rollup_scope, transaction_scope):
+    if rollups.covers(period, bucketed=False):
+        return rollups.category_totals(and_(rollup_scope, rollups.period_scope(period)))
+    return aggregates.category_totals(and_(transaction_scope, aggregates.period_scope(period)))
+
+
+def _recent_transactions(scope, limit):
+    if not limit:
+        return []
+    transactions = (
+        db.session.query(Transaction)
+        .filter(scope)
+        .order_by(Transaction.date.desc(), Transaction.id.desc())
+        .limit(limit)
+        .all()
+    )
+    return [transaction.to_dict() for transaction in transactions]
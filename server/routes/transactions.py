@@ -1,66 +1,248 @@
+import base64
+import csv
+import io
+import json
 from datetime import datetime
+from decimal import Decimal, InvalidOperation
 
 from extensions import db
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
 from flask_jwt_extended import get_jwt_identity, jwt_required
-from models import Transaction, Wallet
+from models import Transaction, canonical_uuid, generate_uuid
+from services import periods, rollups, transaction_import, wallet_access, wallet_versions
+from sqlalchemy import delete, insert, tuple_, update
 
 transactions_bp = Blueprint("transactions", __name__)
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
 
-def _get_wallet_or_abort(wallet_id, user_id):
-    wallet = db.session.get(Wallet, wallet_id)
-    if not wallet or not _can_access_wallet(wallet, user_id):
+# Rows fetched per round trip from the export's server-side cursor, and the
+# size at which buffered output is handed to the client.
+EXPORT_BATCH_SIZE = 1000
+EXPORT_CHUNK_BYTES = 64 * 1024
+EXPORT_MIMETYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+BATCH_OPERATIONS = ("create", "update", "delete")
+
+# Keyset pagination needs (value, id) to be a total order, so only columns that
+# are always populated are sortable.
+SORTABLE_COLUMNS = {
+    "date": Transaction.date,
+    "amount": Transaction.amount,
+    "category": Transaction.category,
+    "created_at": Transaction.created_at,
+}
+
+LIST_FIELDS = (
+    "id",
+    "wallet_id",
+    "amount",
+    "currency",
+    "category",
+    "date",
+    "description",
+    "merchant_name",
+    "original_image_url",
+    "ocr_raw_text",
+    "created_by",
+    "created_at",
+)
+
+
+def _apply_filters(query, args):
+    if category := args.get("category"):
+        query = query.filter(Transaction.category == category)
+    if date_from := args.get("date_from"):
+        query = query.filter(Transaction.date >= datetime.fromisoformat(date_from))
+    if date_to := args.get("date_to"):
+        query = query.filter(Transaction.date <= datetime.fromisoformat(date_to))
+    if min_amount := args.get("min_amount"):
+        query = query.filter(Transaction.amount >= float(min_amount))
+    if max_amount := args.get("max_amount"):
+        query = query.filter(Transaction.amount <= float(max_amount))
+    return query
+
+
+def _requested_fields(raw):
+    """Parse the ``fields`` projection; ``id`` is always included so rows stay addressable."""
+    if not raw:
+        return list(LIST_FIELDS)
+    requested = [field.strip() for field in raw.split(",") if field.strip()]
+    if any(field not in LIST_FIELDS for field in requested):
         return None
-    return wallet
+    return ["id"] + [field for field in dict.fromkeys(requested) if field != "id"]
+
+
+def _serialize_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
 
 
-def _can_access_wallet(wallet, user_id):
-    if not wallet:
-        return False
-    if wallet.owner_id == user_id:
-        return True
+def _encode_cursor(sort_value, transaction_id):
+    if isinstance(sort_value, Decimal):
+        sort_value = str(sort_value)
+    payload = json.dumps([_serialize_value(sort_value), transaction_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
 
-    members = wallet.members
-    if hasattr(members, "filter_by"):
-        return members.filter_by(id=user_id).first() is not None
-    return any(m.id == user_id for m in members)
+
+def _decode_cursor(cursor, sort_by):
+    padded = cursor + "=" * (-len(cursor) % 4)
+    sort_value, transaction_id = json.loads(base64.urlsafe_b64decode(padded))
+    if sort_by in ("date", "created_at"):
+        sort_value = datetime.fromisoformat(sort_value)
+    elif sort_by == "amount":
+        sort_value = Decimal(sort_value)
+    elif not isinstance(sort_value, str):
+        raise TypeError("Invalid cursor value")
+    if not isinstance(transaction_id, str):
+        raise TypeError("Invalid cursor id")
+    return sort_value, transaction_id
 
 
 @transactions_bp.route("/api/wallets/<string:wallet_id>/transactions", methods=["GET"])
 @jwt_required()
+@wallet_versions.conditional
 def get_transactions(wallet_id):
     user_id = get_jwt_identity()
-    if not _get_wallet_or_abort(wallet_id, user_id):
+    if not wallet_access.can_access(wallet_id, user_id):
         return jsonify({"error": "Wallet not found"}), 404
 
-    query = Transaction.query.filter_by(wallet_id=wallet_id)
-
-    if category := request.args.get("category"):
-        query = query.filter(Transaction.category == category)
-    if date_from := request.args.get("date_from"):
-        query = query.filter(Transaction.date >= datetime.fromisoformat(date_from))
-    if date_to := request.args.get("date_to"):
-        query = query.filter(Transaction.date <= datetime.fromisoformat(date_to))
-    if min_amount := request.args.get("min_amount"):
-        query = query.filter(Transaction.amount >= float(min_amount))
-    if max_amount := request.args.get("max_amount"):
-        query = query.filter(Transaction.amount <= float(max_amount))
-
     sort_by = request.args.get("sort_by", "date")
+    if sort_by not in SORTABLE_COLUMNS:
+        return jsonify({"error": f"sort_by must be one of: {', '.join(SORTABLE_COLUMNS)}"}), 400
     order = request.args.get("order", "desc")
-    sort_col = getattr(Transaction, sort_by, Transaction.date)
-    query = query.order_by(sort_col.desc() if order == "desc" else sort_col.asc())
+    if order not in ("asc", "desc"):
+        return jsonify({"error": "order must be asc or desc"}), 400
+    descending = order == "desc"
+    sort_col = SORTABLE_COLUMNS[sort_by]
+
+    fields = _requested_fields(request.args.get("fields"))
+    if fields is None:
+        return jsonify({"error": f"fields must be a subset of: {', '.join(LIST_FIELDS)}"}), 400
+
+    try:
+        limit = min(int(request.args.get("limit", DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    if limit < 1:
+        return jsonify({"error": "limit must be positive"}), 400
+
+    columns = [getattr(Transaction, field) for field in fields]
+    try:
+        query = _apply_filters(
+            db.session.query(*columns, sort_col.label("sort_key")).filter(
+                Transaction.wallet_id == wallet_id
+            ),
+            request.args,
+        )
+    except ValueError:
+        return jsonify({"error": "Invalid filter value"}), 400
+
+    if cursor := request.args.get("cursor"):
+        try:
+            sort_value, last_id = _decode_cursor(cursor, sort_by)
+        except (ValueError, TypeError, InvalidOperation):
+            return jsonify({"error": "Invalid cursor"}), 400
+        position = tuple_(sort_col, Transaction.id)
+        boundary = tuple_(sort_value, last_id)
+        query = query.filter(position < boundary if descending else position > boundary)
+
+    if descending:
+        query = query.order_by(sort_col.desc(), Transaction.id.desc())
+    else:
+        query = query.order_by(sort_col.asc(), Transaction.id.asc())
 
-    transactions = query.all()
-    return jsonify({"transactions": [t.to_dict() for t in transactions]})
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].sort_key, rows[-1].id)
+
+    return jsonify(
+        {
+            "transactions": [
+                {field: _serialize_value(getattr(row, field)) for field in fields}
+                for row in rows
+            ],
+            "next_cursor": next_cursor,
+        }
+    )
+
+
+@transactions_bp.route("/api/wallets/<string:wallet_id>/transactions/export", methods=["GET"])
+@jwt_required()
+@wallet_versions.conditional
+def export_transactions(wallet_id):
+    """Stream every matching transaction as CSV or NDJSON, oldest first.
+
+    Rows come from a server-side cursor ``EXPORT_BATCH_SIZE`` at a time and
+    are written out as they arrive, so memory use does not depend on the
+    size of the wallet. Accepts the listing's filter and ``fields`` parameters.
+    """
+    user_id = get_jwt_identity()
+    if not wallet_access.can_access(wallet_id, user_id):
+        return jsonify({"error": "Wallet not found"}), 404
+
+    fmt = request.args.get("format", "csv")
+    if fmt not in EXPORT_MIMETYPES:
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+    fields = _requested_fields(request.args.get("fields"))
+    if fields is None:
+        return jsonify({"error": f"fields must be a subset of: {', '.join(LIST_FIELDS)}"}), 400
+
+    try:
+        query = _apply_filters(
+            db.session.query(*[getattr(Transaction, field) for field in fields]).filter(
+                Transaction.wallet_id == wallet_id
+            ),
+            request.args,
+        )
+    except ValueError:
+        return jsonify({"error": "Invalid filter value"}), 400
+    query = query.order_by(Transaction.date, Transaction.id).execution_options(
+        yield_per=EXPORT_BATCH_SIZE
+    )
+
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if fmt == "csv":
+            writer.writerow(fields)
+            # The header goes out before the query runs.
+            yield _drain(buffer)
+        for row in query:
+            if fmt == "csv":
+                # Amounts stay exact Decimals, dates ISO 8601: the import endpoint reads both back.
+                writer.writerow([value.isoformat() if isinstance(value, datetime) else value for value in row])
+            else:
+                buffer.write(json.dumps(dict(zip(fields, map(_serialize_value, row)))) + "\n")
+            if buffer.tell() >= EXPORT_CHUNK_BYTES:
+                yield _drain(buffer)
+        yield _drain(buffer)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=EXPORT_MIMETYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="transactions-{wallet_id}.{fmt}"'},
+    )
+
+
+def _drain(buffer):
+    chunk = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return chunk
 
 
 @transactions_bp.route("/api/wallets/<string:wallet_id>/transactions", methods=["POST"])
 @jwt_required()
 def create_transaction(wallet_id):
     user_id = get_jwt_identity()
-    if not _get_wallet_or_abort(wallet_id, user_id):
+    if not wallet_access.can_access(wallet_id, user_id, fresh=True):
         return jsonify({"error": "Wallet not found"}), 404
 
     data = request.get_json()
@@ -79,7 +261,7 @@ def create_transaction(wallet_id):
         amount=float(amount),
         currency=data.get("currency", "HUF"),
         category=category,
-        date=datetime.fromisoformat(date_str),
+        date=periods.utc_naive(datetime.fromisoformat(date_str)),
         description=data.get("description"),
         merchant_name=data.get("merchant_name"),
         original_image_url=data.get("original_image_url"),
@@ -87,10 +269,168 @@ def create_transaction(wallet_id):
         created_by=user_id,
     )
     db.session.add(transaction)
+    rollups.record_created(transaction)
+    wallet_versions.bump(wallet_id)
     db.session.commit()
     return jsonify({"transaction": transaction.to_dict()}), 201
 
 
+@transactions_bp.route("/api/wallets/<string:wallet_id>/transactions/import", methods=["POST"])
+@jwt_required()
+def import_transactions(wallet_id):
+    """Bulk-load a CSV or NDJSON stream of transactions in one database transaction.
+
+    The body is either the raw stream (``Content-Type: text/csv`` or
+    ``application/x-ndjson``, or ``?format=``) or a multipart ``file``.
+    Invalid rows are skipped and reported; the valid ones are imported.
+    """
+    user_id = get_jwt_identity()
+    if not wallet_access.can_access(wallet_id, user_id, fresh=True):
+        return jsonify({"error": "Wallet not found"}), 404
+
+    requested = request.args.get("format")
+    if request.mimetype == "multipart/form-data":
+        upload = request.files.get("file")
+        if not upload:
+            return jsonify({"error": "No file provided"}), 400
+        fmt = transaction_import.detect_format(upload.mimetype, upload.filename, requested)
+        stream = upload.stream
+    else:
+        fmt = transaction_import.detect_format(request.mimetype, requested=requested)
+        stream = request.stream
+    if fmt is None:
+        return jsonify({"error": "Send CSV (text/csv) or NDJSON (application/x-ndjson)"}), 415
+
+    importer = transaction_import.TransactionImporter(wallet_id, user_id)
+    try:
+        summary = importer.run(transaction_import.read_records(stream, fmt))
+    except transaction_import.ImportFormatError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+
+    if summary["imported"]:
+        wallet_versions.bump(wallet_id)
+    db.session.commit()
+    return jsonify(summary), 201 if summary["imported"] else 200
+
+
+@transactions_bp.route("/api/wallets/<string:wallet_id>/transactions/batch", methods=["POST"])
+@jwt_required()
+def batch_transactions(wallet_id):
+    """Apply a list of create, update and delete operations with one commit.
+
+    Each operation succeeds or fails on its own and ``results[i]`` reports
+    operation ``i``. Targets are loaded with one ``IN`` query, each kind of
+    write goes out as one bulk statement, and only the creator of a
+    transaction may change or delete it, as with the single-row endpoints.
+    """
+    user_id = get_jwt_identity()
+    if not wallet_access.can_access(wallet_id, user_id, fresh=True):
+        return jsonify({"error": "Wallet not found"}), 404
+
+    operations = (request.get_json(silent=True) or {}).get("operations")
+    if not isinstance(operations, list) or not operations:
+        return jsonify({"error": "operations must be a non-empty list"}), 400
+    max_operations = current_app.config["TRANSACTION_BATCH_MAX_OPERATIONS"]
+    if len(operations) > max_operations:
+        return jsonify({"error": f"At most {max_operations} operations per batch"}), 400
+
+    # Ids are compared in the canonical form the uuid columns bind and load.
+    wallet_id = canonical_uuid(wallet_id)
+    target_ids = {
+        canonical_uuid(op["id"])
+        for op in operations
+        if isinstance(op, dict) and op.get("op") in ("update", "delete") and isinstance(op.get("id"), str)
+    }
+    targets = {}
+    if target_ids:
+        targets = {t.id: t for t in Transaction.query.filter(Transaction.id.in_(target_ids))}
+
+    results = []
+    creates, updates, deletes = [], [], []
+    changed = set()
+    delta = rollups.RollupDelta()
+    now = datetime.utcnow()
+    for op in operations:
+        kind = op.get("op") if isinstance(op, dict) else None
+        if kind not in BATCH_OPERATIONS:
+            results.append(_operation_error(400, "op must be create, update or delete"))
+            continue
+        data = op.get("data", {} if kind == "delete" else None)
+        if not isinstance(data, dict):
+            results.append(_operation_error(400, "data must be an object"))
+            continue
+
+        if kind == "create":
+            try:
+                row = transaction_import.validate_row(data)
+                row.update(transaction_import.validate_attachments(data))
+            except transaction_import.RowError as e:
+                results.append(_operation_error(400, str(e)))
+                continue
+            row.update(
+                id=generate_uuid(),
+                wallet_id=wallet_id,
+                created_by=user_id,
+                created_at=now,
+                updated_at=now,
+            )
+            creates.append(row)
+            delta.add(row)
+            results.append({"status": 201, "id": row["id"]})
+            continue
+
+        target_id = op.get("id")
+        transaction = targets.get(canonical_uuid(target_id)) if isinstance(target_id, str) else None
+        if not transaction or transaction.wallet_id != wallet_id:
+            results.append(_operation_error(404, "Transaction not found"))
+            continue
+        if transaction.created_by != user_id:
+            results.append(_operation_error(403, "Not authorised"))
+            continue
+        if transaction.id in changed:
+            results.append(_operation_error(400, "Transaction already changed earlier in this batch"))
+            continue
+
+        if kind == "delete":
+            deletes.append(transaction.id)
+            delta.remove(transaction)
+            results.append({"status": 200, "id": transaction.id, "deleted": True})
+        else:
+            try:
+                changes = transaction_import.validate_row(data, partial=True)
+            except transaction_import.RowError as e:
+                results.append(_operation_error(400, str(e)))
+                continue
+            delta.remove(transaction)
+            delta.add({key: changes.get(key, getattr(transaction, key)) for key in rollups.SOURCE_FIELDS})
+            updates.append({"id": transaction.id, **changes, "updated_at": now})
+            results.append({"status": 200, "id": transaction.id})
+        changed.add(transaction.id)
+
+    if creates:
+        db.session.execute(insert(Transaction), creates)
+    if updates:
+        db.session.execute(update(Transaction), updates)
+    if deletes:
+        db.session.execute(delete(Transaction).where(Transaction.id.in_(deletes)))
+    delta.apply()
+    if creates or updates or deletes:
+        wallet_versions.bump(wallet_id)
+    db.session.commit()
+
+    written = {result["id"]: result for result in results if result["status"] in (200, 201) and not result.get("deleted")}
+    if written:
+        for transaction in Transaction.query.filter(Transaction.id.in_(written)):
+            written[transaction.id]["transaction"] = transaction.to_dict()
+
+    return jsonify({"results": results})
+
+
+def _operation_error(status, message):
+    return {"status": status, "error": message}
+
+
 @transactions_bp.route(
     "/api/wallets/<string:wallet_id>/transactions/<string:transaction_id>",
     methods=["PATCH"],
@@ -98,7 +438,7 @@ def create_transaction(wallet_id):
 @jwt_required()
 def update_transaction(wallet_id, transaction_id):
     user_id = get_jwt_identity()
-    if not _get_wallet_or_abort(wallet_id, user_id):
+    if not wallet_access.can_access(wallet_id, user_id, fresh=True):
         return jsonify({"error": "Wallet not found"}), 404
 
     transaction = db.session.get(Transaction, transaction_id)
@@ -108,6 +448,8 @@ def update_transaction(wallet_id, transaction_id):
         return jsonify({"error": "Not authorised"}), 403
 
     data = request.get_json() or {}
+    delta = rollups.RollupDelta()
+    delta.remove(transaction)
     for field in ("amount", "currency", "category", "description", "merchant_name"):
         if field in data:
             setattr(
@@ -116,7 +458,10 @@ def update_transaction(wallet_id, transaction_id):
                 float(data[field]) if field == "amount" else data[field],
             )
     if "date" in data:
-        transaction.date = datetime.fromisoformat(data["date"])
+        transaction.date = periods.utc_naive(datetime.fromisoformat(data["date"]))
+    delta.add(transaction)
+    delta.apply()
+    wallet_versions.bump(wallet_id)
 
     db.session.commit()
     return jsonify({"transaction": transaction.to_dict()})
@@ -129,7 +474,7 @@ def update_transaction(wallet_id, transaction_id):
 @jwt_required()
 def delete_transaction(wallet_id, transaction_id):
     user_id = get_jwt_identity()
-    if not _get_wallet_or_abort(wallet_id, user_id):
+    if not wallet_access.can_access(wallet_id, user_id, fresh=True):
         return jsonify({"error": "Wallet not found"}), 404
 
     transaction = db.session.get(Transaction, transaction_id)
@@ -138,6 +483,8 @@ def delete_transaction(wallet_id, transaction_id):
     if transaction.created_by != user_id:
         return jsonify({"error": "Not authorised"}), 403
 
+    rollups.record_deleted(transaction)
     db.session.delete(transaction)
+    wallet_versions.bump(wallet_id)
     db.session.commit()
     return jsonify({"message": "Transaction deleted"})
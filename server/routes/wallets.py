@@ -1,39 +1,60 @@
+import base64
+import json
 from datetime import datetime
 
 from extensions import db
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
-from models import User, Wallet, WalletInvitation
+from models import User, Wallet, WalletInvitation, WalletMember
+from services import rollups, wallet_access, wallet_versions
+from sqlalchemy import case, func, or_, select, tuple_
+from sqlalchemy.orm import joinedload
 
 wallets_bp = Blueprint("wallets", __name__, url_prefix="/api/wallets")
 
+INVITATION_PAGE_SIZE = 50
+MAX_INVITATION_PAGE_SIZE = 200
 
-def _get_wallet_or_404(wallet_id, user_id, require_owner=False):
-    wallet = db.session.get(Wallet, wallet_id)
-    if not wallet:
-        return None
 
-    if wallet.owner_id == user_id:
-        return wallet
-
-    if require_owner:
+def _get_wallet_or_404(wallet_id, user_id, require_owner=False, fresh=False):
+    if not wallet_access.can_access(wallet_id, user_id, require_owner=require_owner, fresh=fresh):
         return None
+    return db.session.get(Wallet, wallet_id)
 
-    # Check if user is a member
-    if wallet.members.filter_by(id=user_id).first():
-        return wallet
-
-    return None
 
-
-def _serialize_wallet_for_list(wallet, is_owner):
+def _serialize_wallet_for_list(wallet, is_owner, balance, member_count):
     data = wallet.to_dict()
     data["is_owner"] = is_owner
-    data["balance"] = round(sum(float(t.amount) for t in wallet.transactions), 2)
-    data["member_count"] = (wallet.members.count() + 1) if wallet.type == "group" else 0
+    data["balance"] = round(balance, 2)
+    data["member_count"] = (member_count + 1) if wallet.type == "group" else 0
     return data
 
 
+def _member_counts(wallet_ids):
+    if not wallet_ids:
+        return {}
+    rows = (
+        db.session.query(WalletMember.wallet_id, func.count(WalletMember.user_id))
+        .filter(WalletMember.wallet_id.in_(wallet_ids))
+        .group_by(WalletMember.wallet_id)
+        .all()
+    )
+    return dict(rows)
+
+
+def _encode_invitation_cursor(invitation):
+    payload = json.dumps([invitation.created_at.isoformat(), invitation.id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_invitation_cursor(cursor):
+    padded = cursor + "=" * (-len(cursor) % 4)
+    created_at, invitation_id = json.loads(base64.urlsafe_b64decode(padded))
+    if not isinstance(invitation_id, str):
+        raise TypeError("Invalid cursor id")
+    return datetime.fromisoformat(created_at), invitation_id
+
+
 @wallets_bp.route("", methods=["GET"])
 @jwt_required()
 def get_wallets():
@@ -42,16 +63,29 @@ def get_wallets():
     if not user:
         return jsonify({"error": "User not found"}), 404
 
-    owned_wallets = user.wallets
-    shared_wallets = user.shared_wallets
-
-    results = []
-    for w in owned_wallets:
-        results.append(_serialize_wallet_for_list(w, True))
+    # Owned wallets first, then shared ones; balances and member counts are
+    # fetched with one grouped query each so the query count stays constant.
+    is_owned = Wallet.owner_id == user_id
+    shared_ids = select(WalletMember.wallet_id).where(WalletMember.user_id == user_id)
+    wallets = (
+        Wallet.query.filter(or_(is_owned, Wallet.id.in_(shared_ids)))
+        .order_by(case((is_owned, 0), else_=1), Wallet.created_at)
+        .all()
+    )
 
-    for w in shared_wallets:
-        results.append(_serialize_wallet_for_list(w, False))
+    wallet_ids = [w.id for w in wallets]
+    balances = rollups.wallet_balances(wallet_ids)
+    member_counts = _member_counts(wallet_ids)
 
+    results = [
+        _serialize_wallet_for_list(
+            w,
+            w.owner_id == user_id,
+            balances.get(w.id, 0.0),
+            member_counts.get(w.id, 0),
+        )
+        for w in wallets
+    ]
     return jsonify({"wallets": results})
 
 
@@ -79,6 +113,7 @@ def create_wallet():
 
 @wallets_bp.route("/<string:wallet_id>", methods=["GET"])
 @jwt_required()
+@wallet_versions.conditional
 def get_wallet(wallet_id):
     user_id = get_jwt_identity()
     wallet = _get_wallet_or_404(wallet_id, user_id)
@@ -91,7 +126,7 @@ def get_wallet(wallet_id):
 @jwt_required()
 def update_wallet(wallet_id):
     user_id = get_jwt_identity()
-    wallet = _get_wallet_or_404(wallet_id, user_id, require_owner=True)
+    wallet = _get_wallet_or_404(wallet_id, user_id, require_owner=True, fresh=True)
     if not wallet:
         return jsonify({"error": "Wallet not found or permission denied"}), 404
 
@@ -106,6 +141,7 @@ def update_wallet(wallet_id):
             return jsonify({"error": "Type must be personal or group"}), 400
         wallet.type = data["type"]
 
+    wallet_versions.bump(wallet_id)
     db.session.commit()
     return jsonify({"wallet": wallet.to_dict()})
 
@@ -114,21 +150,24 @@ def update_wallet(wallet_id):
 @jwt_required()
 def delete_wallet(wallet_id):
     user_id = get_jwt_identity()
-    wallet = _get_wallet_or_404(wallet_id, user_id, require_owner=True)
+    wallet = _get_wallet_or_404(wallet_id, user_id, require_owner=True, fresh=True)
     if not wallet:
         return jsonify({"error": "Wallet not found or permission denied"}), 404
 
     # Clear invitations explicitly to avoid intermittent FK issues on wallet deletion.
     for invitation in wallet.invitations.all():
         db.session.delete(invitation)
+    rollups.delete_wallet_rollups(wallet.id)
 
     db.session.delete(wallet)
     db.session.commit()
+    wallet_access.invalidate(wallet_id)
     return jsonify({"message": "Wallet deleted"}), 200
 
 
 @wallets_bp.route("/<string:wallet_id>/members", methods=["GET"])
 @jwt_required()
+@wallet_versions.conditional
 def get_wallet_members(wallet_id):
     user_id = get_jwt_identity()
     wallet = _get_wallet_or_404(wallet_id, user_id)
@@ -156,7 +195,7 @@ def get_wallet_members(wallet_id):
 @jwt_required()
 def add_wallet_member(wallet_id):
     user_id = get_jwt_identity()
-    wallet = _get_wallet_or_404(wallet_id, user_id, require_owner=True)
+    wallet = _get_wallet_or_404(wallet_id, user_id, require_owner=True, fresh=True)
     if not wallet:
         return jsonify({"error": "Wallet not found or permission denied"}), 404
 
@@ -219,18 +258,47 @@ def list_my_invitations():
     if status not in ("pending", "accepted", "declined", "all"):
         return jsonify({"error": "Invalid status filter"}), 400
 
-    query = WalletInvitation.query.filter_by(invited_user_id=user_id)
+    try:
+        limit = min(int(request.args.get("limit", INVITATION_PAGE_SIZE)), MAX_INVITATION_PAGE_SIZE)
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    if limit < 1:
+        return jsonify({"error": "limit must be positive"}), 400
+
+    # The wallet and inviter are joined into the same statement, so a page
+    # costs one query however many invitations it holds.
+    query = WalletInvitation.query.options(
+        joinedload(WalletInvitation.wallet),
+        joinedload(WalletInvitation.invited_by_user),
+    ).filter(WalletInvitation.invited_user_id == user_id)
     if status != "all":
-        query = query.filter_by(status=status)
+        query = query.filter(WalletInvitation.status == status)
+
+    if cursor := request.args.get("cursor"):
+        try:
+            created_at, last_id = _decode_invitation_cursor(cursor)
+        except (ValueError, TypeError):
+            return jsonify({"error": "Invalid cursor"}), 400
+        query = query.filter(
+            tuple_(WalletInvitation.created_at, WalletInvitation.id) < tuple_(created_at, last_id)
+        )
 
-    invitations = query.order_by(WalletInvitation.created_at.desc()).all()
+    invitations = (
+        query.order_by(WalletInvitation.created_at.desc(), WalletInvitation.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    next_cursor = None
+    if len(invitations) > limit:
+        invitations = invitations[:limit]
+        next_cursor = _encode_invitation_cursor(invitations[-1])
 
     result = []
     for invitation in invitations:
         invitation_dict = invitation.to_dict()
 
-        wallet = db.session.get(Wallet, invitation.wallet_id)
-        invited_by_user = db.session.get(User, invitation.invited_by_user_id)
+        wallet = invitation.wallet
+        invited_by_user = invitation.invited_by_user
 
         invitation_dict["wallet"] = (
             {
@@ -253,7 +321,7 @@ def list_my_invitations():
 
         result.append(invitation_dict)
 
-    return jsonify({"invitations": result})
+    return jsonify({"invitations": result, "next_cursor": next_cursor})
 
 
 @wallets_bp.route("/invitations/<string:invitation_id>/accept", methods=["POST"])
@@ -278,7 +346,9 @@ def accept_invitation(invitation_id):
 
     invitation.status = "accepted"
     invitation.responded_at = datetime.utcnow()
+    wallet_versions.bump(wallet.id)
     db.session.commit()
+    wallet_access.invalidate(wallet.id, user_id)
 
     return jsonify({"message": "Invitation accepted", "wallet": wallet.to_dict()})
 
@@ -327,6 +397,8 @@ def remove_wallet_member(wallet_id, member_id):
         return jsonify({"error": "Member not found in wallet"}), 404
 
     wallet.members.remove(member_to_remove)
+    wallet_versions.bump(wallet_id)
     db.session.commit()
+    wallet_access.invalidate(wallet_id, member_id)
 
     return jsonify({"message": "Member removed"})
@@ -0,0 +1,83 @@
+from extensions import db
+from models import Transaction
+from services import periods
+from sqlalchemy import and_, case, func, true
+
+
+def wallet_scope(wallet_id):
+    return Transaction.wallet_id == wallet_id
+
+
+def creator_scope(user_id):
+    return Transaction.created_by == user_id
+
+
+def period_scope(period):
+    """Plain range predicates on the date, usable by the (scope, date) indexes."""
+    bounds = []
+    if period.start is not None:
+        bounds.append(Transaction.date >= period.start)
+    if period.end is not None:
+        bounds.append(Transaction.date < period.end)
+    return and_(*bounds) if bounds else true()
+
+
+def summarize(scope):
+    """Compute the summary figures for the transactions matching ``scope``.
+
+    Everything is calculated with conditional aggregates so the rows are
+    scanned exactly once, however many figures the caller needs.
+    """
+    row = (
+        db.session.query(
+            func.coalesce(func.sum(Transaction.amount), 0).label("total"),
+            func.coalesce(
+                func.sum(case((Transaction.amount > 0, Transaction.amount), else_=0)), 0
+            ).label("income"),
+            func.coalesce(
+                func.sum(case((Transaction.amount < 0, Transaction.amount), else_=0)), 0
+            ).label("expenses"),
+            func.count(Transaction.id).label("transaction_count"),
+            func.min(Transaction.amount).label("min_amount"),
+            func.max(Transaction.amount).label("max_amount"),
+            func.avg(Transaction.amount).label("average_amount"),
+        )
+        .filter(scope)
+        .one()
+    )
+
+    return {
+        "total": float(row.total),
+        "income": float(row.income),
+        "expenses": float(row.expenses),
+        "transaction_count": row.transaction_count,
+        "min_amount": _optional_float(row.min_amount),
+        "max_amount": _optional_float(row.max_amount),
+        "average_amount": _optional_float(row.average_amount, digits=2),
+    }
+
+
+def series(scope, period):
+    """Income, expenses and total per bucket of ``period``, empty buckets included."""
+    figures = {
+        "total": func.sum(Transaction.amount),
+        "income": func.sum(case((Transaction.amount > 0, Transaction.amount), else_=0)),
+        "expenses": func.sum(case((Transaction.amount < 0, Transaction.amount), else_=0)),
+    }
+    return periods.filled_series(Transaction.date, scope, figures, period)
+
+
+def category_totals(scope):
+    rows = (
+        db.session.query(Transaction.category, func.sum(Transaction.amount).label("total"))
+        .filter(scope)
+        .group_by(Transaction.category)
+        .all()
+    )
+    return [{"category": row.category, "total": float(row.total)} for row in rows]
+
+
+def _optional_float(value, digits=None):
+    if value is None:
+        return None
+    return round(float(value), digits) if digits is not None else float(value)
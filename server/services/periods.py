@@ -0,0 +1,164 @@
+from datetime import date, datetime, timedelta, timezone
+
+from extensions import db
+from flask import current_app
+from sqlalchemy import func, literal_column, select
+
+GRANULARITIES = ("day", "week", "month", "year")
+LABEL_FORMATS = {"day": "%Y-%m-%d", "week": "%Y-%m-%d", "month": "%Y-%m", "year": "%Y"}
+
+
+class PeriodError(ValueError):
+    """A ``from``, ``to`` or ``granularity`` parameter is invalid."""
+
+
+class Period:
+    """The date range and bucket size a statistics request is limited to.
+
+    ``start`` is inclusive and ``end`` exclusive, both midnight datetimes or
+    None for an open end, so they compare directly against the indexed date
+    columns. Week buckets start on Monday, as PostgreSQL's ``date_trunc`` does.
+    A series may have at most ``max_buckets`` buckets (None for no limit).
+    """
+
+    def __init__(self, start=None, end=None, granularity="month", max_buckets=None):
+        self.start = start
+        self.end = end
+        self.granularity = granularity
+        self.max_buckets = max_buckets
+
+    @classmethod
+    def from_args(cls, args):
+        """Build a period from the ``from``, ``to`` and ``granularity`` query parameters.
+
+        ``from`` and ``to`` are ISO dates and both are inclusive. The bucket
+        limit is ``STATISTICS_MAX_BUCKETS``.
+        """
+        granularity = args.get("granularity", "month")
+        if granularity not in GRANULARITIES:
+            raise PeriodError(f"granularity must be one of: {', '.join(GRANULARITIES)}")
+        start = _parse_date(args, "from")
+        end = _parse_date(args, "to")
+        if end is not None:
+            end += timedelta(days=1)
+        if start is not None and end is not None and start >= end:
+            raise PeriodError("from must not be after to")
+        period = cls(start, end, granularity, current_app.config["STATISTICS_MAX_BUCKETS"])
+        if (period.bucket_count() or 0) > period.max_buckets:
+            raise period.too_many_buckets()
+        return period
+
+    def bucket_count(self):
+        """Number of buckets between the bounds, or None when an end is open."""
+        if self.start is None or self.end is None:
+            return None
+        first = self.floor(self.start)
+        last = self.floor(self.end - timedelta(microseconds=1))
+        if self.granularity == "day":
+            return (last - first).days + 1
+        if self.granularity == "week":
+            return (last - first).days // 7 + 1
+        if self.granularity == "month":
+            return (last.year - first.year) * 12 + last.month - first.month + 1
+        return last.year - first.year + 1
+
+    def too_many_buckets(self):
+        return PeriodError(
+            f"At most {self.max_buckets} {self.granularity} buckets per request; "
+            "narrow from and to or use a coarser granularity"
+        )
+
+    @property
+    def month_aligned(self):
+        """True when the bounds fall on month starts, so monthly rollups can answer exactly."""
+        return all(bound is None or bound.day == 1 for bound in (self.start, self.end))
+
+    def floor(self, moment):
+        """Return the start of the bucket ``moment`` falls into."""
+        moment = datetime.combine(moment.date(), datetime.min.time())
+        if self.granularity == "week":
+            return moment - timedelta(days=moment.weekday())
+        if self.granularity == "month":
+            return moment.replace(day=1)
+        if self.granularity == "year":
+            return moment.replace(month=1, day=1)
+        return moment
+
+    def label(self, moment):
+        return moment.strftime(LABEL_FORMATS[self.granularity])
+
+
+def utc_naive(moment):
+    """Return ``moment`` as the naive UTC datetime the date columns store.
+
+    The columns are ``timestamp without time zone``; an aware value would be
+    stored converted but bucketed by its local date.
+    """
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def _parse_date(args, name):
+    value = args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.combine(date.fromisoformat(value), datetime.min.time())
+    except ValueError:
+        raise PeriodError(f"{name} must be an ISO date (YYYY-MM-DD)") from None
+
+
+def filled_series(date_column, scope, figures, period):
+    """Aggregate ``figures`` per bucket of ``period``, with empty buckets filled in.
+
+    ``scope`` must already restrict ``date_column`` to the period. Buckets are
+    generated with ``generate_series`` from the period's bounds, or from the
+    first and last bucket with data for an open end, and left-joined to the
+    grouped totals so a bucket without rows reports zeros. Returns one dict
+    per bucket, in order, with its ``period`` label and the figures; monthly
+    buckets keep the ``month`` key the series has always had. When an end is
+    open the series is limited to the most recent ``period.max_buckets``
+    buckets; a period with both bounds was checked by ``from_args``.
+    """
+    unit = literal_column(f"'{period.granularity}'")
+    bucket = func.date_trunc(unit, date_column)
+    totals = (
+        select(bucket.label("period"), *(expr.label(name) for name, expr in figures.items()))
+        .where(scope)
+        .group_by(bucket)
+        .cte("totals")
+    )
+
+    first = (
+        period.floor(period.start)
+        if period.start is not None
+        else select(func.min(totals.c.period)).scalar_subquery()
+    )
+    last = (
+        period.floor(period.end - timedelta(microseconds=1))
+        if period.end is not None
+        else select(func.max(totals.c.period)).scalar_subquery()
+    )
+    if period.max_buckets is not None and (period.start is None or period.end is None):
+        span = literal_column(f"interval '{period.max_buckets - 1} {period.granularity}'")
+        first = func.greatest(first, last - span)
+    step = literal_column(f"interval '1 {period.granularity}'")
+    buckets = select(func.generate_series(first, last, step).label("period")).subquery("buckets")
+
+    rows = db.session.execute(
+        select(
+            buckets.c.period,
+            *(func.coalesce(totals.c[name], 0).label(name) for name in figures),
+        )
+        .select_from(buckets.outerjoin(totals, totals.c.period == buckets.c.period))
+        .order_by(buckets.c.period)
+    ).all()
+    series = []
+    for row in rows:
+        entry = {"period": period.label(row.period)}
+        if period.granularity == "month":
+            entry["month"] = entry["period"]
+        entry.update((name, float(getattr(row, name))) for name in figures)
+        series.append(entry)
+    return series
@@ -0,0 +1,289 @@
+from collections import defaultdict
+from decimal import ROUND_HALF_UP, Decimal
+
+import click
+from extensions import db
+from flask.cli import AppGroup
+from models import Transaction, WalletMonthlyRollup
+from services import periods, wallet_versions
+from sqlalchemy import and_, case, cast, delete, func, select, text, true
+from sqlalchemy.dialects.postgresql import insert
+
+KEY_COLUMNS = ("wallet_id", "month", "category", "currency", "created_by")
+# Transaction fields the rollups are computed from.
+SOURCE_FIELDS = ("wallet_id", "amount", "date", "category", "currency", "created_by")
+CENT = Decimal("0.01")
+
+
+def wallet_scope(wallet_id):
+    return WalletMonthlyRollup.wallet_id == wallet_id
+
+
+def creator_scope(user_id):
+    return WalletMonthlyRollup.created_by == user_id
+
+
+def covers(period, bucketed=True):
+    """Whether the rollups answer ``period`` exactly: whole months, in month or year buckets."""
+    return period.month_aligned and (not bucketed or period.granularity in ("month", "year"))
+
+
+def period_scope(period):
+    """Range predicates on the rollup month; ``period`` must be month aligned."""
+    bounds = []
+    if period.start is not None:
+        bounds.append(WalletMonthlyRollup.month >= period.start.date())
+    if period.end is not None:
+        bounds.append(WalletMonthlyRollup.month < period.end.date())
+    return and_(*bounds) if bounds else true()
+
+
+class RollupDelta:
+    """Accumulates the rollup changes caused by transaction writes.
+
+    Add or remove transactions (ORM objects or plain dicts) while handling a
+    request, then call ``apply()`` before committing so the rollup rows change
+    in the same database transaction as the rows they summarise.
+    """
+
+    def __init__(self):
+        self._rows = defaultdict(lambda: [Decimal(0), Decimal(0), Decimal(0), 0])
+
+    def add(self, transaction):
+        self._accumulate(transaction, 1)
+
+    def remove(self, transaction):
+        self._accumulate(transaction, -1)
+
+    def _accumulate(self, transaction, sign):
+        # numeric(10, 2) rounds half away from zero; match it so the rollup
+        # sums the values the transactions table actually stores.
+        amount = Decimal(str(_field(transaction, "amount"))).quantize(CENT, rounding=ROUND_HALF_UP)
+        key = (
+            _field(transaction, "wallet_id"),
+            periods.utc_naive(_field(transaction, "date")).date().replace(day=1),
+            _field(transaction, "category"),
+            _field(transaction, "currency") or "",
+            _field(transaction, "created_by"),
+        )
+        row = self._rows[key]
+        row[0] += amount * sign
+        if amount > 0:
+            row[1] += amount * sign
+        elif amount < 0:
+            row[2] += amount * sign
+        row[3] += sign
+
+    def apply(self):
+        changes = [
+            dict(
+                zip(KEY_COLUMNS, key),
+                total=total,
+                income=income,
+                expenses=expenses,
+                transaction_count=count,
+            )
+            for key, (total, income, expenses, count) in self._rows.items()
+            if count or total or income or expenses
+        ]
+        self._rows.clear()
+        if not changes:
+            return
+
+        stmt = insert(WalletMonthlyRollup).values(changes)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(KEY_COLUMNS),
+            set_={
+                "total": WalletMonthlyRollup.total + stmt.excluded.total,
+                "income": WalletMonthlyRollup.income + stmt.excluded.income,
+                "expenses": WalletMonthlyRollup.expenses + stmt.excluded.expenses,
+                "transaction_count": WalletMonthlyRollup.transaction_count
+                + stmt.excluded.transaction_count,
+            },
+        )
+        db.session.execute(stmt)
+
+        if any(change["transaction_count"] < 0 for change in changes):
+            wallet_ids = {change["wallet_id"] for change in changes}
+            db.session.execute(
+                delete(WalletMonthlyRollup).where(
+                    WalletMonthlyRollup.wallet_id.in_(wallet_ids),
+                    WalletMonthlyRollup.transaction_count <= 0,
+                )
+            )
+
+
+def _field(transaction, name):
+    if isinstance(transaction, dict):
+        return transaction[name]
+    return getattr(transaction, name)
+
+
+def record_created(transaction):
+    delta = RollupDelta()
+    delta.add(transaction)
+    delta.apply()
+
+
+def record_deleted(transaction):
+    delta = RollupDelta()
+    delta.remove(transaction)
+    delta.apply()
+
+
+def delete_wallet_rollups(wallet_id):
+    db.session.execute(delete(WalletMonthlyRollup).where(wallet_scope(wallet_id)))
+
+
+def wallet_balances(wallet_ids):
+    """Return ``{wallet_id: balance}`` for the given wallets in one grouped query."""
+    if not wallet_ids:
+        return {}
+    rows = (
+        db.session.query(
+            WalletMonthlyRollup.wallet_id, func.sum(WalletMonthlyRollup.total)
+        )
+        .filter(WalletMonthlyRollup.wallet_id.in_(wallet_ids))
+        .group_by(WalletMonthlyRollup.wallet_id)
+        .all()
+    )
+    return {wallet_id: float(balance) for wallet_id, balance in rows}
+
+
+def series(scope, period):
+    """Income, expenses and total per month or year of ``period``, empty buckets included."""
+    figures = {
+        "total": func.sum(WalletMonthlyRollup.total),
+        "income": func.sum(WalletMonthlyRollup.income),
+        "expenses": func.sum(WalletMonthlyRollup.expenses),
+    }
+    month = cast(WalletMonthlyRollup.month, db.DateTime)
+    return periods.filled_series(month, scope, figures, period)
+
+
+def category_totals(scope):
+    rows = (
+        db.session.query(
+            WalletMonthlyRollup.category,
+            func.sum(WalletMonthlyRollup.total).label("total"),
+        )
+        .filter(scope)
+        .group_by(WalletMonthlyRollup.category)
+        .all()
+    )
+    return [{"category": row.category, "total": float(row.total)} for row in rows]
+
+
+def _expected_rollups(wallet_id=None):
+    """Aggregate the raw transactions into rollup rows."""
+    month = cast(func.date_trunc("month", Transaction.date), db.Date)
+    currency = func.coalesce(Transaction.currency, "")
+    query = select(
+        Transaction.wallet_id,
+        month.label("month"),
+        Transaction.category,
+        currency.label("currency"),
+        Transaction.created_by,
+        func.sum(Transaction.amount).label("total"),
+        func.sum(case((Transaction.amount > 0, Transaction.amount), else_=0)).label(
+            "income"
+        ),
+        func.sum(case((Transaction.amount < 0, Transaction.amount), else_=0)).label(
+            "expenses"
+        ),
+        func.count(Transaction.id).label("transaction_count"),
+    ).group_by(
+        Transaction.wallet_id,
+        month,
+        Transaction.category,
+        currency,
+        Transaction.created_by,
+    )
+    if wallet_id:
+        query = query.where(Transaction.wallet_id == wallet_id)
+    return query
+
+
+def rebuild(wallet_id=None):
+    """Recompute rollups from the transactions table.
+
+    Writers are blocked for the duration so no delta can slip in between the
+    delete and the re-aggregation. Returns the number of rows written.
+    """
+    db.session.execute(text("LOCK TABLE transactions IN SHARE MODE"))
+    stmt = delete(WalletMonthlyRollup)
+    if wallet_id:
+        stmt = stmt.where(wallet_scope(wallet_id))
+    db.session.execute(stmt)
+
+    expected = _expected_rollups(wallet_id)
+    result = db.session.execute(
+        insert(WalletMonthlyRollup).from_select(
+            [*KEY_COLUMNS, "total", "income", "expenses", "transaction_count"],
+            expected,
+        )
+    )
+    # Repaired figures must not be hidden behind a cached statistics response.
+    if wallet_id:
+        wallet_versions.bump(wallet_id)
+    else:
+        wallet_versions.bump_all()
+    db.session.commit()
+    return result.rowcount
+
+
+def verify(wallet_id=None):
+    """Compare stored rollups against the raw transactions.
+
+    Returns a list of ``(key, expected, actual)`` tuples, empty when in sync.
+    """
+    figures = ("total", "income", "expenses", "transaction_count")
+    expected = {
+        tuple(row[col] for col in KEY_COLUMNS): tuple(row[f] for f in figures)
+        for row in db.session.execute(_expected_rollups(wallet_id)).mappings()
+    }
+
+    query = db.session.query(WalletMonthlyRollup)
+    if wallet_id:
+        query = query.filter(wallet_scope(wallet_id))
+    actual = {
+        tuple(getattr(row, col) for col in KEY_COLUMNS): tuple(
+            getattr(row, f) for f in figures
+        )
+        for row in query
+    }
+
+    return [
+        (key, expected.get(key), actual.get(key))
+        for key in sorted(expected.keys() | actual.keys(), key=str)
+        if expected.get(key) != actual.get(key)
+    ]
+
+
+rollups_cli = AppGroup("rollups", help="Maintain the wallet monthly rollup table.")
+
+
+@rollups_cli.command("rebuild")
+@click.option("--wallet", "wallet_id", default=None, help="Only rebuild one wallet.")
+def rebuild_command(wallet_id):
+    count = rebuild(wallet_id)
+    click.echo(f"Rebuilt {count} rollup rows")
+
+
+@rollups_cli.command("verify")
+@click.option("--wallet", "wallet_id", default=None, help="Only verify one wallet.")
+@click.option("--repair", is_flag=True, help="Rebuild when drift is detected.")
+def verify_command(wallet_id, repair):
+    drift = verify(wallet_id)
+    if not drift:
+        click.echo("Rollups are in sync")
+        return
+
+    for key, expected, actual in drift:
+        click.echo(f"Drift at {key}: expected {expected}, stored {actual}")
+
+    if repair:
+        count = rebuild(wallet_id)
+        click.echo(f"Rebuilt {count} rollup rows")
+    else:
+        raise click.ClickException(f"{len(drift)} rollup rows out of sync")
@@ -0,0 +1,259 @@
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from operator import itemgetter
+
+from extensions import db
+from models import Transaction, generate_uuid
+from services import periods, rollups
+from sqlalchemy import insert
+
+CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/x-jsonlines": "ndjson",
+}
+EXTENSIONS = {"csv": "csv", "ndjson": "ndjson", "jsonl": "ndjson"}
+
+REQUIRED_FIELDS = ("amount", "category", "date")
+COLUMNS = (
+    "id",
+    "wallet_id",
+    "amount",
+    "currency",
+    "category",
+    "date",
+    "description",
+    "merchant_name",
+    "created_by",
+    "created_at",
+    "updated_at",
+)
+_copy_row = itemgetter(*COLUMNS)
+COPY_SQL = f"COPY transactions ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+MAX_LENGTHS = {"currency": 10, "category": 50, "description": 255, "merchant_name": 100, "original_image_url": 255}
+MAX_AMOUNT = Decimal("99999999.99")  # Numeric(10, 2)
+CENT = Decimal("0.01")
+
+BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportFormatError(ValueError):
+    """The stream itself is unreadable (bad encoding, malformed CSV, missing header)."""
+
+
+class RowError(ValueError):
+    """One row failed validation; the import carries on without it."""
+
+
+def detect_format(content_type=None, filename=None, requested=None):
+    """Return "csv", "ndjson" or None from an explicit format, the filename or the content type."""
+    if requested:
+        requested = requested.lower()
+        return requested if requested in ("csv", "ndjson") else None
+    if filename and "." in filename:
+        extension = filename.rsplit(".", 1)[1].lower()
+        if extension in EXTENSIONS:
+            return EXTENSIONS[extension]
+    return CONTENT_TYPES.get((content_type or "").lower())
+
+
+def read_records(stream, fmt):
+    """Yield ``(line_number, record)`` from a binary CSV or NDJSON stream.
+
+    The stream is decoded incrementally, so memory use does not grow with the
+    size of the import. CSV records are dicts keyed by the lower-cased header;
+    NDJSON records are the raw line, parsed by ``validate_row`` so a bad line
+    is reported instead of ending the import.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "csv":
+            reader = csv.DictReader(text)
+            if reader.fieldnames is None:
+                return
+            reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+            missing = [field for field in REQUIRED_FIELDS if field not in reader.fieldnames]
+            if missing:
+                raise ImportFormatError(f"CSV header is missing: {', '.join(missing)}")
+            for record in reader:
+                yield reader.line_num, record
+        else:
+            for line_number, line in enumerate(text, 1):
+                if line.strip():
+                    yield line_number, line
+    except csv.Error as e:
+        raise ImportFormatError(f"Malformed CSV: {e}") from e
+    except UnicodeDecodeError as e:
+        raise ImportFormatError("Import must be UTF-8 encoded") from e
+    finally:
+        text.detach()
+
+
+def validate_row(record, partial=False):
+    """Return the import fields of ``record`` cleaned up, or raise ``RowError``.
+
+    With ``partial`` only the fields present in ``record`` are validated and
+    returned, which is what an update needs.
+    """
+    if isinstance(record, str):
+        try:
+            record = json.loads(record)
+        except ValueError:
+            raise RowError("invalid JSON") from None
+    if not isinstance(record, dict):
+        raise RowError("row must be an object")
+
+    cleaners = {
+        "amount": lambda: _amount(record.get("amount")),
+        "category": lambda: _text(record, "category"),
+        "date": lambda: _date(record.get("date")),
+        "currency": lambda: _text(record, "currency") or "HUF",
+        "description": lambda: _text(record, "description"),
+        "merchant_name": lambda: _text(record, "merchant_name"),
+    }
+    row = {field: clean() for field, clean in cleaners.items() if not partial or field in record}
+    if "category" in row and not row["category"]:
+        raise RowError("category is required")
+    return row
+
+
+def validate_attachments(record):
+    """Return the OCR fields of ``record`` (not part of an import), or raise ``RowError``."""
+    raw_text = record.get("ocr_raw_text")
+    if raw_text is not None and not isinstance(raw_text, str):
+        raise RowError("ocr_raw_text must be a string")
+    return {"original_image_url": _text(record, "original_image_url"), "ocr_raw_text": raw_text}
+
+
+def _amount(value):
+    if value is None or value == "" or isinstance(value, bool):
+        raise RowError("amount is required")
+    try:
+        amount = Decimal(str(value).strip())
+    except InvalidOperation:
+        raise RowError("amount must be a number") from None
+    if not amount.is_finite():
+        raise RowError("amount must be a number")
+    amount = amount.quantize(CENT, rounding=ROUND_HALF_UP)
+    if abs(amount) > MAX_AMOUNT:
+        raise RowError("amount is out of range")
+    return amount
+
+
+def _date(value):
+    if not value:
+        raise RowError("date is required")
+    try:
+        parsed = datetime.fromisoformat(str(value).strip())
+    except ValueError:
+        raise RowError("date must be ISO 8601") from None
+    return periods.utc_naive(parsed)
+
+
+def _text(record, field):
+    value = record.get(field)
+    if value is None:
+        return None
+    value = str(value).strip()
+    if len(value) > MAX_LENGTHS[field]:
+        raise RowError(f"{field} is longer than {MAX_LENGTHS[field]} characters")
+    return value or None
+
+
+class TransactionImporter:
+    """Streams validated rows into one wallet inside the session's transaction.
+
+    Rows are written in batches with PostgreSQL ``COPY`` when the driver
+    supports it (psycopg2) and with multi-row ``INSERT`` otherwise. Invalid
+    rows are counted and reported, up to ``MAX_REPORTED_ERRORS`` of them, and
+    skipped. The monthly rollups are updated once at the end; the caller
+    commits or rolls back.
+    """
+
+    def __init__(self, wallet_id, user_id, use_copy=None, batch_size=BATCH_SIZE):
+        self.wallet_id = wallet_id
+        self.user_id = user_id
+        self.use_copy = use_copy
+        self.batch_size = batch_size
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+        self._pending = []
+        self._delta = rollups.RollupDelta()
+
+    def run(self, records):
+        if self.use_copy is None:
+            self.use_copy = _supports_copy(self._driver_connection())
+
+        now = datetime.utcnow()
+        for line_number, record in records:
+            try:
+                row = validate_row(record)
+            except RowError as e:
+                self.failed += 1
+                if len(self.errors) < MAX_REPORTED_ERRORS:
+                    self.errors.append({"line": line_number, "error": str(e)})
+                continue
+
+            row.update(
+                id=generate_uuid(),
+                wallet_id=self.wallet_id,
+                created_by=self.user_id,
+                created_at=now,
+                updated_at=now,
+            )
+            self._pending.append(row)
+            self._delta.add(row)
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+
+        self._flush()
+        self._delta.apply()
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+            "method": "copy" if self.use_copy else "insert",
+        }
+
+    def _flush(self):
+        if not self._pending:
+            return
+        if self.use_copy:
+            self._copy(self._pending)
+        else:
+            db.session.execute(insert(Transaction), self._pending)
+        self.imported += len(self._pending)
+        self._pending = []
+
+    def _copy(self, rows):
+        buffer = io.StringIO()
+        # csv writes None as an unquoted empty field, which COPY reads as NULL,
+        # and str() of datetimes and Decimals is already valid COPY input.
+        csv.writer(buffer).writerows(map(_copy_row, rows))
+        buffer.seek(0)
+        cursor = self._driver_connection().cursor()
+        try:
+            cursor.copy_expert(COPY_SQL, buffer)
+        finally:
+            cursor.close()
+
+    def _driver_connection(self):
+        # The session's own connection, so COPY joins its transaction.
+        return db.session.connection().connection.driver_connection
+
+
+def _supports_copy(connection):
+    cursor = connection.cursor()
+    try:
+        return hasattr(cursor, "copy_expert")
+    finally:
+        cursor.close()
+
@@ -0,0 +1,125 @@
+import threading
+import time
+
+from extensions import db
+from flask import g, has_app_context
+from models import Wallet, WalletMember
+from sqlalchemy import and_, case, exists, select
+
+OWNER = "owner"
+MEMBER = "member"
+
+
+class WalletAccessCache:
+    """Short-lived per-process cache of granted wallet roles.
+
+    Only grants are cached: a revoked membership can stay visible for at most
+    ``ttl`` seconds in other processes, while a new membership is never hidden.
+    Routes that change ownership or membership call ``invalidate`` so the
+    current process sees the change immediately, and routes that write check
+    with ``fresh=True`` so they never act on a grant revoked elsewhere.
+    """
+
+    def __init__(self, maxsize=10000, ttl=10.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = {}  # (wallet_id, user_id) -> (expires_at, role)
+
+    def configure(self, app):
+        self.maxsize = app.config["WALLET_ACCESS_CACHE_SIZE"]
+        self.ttl = app.config["WALLET_ACCESS_CACHE_TTL"]
+        self.clear()
+
+    def get(self, wallet_id, user_id):
+        with self._lock:
+            entry = self._entries.get((wallet_id, user_id))
+            if entry is None:
+                return None
+            if entry[0] <= self._clock():
+                del self._entries[(wallet_id, user_id)]
+                return None
+            return entry[1]
+
+    def put(self, wallet_id, user_id, role):
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            if len(self._entries) >= self.maxsize:
+                now = self._clock()
+                self._entries = {key: e for key, e in self._entries.items() if e[0] > now}
+                if len(self._entries) >= self.maxsize:
+                    self._entries.clear()
+            self._entries[(wallet_id, user_id)] = (self._clock() + self.ttl, role)
+
+    def invalidate(self, wallet_id, user_id=None):
+        with self._lock:
+            if user_id is not None:
+                self._entries.pop((wallet_id, user_id), None)
+            else:
+                self._entries = {key: e for key, e in self._entries.items() if key[0] != wallet_id}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+access_cache = WalletAccessCache()
+
+
+def wallet_role(wallet_id, user_id, fresh=False):
+    """Return ``OWNER``, ``MEMBER`` or None for ``user_id`` on ``wallet_id``.
+
+    Answered with one query over the wallets and wallet_members primary keys,
+    and cached for the rest of the request and briefly for the process.
+    ``fresh`` skips both caches and asks the database.
+    """
+    key = (str(wallet_id), str(user_id))
+    request_cache = _request_cache()
+    if key in request_cache and not fresh:
+        return request_cache[key]
+
+    role = None if fresh else access_cache.get(*key)
+    if role is None:
+        role = _query_role(*key)
+        if role is not None:
+            access_cache.put(*key, role)
+        elif fresh:
+            access_cache.invalidate(*key)
+    request_cache[key] = role
+    return role
+
+
+def can_access(wallet_id, user_id, require_owner=False, fresh=False):
+    role = wallet_role(wallet_id, user_id, fresh=fresh)
+    return role == OWNER if require_owner else role is not None
+
+
+def invalidate(wallet_id, user_id=None):
+    """Forget cached roles for a wallet, or for one user on it."""
+    wallet_id = str(wallet_id)
+    access_cache.invalidate(wallet_id, None if user_id is None else str(user_id))
+    request_cache = _request_cache()
+    for key in list(request_cache):
+        if key[0] == wallet_id and (user_id is None or key[1] == str(user_id)):
+            del request_cache[key]
+
+
+def _query_role(wallet_id, user_id):
+    is_member = exists().where(
+        and_(WalletMember.wallet_id == Wallet.id, WalletMember.user_id == user_id)
+    )
+    return db.session.execute(
+        select(case((Wallet.owner_id == user_id, OWNER), (is_member, MEMBER))).where(
+            Wallet.id == wallet_id
+        )
+    ).scalar()
+
+
+def _request_cache():
+    if not has_app_context():
+        return {}
+    if "wallet_roles" not in g:
+        g.wallet_roles = {}
+    return g.wallet_roles
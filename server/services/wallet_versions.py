@@ -0,0 +1,83 @@
+import hashlib
+from functools import wraps
+
+from extensions import db
+from flask import current_app, make_response, request
+from flask_jwt_extended import get_jwt_identity
+from models import Wallet, WalletMember
+from services import wallet_access
+from sqlalchemy import or_, select, update
+
+
+def bump(*wallet_ids):
+    """Advance the data version of ``wallet_ids`` in the current transaction.
+
+    Call it next to every write that changes what a wallet-scoped GET returns,
+    before committing, so the new version becomes visible with the data.
+    Concurrent bumps of one wallet serialize on its row, so versions only grow.
+    """
+    if wallet_ids:
+        _bump(Wallet.id.in_(wallet_ids))
+
+
+def bump_for_user(user_id):
+    """Advance every wallet ``user_id`` owns or belongs to, e.g. after a profile change."""
+    shared = select(WalletMember.wallet_id).where(WalletMember.user_id == user_id)
+    _bump(or_(Wallet.owner_id == user_id, Wallet.id.in_(shared)))
+
+
+def bump_all():
+    _bump(None)
+
+
+def _bump(where):
+    stmt = update(Wallet).values(data_version=Wallet.data_version + 1)
+    if where is not None:
+        stmt = stmt.where(where)
+    db.session.execute(stmt, execution_options={"synchronize_session": False})
+
+
+def current(wallet_id):
+    return db.session.execute(
+        select(Wallet.data_version).where(Wallet.id == wallet_id)
+    ).scalar()
+
+
+def etag(wallet_id, user_id, version):
+    """Weak ETag for this request: the wallet's version plus who asked for which URL."""
+    digest = hashlib.sha1(f"{user_id}\0{wallet_id}\0{request.full_path}".encode()).hexdigest()
+    return f"{version}-{digest[:16]}"
+
+
+def conditional(view):
+    """Answer a wallet-scoped GET with 304 when the client's ETag is current.
+
+    Goes under ``jwt_required``. The version is read before the view runs, so
+    a write that commits in between only makes the tag older than the body and
+    the next request fetches again. Denied requests go straight to the view,
+    which reports them as usual without exposing the version.
+    """
+
+    @wraps(view)
+    def wrapper(**kwargs):
+        wallet_id = kwargs["wallet_id"]
+        user_id = get_jwt_identity()
+        if not wallet_access.can_access(wallet_id, user_id):
+            return view(**kwargs)
+        version = current(wallet_id)
+        if version is None:
+            return view(**kwargs)
+
+        tag = etag(wallet_id, user_id, version)
+        if request.if_none_match.contains_weak(tag):
+            response = current_app.response_class(status=304)
+        else:
+            response = make_response(view(**kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(tag, weak=True)
+        # Cacheable by the browser only, and revalidated on every use.
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
+
+    return wrapper
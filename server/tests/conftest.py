@@ -25,6 +25,9 @@ def app(tmp_path, monkeypatch):
     monkeypatch.setenv("JWT_SECRET_KEY", "test-jwt-secret-that-is-at-least-thirty-two-bytes-long")
     monkeypatch.setenv("CORS_ORIGINS", "http://localhost")
     monkeypatch.setenv("UPLOAD_FOLDER", str(upload_dir))
+    # Tests drive the OCR queue explicitly through run_pending().
+    monkeypatch.setenv("OCR_WORKER_THREADS", "0")
+    monkeypatch.setenv("OCR_METRICS_TOKEN", "test-metrics-token")
 
     import app as app_module
 
@@ -36,6 +39,13 @@ def app(tmp_path, monkeypatch):
         db.drop_all()
         db.create_all()
 
+    # Tests install fake providers per test; never reuse a cached service.
+    from ocr.health import provider_health
+    from ocr.registry import reload_providers
+
+    reload_providers()
+    provider_health.reset()
+
     yield test_app
 
     with test_app.app_context():
@@ -0,0 +1,117 @@
+import types
+
+from ocr.azure_ocr import AzureOCR
+from ocr.metrics import PollRecorder
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeReadClient:
+    def __init__(self, statuses, headers=None, request_latency=0.0, clock=None):
+        self.statuses = list(statuses)
+        self.headers = headers or {}
+        self.request_latency = request_latency
+        self.clock = clock
+        self.polls = 0
+
+    def read_in_stream(self, stream, raw=True):
+        return types.SimpleNamespace(headers={"Operation-Location": "https://x/operations/op-1"})
+
+    def get_read_result(self, operation_id, raw=False):
+        assert operation_id == "op-1"
+        assert raw is True
+        if self.clock:
+            self.clock.now += self.request_latency
+        status = self.statuses[min(self.polls, len(self.statuses) - 1)]
+        self.polls += 1
+        lines = [types.SimpleNamespace(text="TOTAL 1000")]
+        output = types.SimpleNamespace(
+            status=status,
+            analyze_result=types.SimpleNamespace(read_results=[types.SimpleNamespace(lines=lines)]),
+        )
+        return types.SimpleNamespace(output=output, response=types.SimpleNamespace(headers=self.headers))
+
+
+def make_ocr(client, clock, monkeypatch, deadline="30"):
+    monkeypatch.setenv("AZURE_OCR_POLL_DEADLINE", deadline)
+    return AzureOCR(client=client, sleep=clock.sleep, clock=clock)
+
+
+def receipt(tmp_path):
+    path = tmp_path / "receipt.jpg"
+    path.write_bytes(b"fake")
+    return str(path)
+
+
+def test_azure_ocr_fast_result_needs_no_sleep(tmp_path, monkeypatch):
+    clock = FakeClock()
+    ocr = make_ocr(FakeReadClient(["succeeded"]), clock, monkeypatch)
+
+    result = ocr.extract_text(receipt(tmp_path))
+
+    assert result["success"] is True
+    assert result["text"] == "TOTAL 1000"
+    assert clock.sleeps == []
+    assert len(result["timing"]["attempts"]) == 1
+
+
+def test_azure_ocr_backs_off_exponentially(tmp_path, monkeypatch):
+    clock = FakeClock()
+    client = FakeReadClient(["notStarted", "running", "running", "running", "running", "succeeded"])
+    ocr = make_ocr(client, clock, monkeypatch)
+
+    result = ocr.extract_text(receipt(tmp_path))
+
+    assert result["success"] is True
+    assert clock.sleeps == [0.2, 0.4, 0.8, 1.6, 2.0]
+    assert [a["status"] for a in result["timing"]["attempts"]][-1] == "succeeded"
+
+
+def test_azure_ocr_honours_retry_after(tmp_path, monkeypatch):
+    clock = FakeClock()
+    client = FakeReadClient(["running", "succeeded"], headers={"Retry-After": "1"})
+    ocr = make_ocr(client, clock, monkeypatch)
+
+    assert ocr.extract_text(receipt(tmp_path))["success"] is True
+    assert clock.sleeps == [1.0]
+
+
+def test_azure_ocr_gives_up_at_deadline(tmp_path, monkeypatch):
+    clock = FakeClock()
+    client = FakeReadClient(["running"], request_latency=0.1, clock=clock)
+    ocr = make_ocr(client, clock, monkeypatch, deadline="3")
+
+    result = ocr.extract_text(receipt(tmp_path))
+
+    assert result["success"] is False
+    assert "did not finish within 3s" in result["error"]
+    assert result["timing"]["status"] == "timeout"
+    assert clock.now <= 3.0 + 0.1 + 1e-9
+    assert client.polls < 10
+
+
+def test_poll_recorder_summary():
+    recorder = PollRecorder()
+    assert recorder.summary() == {"operations": 0}
+
+    for total in (100.0, 200.0, 300.0, 400.0):
+        recorder.record({"status": "succeeded", "total_ms": total, "attempts": [{}, {}]})
+    recorder.record({"status": "timeout", "total_ms": 30000.0, "attempts": [{}] * 8})
+
+    summary = recorder.summary()
+    assert summary["operations"] == 5
+    assert summary["timed_out"] == 1
+    assert summary["p50_ms"] == 300.0
+    assert summary["max_ms"] == 30000.0
+    assert summary["mean_polls"] == 3.2
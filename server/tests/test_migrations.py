@@ -0,0 +1,70 @@
+from pathlib import Path
+
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from flask_migrate import downgrade, upgrade
+from sqlalchemy import inspect, text
+
+from extensions import db
+
+MIGRATIONS = str(Path(__file__).resolve().parent.parent / "migrations")
+BASELINE = "b2ee60d531c8"
+
+
+@pytest.fixture()
+def empty_db(app):
+    with app.app_context():
+        db.drop_all()
+        db.session.execute(text("DROP TABLE IF EXISTS alembic_version"))
+        db.session.commit()
+        yield
+        db.session.remove()
+        db.session.execute(text("DROP TABLE IF EXISTS alembic_version"))
+        db.session.commit()
+        db.drop_all()
+        db.create_all()
+
+
+def test_migrations_build_the_model_schema(empty_db):
+    upgrade(directory=MIGRATIONS)
+
+    with db.engine.connect() as conn:
+        diffs = compare_metadata(MigrationContext.configure(conn), db.metadata)
+    assert diffs == []
+
+    downgrade(directory=MIGRATIONS, revision="base")
+    assert inspect(db.engine).get_table_names() == ["alembic_version"]
+
+
+def test_upgrade_converts_a_database_created_by_the_baseline_app(empty_db):
+    # The baseline app created its tables with db.create_all() and never
+    # stamped an Alembic version.
+    upgrade(directory=MIGRATIONS, revision=BASELINE)
+    with db.engine.begin() as conn:
+        conn.execute(text("DROP TABLE alembic_version"))
+        conn.execute(text("""
+            INSERT INTO users (id, email, name, password_hash)
+            VALUES ('8c7f2d58-0e6a-4c3b-9d2e-0f4f6b9f3a11', 'old@example.com', 'Old', 'x');
+            INSERT INTO wallets (id, name, type, owner_id)
+            VALUES ('5b0a4a3e-7a55-4a0b-8f9b-6c2b1d3e4f50', 'Old wallet', 'personal',
+                    '8c7f2d58-0e6a-4c3b-9d2e-0f4f6b9f3a11');
+            INSERT INTO transactions (id, wallet_id, amount, currency, category, date, created_by)
+            VALUES ('0f1e2d3c-4b5a-4978-8a6b-5c4d3e2f1a00', '5b0a4a3e-7a55-4a0b-8f9b-6c2b1d3e4f50',
+                    -12.50, 'HUF', 'Food', '2023-05-04 12:00', '8c7f2d58-0e6a-4c3b-9d2e-0f4f6b9f3a11');
+            INSERT INTO ocr_jobs (id, user_id, image_path, status)
+            VALUES ('1a2b3c4d-5e6f-4a7b-8c9d-0e1f2a3b4c5d', '8c7f2d58-0e6a-4c3b-9d2e-0f4f6b9f3a11',
+                    'receipt.jpg', 'completed');
+        """))
+
+    upgrade(directory=MIGRATIONS)
+
+    columns = {column["name"]: column["type"] for column in inspect(db.engine).get_columns("transactions")}
+    assert columns["id"].__visit_name__ == "UUID"
+    with db.engine.connect() as conn:
+        rollup = conn.execute(text("SELECT month, total, transaction_count FROM wallet_monthly_rollups")).one()
+        job = conn.execute(text("SELECT attempts, batch_id FROM ocr_jobs")).one()
+        version = conn.execute(text("SELECT data_version FROM wallets")).scalar()
+    assert (str(rollup.month), float(rollup.total), rollup.transaction_count) == ("2023-05-01", -12.5, 1)
+    assert (job.attempts, job.batch_id) == (0, None)
+    assert version == 0
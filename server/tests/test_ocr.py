@@ -1,5 +1,6 @@
 import sys
 from io import BytesIO
+from pathlib import Path
 import types
 
 
@@ -15,8 +16,21 @@ def get_auth_token(client, email, name, password="password123"):
     return login_resp.get_json()["access_token"]
 
 
+METRICS_HEADERS = {"X-Metrics-Token": "test-metrics-token"}
+
+
+def tmp_upload_dir(client):
+    return Path(client.application.config["UPLOAD_FOLDER"])
+
+
 def mock_smart_receipt_service(monkeypatch, result=None, error=None):
     class FakeService:
+        def __init__(self, **kwargs):
+            pass
+
+        def shutdown(self, wait=True):
+            pass
+
         def process(self, path):
             if error:
                 raise error
@@ -60,10 +74,17 @@ def test_ocr_process_success_and_jobs(client, monkeypatch):
         content_type="multipart/form-data",
         headers={"Authorization": f"Bearer {token}"},
     )
-    assert resp.status_code == 201
+    assert resp.status_code == 202
     job = resp.get_json()["job"]
-    assert job["status"] == "completed"
-    assert job["raw_text"] == "text"
+    assert job["status"] == "pending"
+
+    pending_resp = client.get(
+        f"/api/ocr/jobs/{job['id']}",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert pending_resp.get_json()["job"]["queue_position"] == 0
+
+    assert client.application.extensions["ocr_workers"].run_pending() == 1
 
     jobs_resp = client.get(
         "/api/ocr/jobs",
@@ -79,6 +100,13 @@ def test_ocr_process_success_and_jobs(client, monkeypatch):
         headers={"Authorization": f"Bearer {token}"},
     )
     assert get_resp.status_code == 200
+    completed = get_resp.get_json()["job"]
+    assert completed["status"] == "completed"
+    assert completed["raw_text"] == "text"
+    assert completed["started_at"] is not None
+    assert completed["preprocessing"]["bytes_before"] == len(b"fake")
+    assert "queue_position" not in completed
+    assert not list((tmp_upload_dir(client)).iterdir())
 
     del_resp = client.delete(
         f"/api/ocr/jobs/{job_id}",
@@ -98,8 +126,19 @@ def test_ocr_process_failure(client, monkeypatch):
         content_type="multipart/form-data",
         headers={"Authorization": f"Bearer {token}"},
     )
-    assert resp.status_code == 500
-    assert resp.get_json()["error"] == "OCR processing failed"
+    assert resp.status_code == 202
+    job_id = resp.get_json()["job"]["id"]
+
+    client.application.extensions["ocr_workers"].run_pending()
+
+    job = client.get(
+        f"/api/ocr/jobs/{job_id}",
+        headers={"Authorization": f"Bearer {token}"},
+    ).get_json()["job"]
+    assert job["status"] == "failed"
+    assert job["error"] == "boom"
+    assert job["completed_at"] is not None
+    assert not list((tmp_upload_dir(client)).iterdir())
 
 
 def test_ocr_confirm_receipt_errors(client):
@@ -159,3 +198,353 @@ def test_ocr_confirm_receipt_success(client):
     assert tx["category"] == "Food"
     assert tx["amount"] == 12.5
     assert tx["description"] == "Store"
+
+
+def test_ocr_stale_processing_job_is_reclaimed(client, monkeypatch):
+    from datetime import datetime, timedelta
+
+    from extensions import db
+    from models import OCRJob
+
+    token = get_auth_token(client, "ocr7@example.com", "OCR Seven")
+    mock_smart_receipt_service(monkeypatch)
+
+    resp = client.post(
+        "/api/ocr/process",
+        data={"file": (BytesIO(b"fake"), "receipt.jpg")},
+        content_type="multipart/form-data",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    job_id = resp.get_json()["job"]["id"]
+
+    # Simulate a worker that died mid-job.
+    with client.application.app_context():
+        job = db.session.get(OCRJob, job_id)
+        job.status = "processing"
+        job.attempts = 1
+        job.started_at = datetime.utcnow() - timedelta(hours=1)
+        db.session.commit()
+
+    assert client.application.extensions["ocr_workers"].run_pending() == 1
+
+    job = client.get(
+        f"/api/ocr/jobs/{job_id}",
+        headers={"Authorization": f"Bearer {token}"},
+    ).get_json()["job"]
+    assert job["status"] == "completed"
+
+
+def test_ocr_duplicate_upload_reuses_completed_job(client, monkeypatch):
+    token = get_auth_token(client, "ocr8@example.com", "OCR Eight")
+    headers = {"Authorization": f"Bearer {token}"}
+    calls = []
+
+    class CountingService:
+        def __init__(self, **kwargs):
+            pass
+
+        def shutdown(self, wait=True):
+            pass
+
+        def process(self, path):
+            calls.append(path)
+            return {"ocr_text": "cached text", "parsed_data": {"total_amount": 42}}
+
+    monkeypatch.setitem(
+        sys.modules, "ocr.smart_receipt_service", types.SimpleNamespace(SmartReceiptService=CountingService)
+    )
+
+    def upload(content):
+        return client.post(
+            "/api/ocr/process",
+            data={"file": (BytesIO(content), "receipt.jpg")},
+            content_type="multipart/form-data",
+            headers=headers,
+        )
+
+    first = upload(b"same receipt bytes")
+    assert first.status_code == 202
+    assert first.get_json()["cached"] is False
+    client.application.extensions["ocr_workers"].run_pending()
+
+    before = client.get("/api/ocr/metrics", headers=METRICS_HEADERS).get_json()["dedup"]
+
+    second = upload(b"same receipt bytes")
+    assert second.status_code == 201
+    body = second.get_json()
+    assert body["cached"] is True
+    assert body["job"]["status"] == "completed"
+    assert body["job"]["raw_text"] == "cached text"
+    assert body["job"]["extracted_data"] == {"total_amount": 42}
+    assert body["job"]["id"] != first.get_json()["job"]["id"]
+    assert not list(tmp_upload_dir(client).iterdir())
+
+    third = upload(b"different bytes")
+    assert third.status_code == 202
+    client.application.extensions["ocr_workers"].run_pending()
+    assert len(calls) == 2
+
+    after = client.get("/api/ocr/metrics", headers=METRICS_HEADERS).get_json()["dedup"]
+    assert after["hits"] == before["hits"] + 1
+    assert after["misses"] == before["misses"] + 1
+
+
+def test_ocr_dedup_respects_max_age(client, monkeypatch):
+    token = get_auth_token(client, "ocr9@example.com", "OCR Nine")
+    headers = {"Authorization": f"Bearer {token}"}
+    mock_smart_receipt_service(monkeypatch)
+    client.application.config["OCR_DEDUP_MAX_AGE_HOURS"] = 0
+
+    for _ in range(2):
+        resp = client.post(
+            "/api/ocr/process",
+            data={"file": (BytesIO(b"identical"), "receipt.jpg")},
+            content_type="multipart/form-data",
+            headers=headers,
+        )
+        assert resp.status_code == 202
+        client.application.extensions["ocr_workers"].run_pending()
+
+
+def test_ocr_provider_registry_reuses_service_until_config_changes(monkeypatch):
+    from ocr.registry import get_receipt_service, reload_providers
+
+    built = []
+    shutdowns = []
+
+    class FakeService:
+        def __init__(self, session=None, **kwargs):
+            built.append(session)
+
+        def shutdown(self, wait=True):
+            shutdowns.append((self, wait))
+
+    monkeypatch.setitem(sys.modules, "ocr.smart_receipt_service", types.SimpleNamespace(SmartReceiptService=FakeService))
+    monkeypatch.setenv("OCR_HTTP_POOL_SIZE", "4")
+    reload_providers()
+
+    first = get_receipt_service()
+    assert get_receipt_service() is first
+    assert len(built) == 1
+    adapter = built[0].get_adapter("https://api.ocr.space")
+    assert adapter._pool_maxsize == 4
+
+    monkeypatch.setenv("OCR_API_KEY", "rotated-key")
+    assert get_receipt_service() is not first
+    assert len(built) == 2
+    # The replaced instance releases its threads without waiting for callers.
+    assert shutdowns == [(first, False)]
+
+    reload_providers()
+    get_receipt_service()
+    assert len(built) == 3
+    reload_providers()
+
+
+def test_ocr_metrics_expose_provider_breakers(client):
+    from ocr.health import provider_health
+
+    token = get_auth_token(client, "ocr11@example.com", "OCR Eleven")
+    provider_health.breaker("ocr_space").record(False, 0.5)
+
+    providers = client.get("/api/ocr/metrics", headers=METRICS_HEADERS).get_json()["providers"]
+
+    assert providers["ocr_space"]["state"] == "closed"
+    assert providers["ocr_space"]["failures"] == 1
+    assert providers["ocr_space"]["mean_latency_ms"] == 500.0
+
+    # Signed-in users are not operators.
+    assert client.get("/api/ocr/metrics", headers={"Authorization": f"Bearer {token}"}).status_code == 403
+    assert client.get("/api/ocr/metrics", headers={"X-Metrics-Token": "guess"}).status_code == 403
+    client.application.config["OCR_METRICS_TOKEN"] = None
+    assert client.get("/api/ocr/metrics", headers=METRICS_HEADERS).status_code == 404
+
+
+def upload_batch(client, token, files):
+    return client.post(
+        "/api/ocr/batch",
+        data={"files": [(BytesIO(content), name) for name, content in files]},
+        content_type="multipart/form-data",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+
+def test_ocr_batch_creates_one_job_per_file(client, monkeypatch):
+    token = get_auth_token(client, "batch1@example.com", "Batch One")
+    mock_smart_receipt_service(monkeypatch)
+
+    resp = upload_batch(client, token, [("a.jpg", b"one"), ("b.png", b"two"), ("c.pdf", b"three")])
+    assert resp.status_code == 202
+    body = resp.get_json()
+    assert [job["filename"] for job in body["jobs"]] == ["a.jpg", "b.png", "c.pdf"]
+    assert body["batch"]["status"] == "processing"
+    assert body["batch"]["counts"]["pending"] == 3
+    assert not list(tmp_upload_dir(client).iterdir())
+
+    assert client.application.extensions["ocr_workers"].run_pending() == 3
+
+    batch = client.get(
+        f"/api/ocr/batches/{body['batch']['id']}",
+        headers={"Authorization": f"Bearer {token}"},
+    ).get_json()["batch"]
+    assert batch["status"] == "completed"
+    assert batch["total"] == 3
+    assert batch["counts"]["completed"] == 3
+    assert {job["id"] for job in batch["jobs"]} == {job["id"] for job in body["jobs"]}
+    assert all(job["batch_id"] == batch["id"] for job in batch["jobs"])
+
+    other = get_auth_token(client, "batch2@example.com", "Batch Two")
+    hidden = client.get(
+        f"/api/ocr/batches/{batch['id']}",
+        headers={"Authorization": f"Bearer {other}"},
+    )
+    assert hidden.status_code == 404
+
+
+def test_ocr_batch_rejects_invalid_files(client):
+    token = get_auth_token(client, "batch3@example.com", "Batch Three")
+
+    resp = upload_batch(client, token, [("a.jpg", b"one"), ("notes.txt", b"two")])
+    assert resp.status_code == 400
+    assert resp.get_json()["files"] == ["notes.txt"]
+
+    empty = client.post(
+        "/api/ocr/batch",
+        data={},
+        content_type="multipart/form-data",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert empty.status_code == 400
+    assert not list(tmp_upload_dir(client).iterdir())
+
+
+def test_ocr_batch_allows_larger_request_than_single_upload(client, monkeypatch):
+    token = get_auth_token(client, "batch4@example.com", "Batch Four")
+    client.application.config["MAX_CONTENT_LENGTH"] = 1024
+    client.application.config["OCR_BATCH_MAX_BYTES"] = 10 * 1024
+
+    single = client.post(
+        "/api/ocr/process",
+        data={"file": (BytesIO(b"x" * 2048), "big.jpg")},
+        content_type="multipart/form-data",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert single.status_code == 413
+
+    ok = upload_batch(client, token, [("a.jpg", b"a" * 900), ("b.jpg", b"b" * 900)])
+    assert ok.status_code == 202
+
+    too_big = upload_batch(client, token, [("a.jpg", b"a" * 2048)])
+    assert too_big.status_code == 413
+    assert too_big.get_json()["files"] == ["a.jpg"]
+
+
+def test_ocr_workers_cap_jobs_per_user(client, monkeypatch):
+    from extensions import db
+    from models import OCRJob
+
+    token = get_auth_token(client, "batch5@example.com", "Batch Five")
+    other = get_auth_token(client, "batch6@example.com", "Batch Six")
+    upload_batch(client, token, [(f"{i}.jpg", bytes([i])) for i in range(3)])
+    upload_batch(client, other, [("x.jpg", b"other")])
+
+    pool = client.application.extensions["ocr_workers"]
+    pool.per_user_limit = 2
+    with client.application.app_context():
+        claimed = [pool._claim_next_job() for _ in range(4)]
+        users = [db.session.get(OCRJob, job_id).user_id for job_id in claimed if job_id]
+
+    # The first user's third job waits until one of their two running jobs is done.
+    assert claimed[3] is None
+    assert len(users) == 3
+    assert len(set(users)) == 2
+
+
+def test_ocr_jobs_keep_their_upload_in_the_database(client, monkeypatch):
+    from models import OCRJobPayloadChunk
+    from ocr import jobs
+
+    monkeypatch.setattr(jobs, "PAYLOAD_CHUNK_SIZE", 5)
+    token = get_auth_token(client, "payload@example.com", "Payload")
+    seen = []
+
+    class ReadingService:
+        def __init__(self, **kwargs):
+            pass
+
+        def shutdown(self, wait=True):
+            pass
+
+        def process(self, path):
+            seen.append(Path(path).read_bytes())
+            return {"ocr_text": "text", "parsed_data": {"total": 10}}
+
+    monkeypatch.setitem(sys.modules, "ocr.smart_receipt_service", types.SimpleNamespace(SmartReceiptService=ReadingService))
+
+    resp = client.post(
+        "/api/ocr/process",
+        data={"file": (BytesIO(b"receipt bytes"), "receipt.pdf")},
+        content_type="multipart/form-data",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert resp.status_code == 202
+    # Nothing stays on this process's disk, so any worker process can take the job.
+    assert not list(tmp_upload_dir(client).iterdir())
+    with client.application.app_context():
+        chunks = OCRJobPayloadChunk.query.filter_by(job_id=resp.get_json()["job"]["id"]).order_by(OCRJobPayloadChunk.seq)
+        assert [chunk.data for chunk in chunks] == [b"recei", b"pt by", b"tes"]
+
+    assert client.application.extensions["ocr_workers"].run_pending() == 1
+    assert seen == [b"receipt bytes"]
+    assert not list(tmp_upload_dir(client).iterdir())
+    with client.application.app_context():
+        assert OCRJobPayloadChunk.query.count() == 0
+
+
+def test_ocr_workers_start_with_the_first_request(app, client, monkeypatch):
+    pool = app.extensions["ocr_workers"]
+    starts = []
+    monkeypatch.setattr(pool, "start", lambda: starts.append(True))
+
+    result = app.test_cli_runner().invoke(args=["rollups", "verify"])
+    assert result.exit_code == 0
+    assert starts == []
+
+    client.get("/api/ocr/jobs")
+    client.get("/api/ocr/jobs")
+    assert starts == [True]
+
+    result = app.test_cli_runner().invoke(args=["ocr", "worker", "--threads", "0"])
+    assert result.exit_code == 2
+
+
+def test_ocr_dedup_skips_jobs_completed_without_a_result(client, monkeypatch):
+    token = get_auth_token(client, "ocr-empty@example.com", "OCR Empty")
+    headers = {"Authorization": f"Bearer {token}"}
+    wallet_id = client.post("/api/wallets", json={"name": "OCR", "type": "personal"}, headers=headers).get_json()["wallet"]["id"]
+    mock_smart_receipt_service(monkeypatch, result={"ocr_text": "unreadable", "parsed_data": None})
+
+    def upload(content):
+        return client.post(
+            "/api/ocr/process",
+            data={"file": (BytesIO(content), "receipt.jpg")},
+            content_type="multipart/form-data",
+            headers=headers,
+        )
+
+    # Parsed to nothing by the worker.
+    upload(b"blurry receipt")
+    client.application.extensions["ocr_workers"].run_pending()
+    # Marked completed by /confirm before any worker ran.
+    job_id = upload(b"confirmed early").get_json()["job"]["id"]
+    confirm = client.post(
+        "/api/ocr/confirm",
+        json={"wallet_id": wallet_id, "job_id": job_id, "amount": 5, "category": "Food", "date": "2023-01-01T12:00:00"},
+        headers=headers,
+    )
+    assert confirm.status_code == 201
+
+    for content in (b"blurry receipt", b"confirmed early"):
+        resp = upload(content)
+        assert resp.status_code == 202
+        assert resp.get_json()["cached"] is False
@@ -0,0 +1,130 @@
+import types
+
+from ocr.parse_cache import ParseCache, cache_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeCompletions:
+    def __init__(self, content='{"merchant": "Tesco", "total_amount": 1234}'):
+        self.content = content
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        message = types.SimpleNamespace(content=self.content)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+
+def make_parser(monkeypatch, cache, completions):
+    from ocr.groq_parser import GroqParser
+
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    parser = GroqParser(cache=cache)
+    parser.client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions))
+    return parser
+
+
+def test_cache_key_normalizes_whitespace_and_case():
+    assert cache_key("m", "TESCO  Zrt.\n\nÖSSZESEN 1 234") == cache_key("m", "tesco zrt. összesen 1 234")
+    assert cache_key("m", "a" * 3000 + "tail one") == cache_key("m", "a" * 3000 + "tail two")
+    assert cache_key("m", "text") != cache_key("other-model", "text")
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ParseCache(maxsize=2)
+    cache.put("a", "m", {"v": 1}, 100)
+    cache.put("b", "m", {"v": 2}, 100)
+    assert cache.get("a") == {"v": 1}
+
+    cache.put("c", "m", {"v": 3}, 100)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1}
+    assert cache.get("c") == {"v": 3}
+
+
+def test_cache_expires_entries():
+    clock = FakeClock()
+    cache = ParseCache(ttl=60, clock=clock)
+    cache.put("a", "m", {"v": 1}, 100)
+
+    clock.now += 61
+
+    assert cache.get("a") is None
+
+
+def test_cache_returns_copies():
+    cache = ParseCache()
+    cache.put("a", "m", {"items": []}, 100)
+
+    cache.get("a")["items"].append("mutated")
+
+    assert cache.get("a") == {"items": []}
+
+
+def test_groq_parser_reuses_cached_result(monkeypatch):
+    cache = ParseCache()
+    completions = FakeCompletions()
+    parser = make_parser(monkeypatch, cache, completions)
+
+    first = parser.parse("TESCO\nÖSSZESEN 1 234")
+    second = parser.parse("tesco   összesen 1 234")
+
+    assert first["data"] == second["data"] == {"merchant": "Tesco", "total_amount": 1234}
+    assert second["cached"] is True
+    assert completions.calls == 1
+    stats = cache.snapshot()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
+    assert stats["saved_ms"] >= 0
+
+
+def test_groq_parser_does_not_cache_failures(monkeypatch):
+    cache = ParseCache()
+    completions = FakeCompletions(content="not json")
+    parser = make_parser(monkeypatch, cache, completions)
+
+    assert parser.parse("text")["success"] is False
+    assert parser.parse("text")["success"] is False
+    assert completions.calls == 2
+
+
+def test_cache_persists_across_instances(app):
+    first = ParseCache()
+    first.configure(app)
+    first.put(cache_key("m", "receipt"), "m", {"total_amount": 42}, 350.0)
+
+    restarted = ParseCache()
+    restarted.configure(app)
+
+    assert restarted.get(cache_key("m", "receipt")) == {"total_amount": 42}
+    assert restarted.snapshot()["saved_ms"] == 350.0
+
+
+def test_cache_prunes_persisted_entries_to_maxsize(app):
+    from extensions import db
+    from models import ParseCacheEntry
+
+    cache = ParseCache()
+    cache.configure(app)
+    cache.maxsize = 2
+    for text in ("first", "second", "third"):
+        cache.put(cache_key("m", text), "m", {"merchant": text}, 10.0)
+
+    with app.app_context():
+        keys = {key for (key,) in db.session.query(ParseCacheEntry.key)}
+    assert keys == {cache_key("m", "second"), cache_key("m", "third")}
+
+
+def test_ocr_metrics_report_parse_cache(client):
+    metrics = client.get("/api/ocr/metrics", headers={"X-Metrics-Token": "test-metrics-token"}).get_json()
+
+    assert metrics["llm_parse_cache"]["hits"] == 0
@@ -0,0 +1,72 @@
+from PIL import Image
+
+from ocr.preprocess import ImagePreprocessor
+
+
+def write_photo(path, size=(4000, 3000), orientation=None, fmt="JPEG"):
+    img = Image.effect_noise(size, 64).convert("RGB")
+    kwargs = {}
+    if orientation:
+        exif = Image.Exif()
+        exif[0x0112] = orientation
+        kwargs["exif"] = exif.tobytes()
+    img.save(path, format=fmt, **kwargs)
+    return path
+
+
+def test_preprocess_downscales_and_grayscales_jpeg(tmp_path):
+    path = write_photo(tmp_path / "receipt.jpg")
+    preprocessor = ImagePreprocessor(max_side=1000, threads=1)
+
+    stats = preprocessor.run(str(path))
+
+    assert stats["applied"] is True
+    assert stats["bytes_after"] < stats["bytes_before"]
+    assert stats["duration_ms"] >= 0
+    with Image.open(path) as img:
+        assert img.format == "JPEG"
+        assert img.mode == "L"
+        assert max(img.size) == 1000
+
+
+def test_preprocess_applies_exif_orientation(tmp_path):
+    # Orientation 6: the camera was rotated, the image must be turned upright.
+    path = write_photo(tmp_path / "receipt.jpg", size=(2000, 1000), orientation=6)
+
+    ImagePreprocessor(max_side=1000, threads=1).run(str(path))
+
+    with Image.open(path) as img:
+        assert img.size == (500, 1000)
+
+
+def test_preprocess_keeps_png_format(tmp_path):
+    path = write_photo(tmp_path / "receipt.png", size=(3000, 2000), fmt="PNG")
+
+    stats = ImagePreprocessor(max_side=1500, threads=1).run(str(path))
+
+    assert stats["applied"] is True
+    with Image.open(path) as img:
+        assert img.format == "PNG"
+        assert img.size == (1500, 1000)
+
+
+def test_preprocess_leaves_unreadable_files_alone(tmp_path):
+    path = tmp_path / "receipt.pdf"
+    path.write_bytes(b"%PDF-1.4 not an image")
+
+    stats = ImagePreprocessor(threads=1).run(str(path))
+
+    assert stats["applied"] is False
+    assert stats["bytes_after"] == stats["bytes_before"]
+    assert "error" in stats
+    assert path.read_bytes() == b"%PDF-1.4 not an image"
+
+
+def test_preprocess_disabled(tmp_path):
+    path = write_photo(tmp_path / "receipt.jpg", size=(800, 600))
+    before = path.read_bytes()
+
+    stats = ImagePreprocessor(max_side=0, threads=1).run(str(path))
+
+    assert stats["applied"] is False
+    assert path.read_bytes() == before
@@ -0,0 +1,161 @@
+import os
+
+import pytest
+
+from ocr.parser_eval import evaluate, hybrid, load_corpus, rules_only
+from ocr.rule_parser import RuleBasedParser
+from ocr.smart_receipt_service import SmartReceiptService
+
+CORPUS = os.path.join(os.path.dirname(__file__), "fixtures", "receipts.json")
+
+
+@pytest.fixture(autouse=True)
+def receipt_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "receipt.jpg").write_bytes(b"fake receipt")
+
+
+class FakeLLMParser:
+    def __init__(self, corpus):
+        self.answers = {case["text"]: case["expected"] for case in corpus}
+        self.calls = 0
+
+    def parse(self, text):
+        self.calls += 1
+        return {"success": True, "data": dict(self.answers[text])}
+
+
+class FakeOCR:
+    def __init__(self, text):
+        self.text = text
+
+    def extract_text(self, file_path):
+        return {"success": True, "text": self.text}
+
+
+def test_rule_parser_reads_hungarian_receipt():
+    text = load_corpus(CORPUS)[0]["text"]
+
+    result = RuleBasedParser().parse(text)
+
+    assert result["confidence"] == 1.0
+    data = result["data"]
+    assert data["merchant"] == "TESCO GLOBAL ÁRUHÁZAK ZRT."
+    assert data["total_amount"] == 1234
+    assert data["date"] == "2024-03-15"
+    assert data["tax_amount"] == 213
+    assert data["currency"] == "HUF"
+    assert [item["name"] for item in data["items"]] == ["KENYÉR 1KG", "TEJ 2,8% 1L", "ALMA"]
+
+
+def test_rule_parser_is_unsure_about_garbage():
+    result = RuleBasedParser().parse("~~ . ,\nl1l1 ### ..\n-- --")
+
+    assert result["confidence"] < 0.5
+    assert result["data"]["total_amount"] is None
+
+
+def test_rule_parser_corpus_accuracy():
+    corpus = load_corpus(CORPUS)
+    parser = RuleBasedParser()
+    confident = [case for case in corpus if parser.parse(case["text"])["confidence"] >= 0.8]
+
+    report = evaluate(rules_only(parser), confident)
+
+    # Whatever the rules are confident about must be right.
+    assert len(confident) >= 10
+    assert report["exact"] == 1.0
+    assert report["mean_ms"] < 5
+
+
+def test_hybrid_path_only_calls_llm_for_low_confidence_receipts():
+    corpus = load_corpus(CORPUS)
+    llm = FakeLLMParser(corpus)
+    counter = {}
+    service = SmartReceiptService(providers=[], min_rule_confidence=0.8)
+
+    report = evaluate(hybrid(service, llm, counter), corpus)
+
+    assert report["exact"] == 1.0
+    assert counter["llm_calls"] == llm.calls == 2
+
+
+def test_smart_receipt_service_skips_llm_for_confident_text():
+    corpus = load_corpus(CORPUS)
+    llm = FakeLLMParser(corpus)
+    service = SmartReceiptService(
+        providers=[("ocr_space", {"ocr": FakeOCR(corpus[0]["text"]), "parser": llm})]
+    )
+
+    result = service.process("receipt.jpg")
+
+    assert result["parser"] == "rules"
+    assert result["parsed_data"]["total_amount"] == 1234
+    assert llm.calls == 0
+
+
+def test_smart_receipt_service_falls_back_to_llm():
+    corpus = load_corpus(CORPUS)
+    garbled = next(case for case in corpus if case["name"] == "handwritten_note")
+    llm = FakeLLMParser(corpus)
+    service = SmartReceiptService(
+        providers=[("ocr_space", {"ocr": FakeOCR(garbled["text"]), "parser": llm})]
+    )
+
+    result = service.process("receipt.jpg")
+
+    assert result["parser"] == "llm"
+    assert result["parsed_data"]["total_amount"] == 1000
+    assert llm.calls == 1
+
+
+def test_evaluate_parsers_cli(app):
+    result = app.test_cli_runner().invoke(args=["ocr", "evaluate-parsers", CORPUS])
+
+    assert result.exit_code == 0
+    assert "rules: exact" in result.output
+
+
+def test_evaluate_parsers_cli_rejects_an_empty_corpus(app, tmp_path):
+    empty = tmp_path / "empty.json"
+    empty.write_text("[]")
+    result = app.test_cli_runner().invoke(args=["ocr", "evaluate-parsers", str(empty)])
+
+    assert result.exit_code == 2
+    assert "must be a non-empty JSON list of receipts" in result.output
+
+
+def test_evaluate_scores_each_field_over_the_receipts_that_label_it():
+    corpus = [
+        {"name": "a", "text": "a", "expected": {"total_amount": 10, "merchant": "A"}},
+        {"name": "b", "text": "b", "expected": {"total_amount": 20}},
+    ]
+    answers = {"a": {"total_amount": 10, "merchant": "A"}, "b": {"total_amount": 20}}
+
+    report = evaluate(answers.get, corpus)
+
+    assert report["fields"]["merchant"] == 1.0
+    assert report["fields"]["total_amount"] == 1.0
+    assert report["fields"]["date"] is None
+    assert report["exact"] == 1.0
+
+
+def test_evaluate_parsers_cli_measures_the_llm_without_the_parse_cache(app, monkeypatch):
+    import ocr.groq_parser
+    from ocr.parse_cache import parse_cache
+
+    corpus = load_corpus(CORPUS)
+    caches = []
+
+    class RecordingLLMParser(FakeLLMParser):
+        def __init__(self, cache=None):
+            super().__init__(corpus)
+            caches.append(cache)
+
+    monkeypatch.setattr(ocr.groq_parser, "GroqParser", RecordingLLMParser)
+    result = app.test_cli_runner().invoke(args=["ocr", "evaluate-parsers", CORPUS, "--llm"])
+
+    assert result.exit_code == 0, result.output
+    assert len(caches) == 1
+    assert caches[0] is not parse_cache and not caches[0].enabled
+    assert f"hybrid called the LLM for 2 of {len(corpus)} receipts" in result.output
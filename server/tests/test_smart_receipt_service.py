@@ -0,0 +1,266 @@
+import threading
+import time
+
+import pytest
+
+from ocr.health import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, ProviderHealth
+from ocr.smart_receipt_service import SmartReceiptService
+
+
+@pytest.fixture(autouse=True)
+def receipt_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "receipt.jpg").write_bytes(b"fake receipt")
+
+
+class FakeOCR:
+    def __init__(self, delay=0.0, success=True, text="TOTAL 1000"):
+        self.delay = delay
+        self.success = success
+        self.text = text
+        self.calls = 0
+
+    def extract_text(self, file_path):
+        self.calls += 1
+        time.sleep(self.delay)
+        if not self.success:
+            return {"success": False, "error": "down", "text": ""}
+        return {"success": True, "text": self.text}
+
+
+class FakeParser:
+    def parse(self, text):
+        return {"data": {"raw": text}}
+
+
+class CountingOCR(FakeOCR):
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+
+    def extract_text(self, file_path):
+        with CountingOCR.lock:
+            CountingOCR.active += 1
+            CountingOCR.peak = max(CountingOCR.peak, CountingOCR.active)
+        try:
+            return super().extract_text(file_path)
+        finally:
+            with CountingOCR.lock:
+                CountingOCR.active -= 1
+
+
+def provider(name, ocr):
+    return (name, {"ocr": ocr, "parser": FakeParser()})
+
+
+def test_sequential_mode_falls_back_in_order():
+    first = FakeOCR(success=False)
+    second = FakeOCR(text="second")
+    service = SmartReceiptService(health=ProviderHealth(), providers=[provider("a", first), provider("b", second)])
+
+    result = service.process("receipt.jpg")
+
+    assert result["provider"] == "b"
+    assert first.calls == 1 and second.calls == 1
+
+
+def test_hedged_mode_starts_backup_after_budget():
+    slow = FakeOCR(delay=1.0, text="slow")
+    fast = FakeOCR(delay=0.01, text="fast")
+    service = SmartReceiptService(
+        health=ProviderHealth(),
+        hedge_after=0.05, providers=[provider("slow", slow), provider("fast", fast)]
+    )
+
+    started = time.monotonic()
+    result = service.process("receipt.jpg")
+    elapsed = time.monotonic() - started
+
+    assert result["provider"] == "fast"
+    assert result["ocr_text"] == "fast"
+    assert elapsed < 0.5
+
+
+def test_hedged_mode_does_not_hedge_fast_primary():
+    primary = FakeOCR(delay=0.01, text="primary")
+    backup = FakeOCR(text="backup")
+    service = SmartReceiptService(
+        health=ProviderHealth(),
+        hedge_after=0.5, providers=[provider("primary", primary), provider("backup", backup)]
+    )
+
+    assert service.process("receipt.jpg")["provider"] == "primary"
+    assert backup.calls == 0
+
+
+def test_hedged_mode_moves_on_immediately_after_failure():
+    broken = FakeOCR(success=False)
+    backup = FakeOCR(text="backup")
+    service = SmartReceiptService(
+        health=ProviderHealth(),
+        hedge_after=5, providers=[provider("broken", broken), provider("backup", backup)]
+    )
+
+    started = time.monotonic()
+    result = service.process("receipt.jpg")
+
+    assert result["provider"] == "backup"
+    assert time.monotonic() - started < 1
+
+
+def test_hedged_mode_reports_failure_when_all_fail():
+    service = SmartReceiptService(
+        health=ProviderHealth(),
+        hedge_after=0.01,
+        providers=[provider("a", FakeOCR(success=False)), provider("b", FakeOCR(delay=0.05, success=False))],
+    )
+
+    assert service.process("receipt.jpg") == {"success": False, "error": "All OCR providers failed"}
+
+
+def test_hedged_mode_caps_concurrent_calls():
+    CountingOCR.active = CountingOCR.peak = 0
+    providers = [provider(f"p{i}", CountingOCR(delay=0.1, success=False)) for i in range(3)]
+    providers.append(provider("last", CountingOCR(delay=0.1, text="last")))
+    service = SmartReceiptService(health=ProviderHealth(), hedge_after=0.001, max_concurrent_calls=2, providers=providers)
+
+    threads = [threading.Thread(target=service.process, args=("receipt.jpg",)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert CountingOCR.peak == 2
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_circuit_breaker_opens_and_probes():
+    clock = FakeClock()
+    breaker = CircuitBreaker(min_calls=3, failure_threshold=0.5, open_seconds=30, clock=clock)
+
+    breaker.record(True, 0.1)
+    breaker.record(False, 0.1)
+    assert breaker.state == CLOSED
+    breaker.record(False, 0.1)
+    assert breaker.state == OPEN
+    assert breaker.allow() is False
+
+    clock.now = 31
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() is True
+    assert breaker.allow() is False  # only one probe at a time
+
+    breaker.record(False, 0.1)
+    assert breaker.state == OPEN
+
+    clock.now = 62
+    assert breaker.allow() is True
+    breaker.record(True, 0.1)
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["calls"] == 0
+
+
+def test_circuit_breaker_counts_slow_calls_as_unhealthy():
+    breaker = CircuitBreaker(min_calls=2, failure_threshold=0.5, slow_call_seconds=1)
+
+    breaker.record(True, 5)
+    breaker.record(True, 5)
+
+    assert breaker.state == OPEN
+    assert breaker.snapshot()["failures"] == 0
+
+
+def test_open_circuit_is_skipped():
+    health = ProviderHealth(min_calls=2, open_seconds=60)
+    health.breaker("broken").record(False, 0.1)
+    health.breaker("broken").record(False, 0.1)
+    broken = FakeOCR(text="broken")
+    backup = FakeOCR(text="backup")
+    service = SmartReceiptService(
+        health=health, providers=[provider("broken", broken), provider("backup", backup)]
+    )
+
+    assert service.process("receipt.jpg")["provider"] == "backup"
+    assert SmartReceiptService(
+        health=health, providers=[provider("broken", broken)]
+    ).process("receipt.jpg")["success"] is False
+    assert broken.calls == 0
+    assert health.snapshot()["broken"]["state"] == OPEN
+
+
+def test_providers_are_reordered_by_health():
+    health = ProviderHealth(min_calls=100)
+    flaky = FakeOCR(success=False)
+    steady = FakeOCR(text="steady")
+    service = SmartReceiptService(
+        health=health, providers=[provider("flaky", flaky), provider("steady", steady)]
+    )
+
+    service.process("receipt.jpg")
+    assert [name for name, _ in health.rank(service.providers)] == ["steady", "flaky"]
+
+    service.process("receipt.jpg")
+    assert flaky.calls == 1
+    assert steady.calls == 2
+
+
+class RecordingOCR(FakeOCR):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.sources = []
+
+    def extract_text(self, source):
+        from ocr.uploads import open_receipt
+
+        self.sources.append(source)
+        with open_receipt(source) as f:
+            assert f.name == "receipt.jpg"
+            assert f.read() == b"fake receipt"
+        return super().extract_text(source)
+
+
+def test_providers_share_one_mapping_which_is_closed_afterwards():
+    first = RecordingOCR(success=False)
+    second = RecordingOCR(text="second")
+    service = SmartReceiptService(
+        health=ProviderHealth(), providers=[provider("a", first), provider("b", second)]
+    )
+
+    service.process("receipt.jpg")
+
+    assert first.sources[0] is second.sources[0]
+    assert first.sources[0].closed
+
+
+def test_hedged_call_keeps_mapping_open_until_it_finishes():
+    slow = RecordingOCR(delay=0.3, text="slow")
+    fast = RecordingOCR(text="fast")
+    service = SmartReceiptService(
+        health=ProviderHealth(), hedge_after=0.01, providers=[provider("slow", slow), provider("fast", fast)]
+    )
+
+    assert service.process("receipt.jpg")["provider"] == "fast"
+    upload = fast.sources[0]
+    assert not upload.closed
+
+    time.sleep(0.5)
+    assert upload.closed
+
+
+def test_hedged_mode_keeps_working_after_shutdown():
+    slow = FakeOCR(delay=0.1, success=False)
+    backup = FakeOCR(text="backup")
+    service = SmartReceiptService(
+        health=ProviderHealth(), hedge_after=0.01, providers=[provider("slow", slow), provider("backup", backup)]
+    )
+    service.shutdown(wait=False)
+
+    assert service.process("receipt.jpg")["provider"] == "backup"
+    assert slow.calls == 1
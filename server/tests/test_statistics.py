@@ -25,6 +25,8 @@ def test_statistics_summary_empty(client):
     assert data["income"] == 0.0
     assert data["expenses"] == 0.0
     assert data["transaction_count"] == 0
+    assert data["min_amount"] is None
+    assert data["average_amount"] is None
 
 def test_statistics_summary_with_tx(client):
     token = get_auth_token(client, "s2@example.com", "S2 User")
@@ -46,6 +48,9 @@ def test_statistics_summary_with_tx(client):
     assert data["income"] == 100.0
     assert data["expenses"] == -50.5
     assert data["transaction_count"] == 3
+    assert data["min_amount"] == -40.0
+    assert data["max_amount"] == 100.0
+    assert data["average_amount"] == 16.5
 
 def test_statistics_monthly(client):
     token = get_auth_token(client, "s3@example.com", "S3 User")
@@ -128,3 +133,245 @@ def test_statistics_wallet_not_found(client):
         headers={"Authorization": f"Bearer {token}"},
     )
     assert resp.status_code == 404
+
+
+def test_statistics_rollups_follow_updates_and_deletes(client):
+    token = get_auth_token(client, "s8@example.com", "S8 User")
+    headers = {"Authorization": f"Bearer {token}"}
+    resp_create = client.post("/api/wallets", json={"name": "Wallet S8", "type": "personal"}, headers=headers)
+    wallet_id = resp_create.get_json()["wallet"]["id"]
+
+    resp_tx = client.post(f"/api/wallets/{wallet_id}/transactions", json={"amount": -20, "category": "Food", "date": "2023-01-05T12:00:00"}, headers=headers)
+    tx_id = resp_tx.get_json()["transaction"]["id"]
+    resp_other = client.post(f"/api/wallets/{wallet_id}/transactions", json={"amount": 50, "category": "Salary", "date": "2023-01-06T12:00:00"}, headers=headers)
+    other_id = resp_other.get_json()["transaction"]["id"]
+
+    client.patch(f"/api/wallets/{wallet_id}/transactions/{tx_id}", json={"amount": -35, "category": "Transport", "date": "2023-03-01T09:00:00"}, headers=headers)
+
+    monthly = client.get(f"/api/statistics/{wallet_id}/monthly", headers=headers).get_json()["monthly"]
+    assert [(m["month"], m["total"], m["income"], m["expenses"]) for m in monthly] == [
+        ("2023-01", 50.0, 50.0, 0.0),
+        ("2023-02", 0.0, 0.0, 0.0),
+        ("2023-03", -35.0, 0.0, -35.0),
+    ]
+    cats = client.get(f"/api/statistics/{wallet_id}/categories", headers=headers).get_json()["categories"]
+    assert sorted((c["category"], c["total"]) for c in cats) == [("Salary", 50.0), ("Transport", -35.0)]
+
+    client.delete(f"/api/wallets/{wallet_id}/transactions/{other_id}", headers=headers)
+    monthly = client.get(f"/api/statistics/{wallet_id}/monthly", headers=headers).get_json()["monthly"]
+    assert [m["month"] for m in monthly] == ["2023-03"]
+
+
+def test_statistics_rollups_verify_and_rebuild(app, client):
+    from extensions import db
+    from models import WalletMonthlyRollup
+
+    token = get_auth_token(client, "s9@example.com", "S9 User")
+    headers = {"Authorization": f"Bearer {token}"}
+    resp_create = client.post("/api/wallets", json={"name": "Wallet S9", "type": "personal"}, headers=headers)
+    wallet_id = resp_create.get_json()["wallet"]["id"]
+    client.post(f"/api/wallets/{wallet_id}/transactions", json={"amount": -12.5, "category": "Food", "date": "2023-04-01T12:00:00"}, headers=headers)
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["rollups", "verify"])
+    assert result.exit_code == 0
+    assert "in sync" in result.output
+
+    with app.app_context():
+        db.session.query(WalletMonthlyRollup).update({"total": 999})
+        db.session.commit()
+
+    result = runner.invoke(args=["rollups", "verify", "--wallet", wallet_id])
+    assert result.exit_code != 0
+    assert "Drift" in result.output
+
+    result = runner.invoke(args=["rollups", "verify", "--repair"])
+    assert "Rebuilt 1 rollup rows" in result.output
+    assert runner.invoke(args=["rollups", "verify"]).exit_code == 0
+
+    cats = client.get(f"/api/statistics/{wallet_id}/categories", headers=headers).get_json()["categories"]
+    assert cats == [{"category": "Food", "total": -12.5}]
+
+
+def test_statistics_dashboard_combines_wallet_statistics(app, client):
+    from extensions import db
+    from services.wallet_access import access_cache
+    from sqlalchemy import event
+
+    token = get_auth_token(client, "s10@example.com", "S10 User")
+    headers = {"Authorization": f"Bearer {token}"}
+    resp_create = client.post("/api/wallets", json={"name": "Wallet S10", "type": "personal"}, headers=headers)
+    wallet_id = resp_create.get_json()["wallet"]["id"]
+    for amount, category, date in [
+        (100, "Salary", "2023-01-01T12:00:00"),
+        (-40, "Food", "2023-01-15T12:00:00"),
+        (-15, "Food", "2023-02-03T12:00:00"),
+    ]:
+        client.post(f"/api/wallets/{wallet_id}/transactions", json={"amount": amount, "category": category, "date": date}, headers=headers)
+
+    connections = set()
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        connections.add(id(conn.connection.dbapi_connection))
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    access_cache.clear()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        resp = client.get(f"/api/statistics/{wallet_id}/dashboard?recent=2", headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    assert resp.status_code == 200
+    data = resp.get_json()
+
+    assert data["summary"] == client.get(f"/api/statistics/{wallet_id}/summary", headers=headers).get_json()
+    assert data["monthly"] == client.get(f"/api/statistics/{wallet_id}/monthly", headers=headers).get_json()["monthly"]
+    assert data["categories"] == client.get(f"/api/statistics/{wallet_id}/categories", headers=headers).get_json()["categories"]
+    assert [(t["amount"], t["date"]) for t in data["recent_transactions"]] == [
+        (-15.0, "2023-02-03T12:00:00"),
+        (-40.0, "2023-01-15T12:00:00"),
+    ]
+    # Access check, wallet version, then one query per part, all over the same connection.
+    assert len(statements) == 6
+    assert len(connections) == 1
+
+    other = get_auth_token(client, "s11@example.com", "S11 User")
+    resp = client.get(f"/api/statistics/{wallet_id}/dashboard", headers={"Authorization": f"Bearer {other}"})
+    assert resp.status_code == 404
+    resp = client.get(f"/api/statistics/{wallet_id}/dashboard?recent=x", headers=headers)
+    assert resp.status_code == 400
+
+
+def test_statistics_date_range_and_granularity(client):
+    token = get_auth_token(client, "s12@example.com", "S12 User")
+    headers = {"Authorization": f"Bearer {token}"}
+    resp_create = client.post("/api/wallets", json={"name": "Wallet S12", "type": "personal"}, headers=headers)
+    wallet_id = resp_create.get_json()["wallet"]["id"]
+    for amount, category, date in [
+        (100, "Salary", "2022-12-31T12:00:00"),
+        (-40, "Food", "2023-01-02T12:00:00"),
+        (-15, "Food", "2023-01-16T12:00:00"),
+        (-5, "Transport", "2023-03-10T12:00:00"),
+    ]:
+        client.post(f"/api/wallets/{wallet_id}/transactions", json={"amount": amount, "category": category, "date": date}, headers=headers)
+
+    def get(endpoint, **params):
+        resp = client.get(f"/api/statistics/{wallet_id}/{endpoint}", query_string=params, headers=headers)
+        assert resp.status_code == 200
+        return resp.get_json()
+
+    # Whole months come from the rollups; empty months are filled up to the bounds.
+    monthly = get("monthly", **{"from": "2023-01-01", "to": "2023-04-30"})["monthly"]
+    assert [(m["period"], m["total"]) for m in monthly] == [
+        ("2023-01", -55.0), ("2023-02", 0.0), ("2023-03", -5.0), ("2023-04", 0.0),
+    ]
+
+    # Partial months and finer buckets are read from the transactions.
+    weekly = get("monthly", granularity="week", **{"from": "2023-01-01", "to": "2023-01-20"})
+    assert weekly["granularity"] == "week"
+    assert [(w["period"], w["total"]) for w in weekly["monthly"]] == [
+        ("2022-12-26", 0.0), ("2023-01-02", -40.0), ("2023-01-09", 0.0), ("2023-01-16", -15.0),
+    ]
+    assert "month" not in weekly["monthly"][0]
+
+    yearly = get("monthly", granularity="year")["monthly"]
+    assert [(y["period"], y["total"]) for y in yearly] == [("2022", 100.0), ("2023", -60.0)]
+
+    categories = get("categories", **{"from": "2023-01-10", "to": "2023-12-31"})["categories"]
+    assert sorted((c["category"], c["total"]) for c in categories) == [("Food", -15.0), ("Transport", -5.0)]
+    summary = get("summary", **{"from": "2023-01-01", "to": "2023-01-31"})
+    assert summary["transaction_count"] == 2
+    assert summary["total"] == -55.0
+
+    dashboard = get("dashboard", granularity="day", **{"from": "2023-03-09", "to": "2023-03-11"})
+    assert [(d["period"], d["total"]) for d in dashboard["monthly"]] == [
+        ("2023-03-09", 0.0), ("2023-03-10", -5.0), ("2023-03-11", 0.0),
+    ]
+    assert [t["amount"] for t in dashboard["recent_transactions"]] == [-5.0]
+
+    for params in ({"granularity": "hour"}, {"from": "01/02/2023"}, {"from": "2023-02-01", "to": "2023-01-01"}):
+        resp = client.get(f"/api/statistics/{wallet_id}/monthly", query_string=params, headers=headers)
+        assert resp.status_code == 400
+
+
+def test_statistics_rollups_round_half_cents_like_the_amount_column(app, client):
+    token = get_auth_token(client, "s13@example.com", "S13 User")
+    headers = {"Authorization": f"Bearer {token}"}
+    wallet_id = client.post("/api/wallets", json={"name": "Wallet S13", "type": "personal"}, headers=headers).get_json()["wallet"]["id"]
+    for amount in (0.125, 1.005, -0.005):
+        client.post(f"/api/wallets/{wallet_id}/transactions", json={"amount": amount, "category": "Food", "date": "2023-06-01T12:00:00"}, headers=headers)
+
+    summary = client.get(f"/api/statistics/{wallet_id}/summary", headers=headers).get_json()
+    monthly = client.get(f"/api/statistics/{wallet_id}/monthly", headers=headers).get_json()["monthly"]
+    categories = client.get(f"/api/statistics/{wallet_id}/categories", headers=headers).get_json()["categories"]
+    balance = client.get("/api/wallets", headers=headers).get_json()["wallets"][0]["balance"]
+
+    assert summary["total"] == 1.13
+    assert [(m["total"], m["income"], m["expenses"]) for m in monthly] == [
+        (summary["total"], summary["income"], summary["expenses"])
+    ]
+    assert categories == [{"category": "Food", "total": summary["total"]}]
+    assert balance == summary["total"]
+    assert app.test_cli_runner().invoke(args=["rollups", "verify"]).exit_code == 0
+
+
+def test_statistics_series_are_limited_in_buckets(app, client):
+    token = get_auth_token(client, "s14@example.com", "S14 User")
+    headers = {"Authorization": f"Bearer {token}"}
+    wallet_id = client.post("/api/wallets", json={"name": "Wallet S14", "type": "personal"}, headers=headers).get_json()["wallet"]["id"]
+    for date in ("2020-01-01T12:00:00", "2023-06-01T12:00:00"):
+        client.post(f"/api/wallets/{wallet_id}/transactions", json={"amount": 1, "category": "Food", "date": date}, headers=headers)
+    app.config["STATISTICS_MAX_BUCKETS"] = 31
+
+    def get(**params):
+        return client.get(f"/api/statistics/{wallet_id}/monthly", query_string=params, headers=headers)
+
+    assert len(get(granularity="day", **{"from": "2023-01-01", "to": "2023-01-31"}).get_json()["monthly"]) == 31
+    resp = get(granularity="day", **{"from": "2023-01-01", "to": "2023-02-01"})
+    assert resp.status_code == 400
+    assert "At most 31 day buckets" in resp.get_json()["error"]
+
+    # Open ends are bounded by the data, which spans 42 months, and keep the most recent 31 buckets.
+    monthly = get(granularity="month").get_json()["monthly"]
+    assert (len(monthly), monthly[0]["period"], monthly[-1]["period"]) == (31, "2020-12", "2023-06")
+    assert (monthly[-1]["income"], monthly[-2]["income"]) == (1, 0)
+    assert [entry["period"] for entry in get(granularity="year").get_json()["monthly"]] == ["2020", "2021", "2022", "2023"]
+    daily = get(granularity="day", to="2023-01-31").get_json()["monthly"]
+    assert (len(daily), daily[0]["period"], daily[-1]["period"]) == (31, "2023-01-01", "2023-01-31")
+    resp = client.get(f"/api/statistics/{wallet_id}/dashboard", query_string={"from": "2020-01-01"}, headers=headers)
+    assert resp.status_code == 200
+    assert [resp.get_json()["monthly"][i]["month"] for i in (0, -1)] == ["2020-12", "2023-06"]
+
+
+def test_statistics_rollups_bucket_offset_dates_by_their_utc_month(app, client):
+    token = get_auth_token(client, "s15@example.com", "S15 User")
+    headers = {"Authorization": f"Bearer {token}"}
+    wallet_id = client.post("/api/wallets", json={"name": "Wallet S15", "type": "personal"}, headers=headers).get_json()["wallet"]["id"]
+
+    created = client.post(
+        f"/api/wallets/{wallet_id}/transactions",
+        json={"amount": 10, "category": "Food", "date": "2023-02-01T00:30:00+02:00"},
+        headers=headers,
+    ).get_json()["transaction"]
+    assert created["date"] == "2023-01-31T22:30:00"
+    moved = client.post(
+        f"/api/wallets/{wallet_id}/transactions",
+        json={"amount": 5, "category": "Food", "date": "2023-03-15T12:00:00"},
+        headers=headers,
+    ).get_json()["transaction"]
+    client.patch(f"/api/wallets/{wallet_id}/transactions/{moved['id']}", json={"date": "2023-03-01T01:00:00+05:00"}, headers=headers)
+    client.post(
+        "/api/ocr/confirm",
+        json={"wallet_id": wallet_id, "amount": 2, "category": "Food", "date": "2023-04-30T23:00:00-03:00"},
+        headers=headers,
+    )
+
+    monthly = client.get(f"/api/statistics/{wallet_id}/monthly", headers=headers).get_json()["monthly"]
+    assert [(m["month"], m["total"]) for m in monthly] == [("2023-01", 10.0), ("2023-02", 5.0), ("2023-03", 0.0), ("2023-04", 0.0), ("2023-05", 2.0)]
+    assert app.test_cli_runner().invoke(args=["rollups", "verify"]).exit_code == 0
+
+    client.delete(f"/api/wallets/{wallet_id}/transactions/{created['id']}", headers=headers)
+    assert app.test_cli_runner().invoke(args=["rollups", "verify"]).exit_code == 0
@@ -205,3 +205,407 @@ def test_transactions_delete_forbidden(client):
         headers={"Authorization": f"Bearer {other_token}"},
     )
     assert resp_del.status_code == 404
+
+
+def test_transactions_keyset_pagination(client):
+    token = get_auth_token(client, "t10@example.com", "T10 User")
+    headers = {"Authorization": f"Bearer {token}"}
+    resp_create = client.post("/api/wallets", json={"name": "Wallet 10", "type": "personal"}, headers=headers)
+    wallet_id = resp_create.get_json()["wallet"]["id"]
+
+    # Two rows share a date so the id tie-breaker has to keep pages stable.
+    for day, amount in ((1, 10), (2, 20), (2, 30), (3, 40), (4, 50)):
+        client.post(
+            f"/api/wallets/{wallet_id}/transactions",
+            json={"amount": amount, "category": "Food", "date": f"2023-01-0{day}T12:00:00"},
+            headers=headers,
+        )
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2, "sort_by": "date", "order": "desc"}
+        if cursor:
+            params["cursor"] = cursor
+        resp = client.get(f"/api/wallets/{wallet_id}/transactions", query_string=params, headers=headers)
+        assert resp.status_code == 200
+        body = resp.get_json()
+        assert len(body["transactions"]) <= 2
+        seen.extend(body["transactions"])
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(seen) == 5
+    assert len({t["id"] for t in seen}) == 5
+    assert [t["date"][:10] for t in seen] == ["2023-01-04", "2023-01-03", "2023-01-02", "2023-01-02", "2023-01-01"]
+
+    resp_amount = client.get(
+        f"/api/wallets/{wallet_id}/transactions",
+        query_string={"limit": 3, "sort_by": "amount", "order": "asc"},
+        headers=headers,
+    )
+    cursor = resp_amount.get_json()["next_cursor"]
+    resp_next = client.get(
+        f"/api/wallets/{wallet_id}/transactions",
+        query_string={"limit": 3, "sort_by": "amount", "order": "asc", "cursor": cursor},
+        headers=headers,
+    )
+    assert [t["amount"] for t in resp_next.get_json()["transactions"]] == [40.0, 50.0]
+    assert resp_next.get_json()["next_cursor"] is None
+
+
+def test_transactions_fields_projection_and_validation(client):
+    token = get_auth_token(client, "t11@example.com", "T11 User")
+    headers = {"Authorization": f"Bearer {token}"}
+    resp_create = client.post("/api/wallets", json={"name": "Wallet 11", "type": "personal"}, headers=headers)
+    wallet_id = resp_create.get_json()["wallet"]["id"]
+    client.post(
+        f"/api/wallets/{wallet_id}/transactions",
+        json={"amount": 12, "category": "Food", "date": "2023-01-01T12:00:00", "ocr_raw_text": "long text"},
+        headers=headers,
+    )
+
+    resp = client.get(f"/api/wallets/{wallet_id}/transactions?fields=amount,date", headers=headers)
+    assert resp.status_code == 200
+    tx = resp.get_json()["transactions"][0]
+    assert set(tx) == {"id", "amount", "date"}
+    assert tx["amount"] == 12.0
+
+    assert client.get(f"/api/wallets/{wallet_id}/transactions?fields=password", headers=headers).status_code == 400
+    assert client.get(f"/api/wallets/{wallet_id}/transactions?sort_by=description", headers=headers).status_code == 400
+    assert client.get(f"/api/wallets/{wallet_id}/transactions?cursor=not-a-cursor", headers=headers).status_code == 400
+    assert client.get(f"/api/wallets/{wallet_id}/transactions?limit=abc", headers=headers).status_code == 400
+    assert client.get(f"/api/wallets/{wallet_id}/transactions?order=newest", headers=headers).status_code == 400
+    assert client.get(f"/api/wallets/{wallet_id}/transactions?date_from=soon", headers=headers).status_code == 400
+    assert client.get(f"/api/wallets/{wallet_id}/transactions?min_amount=lots", headers=headers).status_code == 400
+
+
+def test_transaction_indexes_match_migration():
+    import importlib.util
+    from pathlib import Path
+
+    from models import Transaction
+
+    path = next(Path(__file__).parent.parent.glob("migrations/versions/*_transaction_access_indexes.py"))
+    spec = importlib.util.spec_from_file_location("transaction_access_indexes", path)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+
+    assert {name for name, _ in migration.INDEXES} == {
+        index.name for index in Transaction.__table__.indexes
+    }
+
+
+def test_ids_are_native_time_ordered_uuids(app, client):
+    from uuid import UUID
+
+    from sqlalchemy import inspect, text
+
+    from extensions import db
+
+    token = get_auth_token(client, "uuid@example.com", "UUID User")
+    headers = {"Authorization": f"Bearer {token}"}
+    wallet_id = client.post("/api/wallets", json={"name": "W", "type": "personal"}, headers=headers).get_json()["wallet"]["id"]
+    ids = [
+        client.post(
+            f"/api/wallets/{wallet_id}/transactions",
+            json={"amount": amount, "category": "Food", "date": "2023-01-01T12:00:00"},
+            headers=headers,
+        ).get_json()["transaction"]["id"]
+        for amount in (1, 2, 3)
+    ]
+
+    # The API still speaks canonical UUID strings.
+    assert all(isinstance(value, str) and str(UUID(value)) == value for value in [wallet_id] + ids)
+    assert all(UUID(value).version == 7 for value in ids)
+    assert ids == sorted(ids)
+
+    with app.app_context():
+        columns = {column["name"]: column["type"] for column in inspect(db.engine).get_columns("transactions")}
+        # psycopg2 hands uuids over as text, so reads skip the UUID round trip.
+        assert isinstance(db.session.execute(text("SELECT gen_random_uuid()")).scalar(), str)
+    assert columns["id"].python_type is UUID
+    assert columns["wallet_id"].python_type is UUID
+
+
+def _import_wallet(client, email):
+    token = get_auth_token(client, email, "Import User")
+    headers = {"Authorization": f"Bearer {token}"}
+    wallet_id = client.post("/api/wallets", json={"name": "Imports", "type": "personal"}, headers=headers).get_json()["wallet"]["id"]
+    return wallet_id, headers
+
+
+@pytest.mark.parametrize("use_copy", [True, False])
+def test_import_csv_reports_bad_rows_and_keeps_the_rest(app, client, monkeypatch, use_copy):
+    from services import transaction_import
+
+    monkeypatch.setattr(transaction_import, "_supports_copy", lambda connection: use_copy)
+    wallet_id, headers = _import_wallet(client, f"import-csv-{use_copy}@example.com")
+    body = "\n".join([
+        "Amount,Category,Date,Currency,Description",
+        '-12.50,Food,2023-01-05T12:00:00,EUR,"Lunch, with ""friends"""',
+        "100,Salary,2023-01-31,,",
+        "abc,Food,2023-01-05,,",
+        "5,,2023-01-05,,",
+        "5,Food,yesterday,,",
+        "7.255,Fun,2023-02-01T10:00:00+02:00,HUF,",
+    ])
+
+    resp = client.post(
+        f"/api/wallets/{wallet_id}/transactions/import",
+        data=body,
+        content_type="text/csv",
+        headers=headers,
+    )
+    assert resp.status_code == 201
+    summary = resp.get_json()
+    assert summary["imported"] == 3
+    assert summary["failed"] == 3
+    assert summary["method"] == ("copy" if use_copy else "insert")
+    assert summary["errors"] == [
+        {"line": 4, "error": "amount must be a number"},
+        {"line": 5, "error": "category is required"},
+        {"line": 6, "error": "date must be ISO 8601"},
+    ]
+
+    listed = client.get(f"/api/wallets/{wallet_id}/transactions?sort_by=amount&order=asc", headers=headers).get_json()["transactions"]
+    assert [(t["amount"], t["category"], t["currency"]) for t in listed] == [
+        (-12.5, "Food", "EUR"),
+        (7.26, "Fun", "HUF"),
+        (100.0, "Salary", "HUF"),
+    ]
+    assert listed[0]["description"] == 'Lunch, with "friends"'
+    assert listed[1]["date"] == "2023-02-01T08:00:00"
+    assert listed[2]["description"] is None
+
+    summary = client.get(f"/api/statistics/{wallet_id}/summary", headers=headers).get_json()
+    assert summary["total"] == 94.76
+    assert summary["transaction_count"] == 3
+
+
+def test_import_ndjson_multipart_and_format_errors(client):
+    import io
+
+    wallet_id, headers = _import_wallet(client, "import-ndjson@example.com")
+    url = f"/api/wallets/{wallet_id}/transactions/import"
+    lines = [
+        '{"amount": 10, "category": "Food", "date": "2023-03-01"}',
+        "",
+        "not json",
+        '[1, 2]',
+        '{"amount": 20, "category": "Bills", "date": "2023-03-02", "merchant_name": "Power Co"}',
+    ]
+    resp = client.post(
+        url,
+        data={"file": (io.BytesIO("\n".join(lines).encode()), "export.ndjson")},
+        content_type="multipart/form-data",
+        headers=headers,
+    )
+    assert resp.status_code == 201
+    assert resp.get_json()["imported"] == 2
+    assert resp.get_json()["errors"] == [
+        {"line": 3, "error": "invalid JSON"},
+        {"line": 4, "error": "row must be an object"},
+    ]
+
+    assert client.post(url, data="x", content_type="application/xml", headers=headers).status_code == 415
+    missing = client.post(url, data="amount,date\n1,2023-01-01", content_type="text/csv", headers=headers)
+    assert missing.status_code == 400
+    assert "category" in missing.get_json()["error"]
+    latin1 = client.post(url, data="amount,category,date\n1,Étel,2023-01-01".encode("latin-1"), content_type="text/csv", headers=headers)
+    assert latin1.status_code == 400
+
+    # Rejected imports leave nothing behind.
+    listed = client.get(f"/api/wallets/{wallet_id}/transactions", headers=headers).get_json()["transactions"]
+    assert len(listed) == 2
+
+    _, other_headers = _import_wallet(client, "import-other@example.com")
+    assert client.post(url, data="amount,category,date\n1,Food,2023-01-01", content_type="text/csv", headers=other_headers).status_code == 404
+
+
+def test_export_streams_csv_and_ndjson_with_filters(client, monkeypatch):
+    import csv
+    import io
+    import json
+
+    import routes.transactions as transactions_routes
+
+    # Small batches and chunks so the export spans several cursor fetches and writes.
+    monkeypatch.setattr(transactions_routes, "EXPORT_BATCH_SIZE", 2)
+    monkeypatch.setattr(transactions_routes, "EXPORT_CHUNK_BYTES", 64)
+
+    wallet_id, headers = _import_wallet(client, "export@example.com")
+    rows = "\n".join(
+        ["amount,category,date,description"]
+        + [f"{i}.25,{'Food' if i % 2 else 'Bills'},2023-01-{i:02d}T08:00:00,\"Row, {i}\"" for i in range(1, 8)]
+    )
+    client.post(f"/api/wallets/{wallet_id}/transactions/import", data=rows, content_type="text/csv", headers=headers)
+    url = f"/api/wallets/{wallet_id}/transactions/export"
+
+    resp = client.get(url, headers=headers)
+    assert resp.status_code == 200
+    assert resp.is_streamed
+    assert resp.mimetype == "text/csv"
+    assert "attachment" in resp.headers["Content-Disposition"]
+    exported = list(csv.DictReader(io.StringIO(resp.get_data(as_text=True))))
+    assert [row["amount"] for row in exported] == [f"{i}.25" for i in range(1, 8)]
+    assert exported[0]["date"] == "2023-01-01T08:00:00"
+    assert exported[0]["description"] == "Row, 1"
+
+    # The CSV export is accepted back by the import endpoint.
+    other_wallet = client.post("/api/wallets", json={"name": "Copy", "type": "personal"}, headers=headers).get_json()["wallet"]["id"]
+    reimport = client.post(
+        f"/api/wallets/{other_wallet}/transactions/import", data=resp.get_data(), content_type="text/csv", headers=headers
+    )
+    assert reimport.get_json()["imported"] == 7
+
+    resp = client.get(f"{url}?format=ndjson&category=Food&fields=amount,date", headers=headers)
+    assert resp.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    assert lines == [
+        {"id": line["id"], "amount": amount, "date": f"2023-01-{day:02d}T08:00:00"}
+        for line, (day, amount) in zip(lines, [(1, 1.25), (3, 3.25), (5, 5.25), (7, 7.25)])
+    ]
+
+    assert client.get(f"{url}?format=xml", headers=headers).status_code == 400
+    assert client.get(f"{url}?date_from=soon", headers=headers).status_code == 400
+    assert client.get(f"{url}?fields=password", headers=headers).status_code == 400
+    _, other_headers = _import_wallet(client, "export-other@example.com")
+    assert client.get(url, headers=other_headers).status_code == 404
+
+
+def test_batch_operations_apply_once_and_report_per_operation(app, client):
+    from sqlalchemy import event
+
+    from extensions import db
+
+    owner_token = get_auth_token(client, "batch-owner@example.com", "Batch Owner")
+    member_token = get_auth_token(client, "batch-member@example.com", "Batch Member")
+    headers = {"Authorization": f"Bearer {owner_token}"}
+    member_headers = {"Authorization": f"Bearer {member_token}"}
+    wallet_id = client.post("/api/wallets", json={"name": "Batch", "type": "group"}, headers=headers).get_json()["wallet"]["id"]
+    client.post(f"/api/wallets/{wallet_id}/members", json={"email": "batch-member@example.com"}, headers=headers)
+    invitation_id = client.get("/api/wallets/invitations", headers=member_headers).get_json()["invitations"][0]["id"]
+    client.post(f"/api/wallets/invitations/{invitation_id}/accept", headers=member_headers)
+
+    def create(amount, token_headers=headers):
+        return client.post(
+            f"/api/wallets/{wallet_id}/transactions",
+            json={"amount": amount, "category": "Food", "date": "2023-01-01T12:00:00"},
+            headers=token_headers,
+        ).get_json()["transaction"]["id"]
+
+    keep, edit, remove = create(10), create(20), create(30)
+    members_row = create(40, member_headers)
+    other_wallet = client.post("/api/wallets", json={"name": "Other", "type": "personal"}, headers=headers).get_json()["wallet"]["id"]
+    foreign_row = client.post(
+        f"/api/wallets/{other_wallet}/transactions",
+        json={"amount": 1, "category": "Food", "date": "2023-01-01T12:00:00"},
+        headers=headers,
+    ).get_json()["transaction"]["id"]
+
+    operations = [
+        {"op": "create", "data": {"amount": "5.5", "category": "Fun", "date": "2023-02-01T09:00:00", "description": "new"}},
+        {"op": "update", "id": edit, "data": {"amount": -20, "category": "Bills"}},
+        {"op": "delete", "id": remove},
+        {"op": "delete", "id": members_row},
+        {"op": "update", "id": foreign_row, "data": {"amount": 2}},
+        {"op": "delete", "id": edit},
+        {"op": "create", "data": {"amount": 1, "date": "2023-02-01"}},
+        {"op": "update", "id": keep, "data": {"date": "not a date"}},
+        {"op": "upsert"},
+    ]
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        resp = client.post(f"/api/wallets/{wallet_id}/transactions/batch", json={"operations": operations}, headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    assert resp.status_code == 200
+    results = resp.get_json()["results"]
+
+    assert [result["status"] for result in results] == [201, 200, 200, 403, 404, 400, 400, 400, 400]
+    assert results[0]["transaction"]["description"] == "new"
+    assert results[0]["transaction"]["amount"] == 5.5
+    assert results[1]["transaction"]["amount"] == -20.0
+    assert results[1]["transaction"]["category"] == "Bills"
+    assert results[2] == {"status": 200, "id": remove, "deleted": True}
+    assert results[5]["error"] == "Transaction already changed earlier in this batch"
+    assert results[6]["error"] == "category is required"
+    assert results[7]["error"] == "date must be ISO 8601"
+
+    # One load, one statement per kind of write, and no per-row round trips.
+    assert sum(statement.lstrip().upper().startswith("SELECT") for statement in statements) <= 3
+    assert sum(statement.lstrip().upper().startswith("DELETE FROM TRANSACTIONS") for statement in statements) == 1
+
+    listed = client.get(f"/api/wallets/{wallet_id}/transactions?sort_by=amount&order=asc", headers=headers).get_json()["transactions"]
+    assert sorted(t["amount"] for t in listed) == [-20.0, 5.5, 10.0, 40.0]
+    summary = client.get(f"/api/statistics/{wallet_id}/summary", headers=headers).get_json()
+    assert summary["total"] == 35.5
+    assert summary["transaction_count"] == 4
+
+    url = f"/api/wallets/{wallet_id}/transactions/batch"
+    assert client.post(url, json={"operations": []}, headers=headers).status_code == 400
+    assert client.post(url, json={"operations": [{"op": "delete", "id": keep}] * 501}, headers=headers).status_code == 400
+    assert client.post(f"/api/wallets/{other_wallet}/transactions/batch", json={"operations": [{"op": "delete", "id": keep}]}, headers=member_headers).status_code == 404
+
+
+def test_batch_rejects_malformed_operations_per_operation(client):
+    token = get_auth_token(client, "batch-malformed@example.com", "Batch Malformed")
+    headers = {"Authorization": f"Bearer {token}"}
+    wallet_id = client.post("/api/wallets", json={"name": "Batch", "type": "personal"}, headers=headers).get_json()["wallet"]["id"]
+    row = {"amount": 1, "category": "Food", "date": "2023-01-01T12:00:00"}
+
+    operations = [
+        {"op": "delete", "id": ["not", "a", "string"]},
+        {"op": "update", "id": {"id": "x"}, "data": {"amount": 2}},
+        {"op": "create", "data": {**row, "original_image_url": "https://example.com/" + "x" * 300}},
+        {"op": "create", "data": {**row, "ocr_raw_text": {"lines": []}}},
+        {"op": "create", "data": {**row, "original_image_url": "https://example.com/r.jpg", "ocr_raw_text": "TOTAL 1"}},
+    ]
+    resp = client.post(f"/api/wallets/{wallet_id}/transactions/batch", json={"operations": operations}, headers=headers)
+    assert resp.status_code == 200
+    results = resp.get_json()["results"]
+
+    assert [result["status"] for result in results] == [404, 404, 400, 400, 201]
+    assert results[2]["error"] == "original_image_url is longer than 255 characters"
+    assert results[3]["error"] == "ocr_raw_text must be a string"
+    assert results[4]["transaction"]["original_image_url"] == "https://example.com/r.jpg"
+    assert results[4]["transaction"]["ocr_raw_text"] == "TOTAL 1"
+
+
+def test_batch_matches_ids_in_any_uuid_spelling(client):
+    token = get_auth_token(client, "batch-case@example.com", "Batch Case")
+    headers = {"Authorization": f"Bearer {token}"}
+    wallet_id = client.post("/api/wallets", json={"name": "Batch", "type": "personal"}, headers=headers).get_json()["wallet"]["id"]
+    row = {"amount": 1, "category": "Food", "date": "2023-01-01T12:00:00"}
+    edit, remove = (
+        client.post(f"/api/wallets/{wallet_id}/transactions", json=row, headers=headers).get_json()["transaction"]["id"]
+        for _ in range(2)
+    )
+
+    operations = [
+        {"op": "update", "id": edit.upper(), "data": {"amount": 2}},
+        {"op": "delete", "id": "{" + remove.replace("-", "") + "}"},
+        {"op": "delete", "id": "not-a-uuid"},
+    ]
+    resp = client.post(
+        f"/api/wallets/{wallet_id.upper()}/transactions/batch", json={"operations": operations}, headers=headers
+    )
+    assert resp.status_code == 200
+    results = resp.get_json()["results"]
+
+    assert [result["status"] for result in results] == [200, 200, 404]
+    assert results[0]["id"] == edit
+    assert results[0]["transaction"]["amount"] == 2.0
+    assert results[1] == {"status": 200, "id": remove, "deleted": True}
+    listed = client.get(f"/api/wallets/{wallet_id}/transactions", headers=headers).get_json()["transactions"]
+    assert [t["id"] for t in listed] == [edit]
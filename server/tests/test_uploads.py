@@ -0,0 +1,78 @@
+import io
+
+import pytest
+
+from ocr.uploads import MappedUpload, open_receipt, save_upload
+
+
+class FailingStream(io.BytesIO):
+    def read(self, size=-1):
+        if self.tell() > 0:
+            raise ConnectionError("client went away")
+        return super().read(size)
+
+
+def test_save_upload_hashes_and_renames_into_place(tmp_path):
+    target = tmp_path / "receipt.jpg"
+
+    digest, size = save_upload(io.BytesIO(b"x" * 200_000), str(target))
+
+    assert size == 200_000
+    assert len(digest) == 64
+    assert target.read_bytes() == b"x" * 200_000
+    assert [p.name for p in tmp_path.iterdir()] == ["receipt.jpg"]
+
+
+def test_save_upload_leaves_nothing_behind_on_failure(tmp_path):
+    with pytest.raises(ConnectionError):
+        save_upload(FailingStream(b"y" * 200_000), str(tmp_path / "receipt.jpg"))
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_mapped_upload_readers_are_independent(tmp_path):
+    path = tmp_path / "receipt.png"
+    path.write_bytes(b"0123456789")
+
+    with MappedUpload(str(path)) as upload:
+        first, second = upload.reader(), upload.reader()
+        assert first.read(4) == b"0123"
+        assert second.read() == b"0123456789"
+        assert first.read() == b"456789"
+        first.seek(-2, io.SEEK_END)
+        assert first.read() == b"89"
+
+    assert upload.closed
+
+
+def test_mapped_upload_stays_open_while_held(tmp_path):
+    path = tmp_path / "receipt.jpg"
+    path.write_bytes(b"data")
+
+    with MappedUpload(str(path)) as upload:
+        upload.acquire()
+    assert not upload.closed
+    with open_receipt(upload) as f:
+        assert f.read() == b"data"
+
+    upload.release()
+    assert upload.closed
+    with pytest.raises(ValueError):
+        upload.acquire()
+
+
+def test_mapped_upload_handles_empty_files(tmp_path):
+    path = tmp_path / "empty.jpg"
+    path.write_bytes(b"")
+
+    with MappedUpload(str(path)) as upload:
+        with open_receipt(upload) as f:
+            assert f.read() == b""
+
+
+def test_open_receipt_accepts_paths(tmp_path):
+    path = tmp_path / "receipt.jpg"
+    path.write_bytes(b"data")
+
+    with open_receipt(str(path)) as f:
+        assert f.read() == b"data"
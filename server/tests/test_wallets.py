@@ -256,3 +256,310 @@ def test_wallets_remove_member_self_and_owner_block(client):
         headers={"Authorization": f"Bearer {owner_token}"},
     )
     assert resp_owner_leave.status_code == 400
+
+
+def test_wallets_list_query_count_is_constant(app, client):
+    from sqlalchemy import event
+
+    from extensions import db
+
+    owner_token = get_auth_token(client, "w20_owner@example.com", "W20 Owner")
+    member_token = get_auth_token(client, "w20_member@example.com", "W20 Member")
+    headers = {"Authorization": f"Bearer {owner_token}"}
+
+    def create_wallet_with_transactions(name, wallet_type, amounts):
+        resp = client.post("/api/wallets", json={"name": name, "type": wallet_type}, headers=headers)
+        wallet_id = resp.get_json()["wallet"]["id"]
+        for amount in amounts:
+            client.post(
+                f"/api/wallets/{wallet_id}/transactions",
+                json={"amount": amount, "category": "Food", "date": "2023-01-01T12:00:00"},
+                headers=headers,
+            )
+        return wallet_id
+
+    def count_list_queries():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            resp = client.get("/api/wallets", headers=headers)
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+        assert resp.status_code == 200
+        return len(statements), resp.get_json()["wallets"]
+
+    group_id = create_wallet_with_transactions("Group", "group", [100, -25.5])
+    client.post(f"/api/wallets/{group_id}/members", json={"email": "w20_member@example.com"}, headers=headers)
+    invitation_id = client.get(
+        "/api/wallets/invitations", headers={"Authorization": f"Bearer {member_token}"}
+    ).get_json()["invitations"][0]["id"]
+    client.post(
+        f"/api/wallets/invitations/{invitation_id}/accept",
+        headers={"Authorization": f"Bearer {member_token}"},
+    )
+
+    baseline_count, wallets = count_list_queries()
+    assert len(wallets) == 1
+    assert wallets[0]["balance"] == 74.5
+    assert wallets[0]["member_count"] == 2
+
+    for i in range(3):
+        create_wallet_with_transactions(f"Personal {i}", "personal", [10, 20, -5])
+
+    query_count, wallets = count_list_queries()
+    assert query_count == baseline_count
+    assert [w["name"] for w in wallets][0] == "Group"
+    assert [w["balance"] for w in wallets[1:]] == [25.0, 25.0, 25.0]
+    assert all(w["is_owner"] for w in wallets)
+
+    member_wallets = client.get(
+        "/api/wallets", headers={"Authorization": f"Bearer {member_token}"}
+    ).get_json()["wallets"]
+    assert [(w["name"], w["is_owner"], w["balance"]) for w in member_wallets] == [("Group", False, 74.5)]
+
+
+def test_wallet_access_is_cached_and_invalidated_on_membership_changes(app, client):
+    from sqlalchemy import event
+
+    from extensions import db
+
+    owner_token = get_auth_token(client, "w21_owner@example.com", "W21 Owner")
+    member_token = get_auth_token(client, "w21_member@example.com", "W21 Member")
+    owner_headers = {"Authorization": f"Bearer {owner_token}"}
+    member_headers = {"Authorization": f"Bearer {member_token}"}
+
+    wallet_id = client.post(
+        "/api/wallets", json={"name": "W21 Group", "type": "group"}, headers=owner_headers
+    ).get_json()["wallet"]["id"]
+    summary_url = f"/api/statistics/{wallet_id}/summary"
+
+    # A miss is not cached, so accepting the invitation grants access at once.
+    assert client.get(summary_url, headers=member_headers).status_code == 404
+    client.post(f"/api/wallets/{wallet_id}/members", json={"email": "w21_member@example.com"}, headers=owner_headers)
+    invitation_id = client.get("/api/wallets/invitations", headers=member_headers).get_json()["invitations"][0]["id"]
+    client.post(f"/api/wallets/invitations/{invitation_id}/accept", headers=member_headers)
+    assert client.get(summary_url, headers=member_headers).status_code == 200
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        assert client.get(summary_url, headers=member_headers).status_code == 200
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    assert not any("wallet_members" in statement for statement in statements)
+
+    member_id = client.get("/api/auth/me", headers=member_headers).get_json()["user"]["id"]
+    resp = client.delete(f"/api/wallets/{wallet_id}/members/{member_id}", headers=owner_headers)
+    assert resp.status_code == 200
+    assert client.get(summary_url, headers=member_headers).status_code == 404
+
+
+def test_wallet_writes_recheck_access_revoked_by_another_process(app, client):
+    from extensions import db
+    from models import WalletMember
+
+    owner_token = get_auth_token(client, "w24_owner@example.com", "W24 Owner")
+    member_token = get_auth_token(client, "w24_member@example.com", "W24 Member")
+    owner_headers = {"Authorization": f"Bearer {owner_token}"}
+    member_headers = {"Authorization": f"Bearer {member_token}"}
+
+    wallet_id = client.post(
+        "/api/wallets", json={"name": "W24 Group", "type": "group"}, headers=owner_headers
+    ).get_json()["wallet"]["id"]
+    client.post(f"/api/wallets/{wallet_id}/members", json={"email": "w24_member@example.com"}, headers=owner_headers)
+    invitation_id = client.get("/api/wallets/invitations", headers=member_headers).get_json()["invitations"][0]["id"]
+    client.post(f"/api/wallets/invitations/{invitation_id}/accept", headers=member_headers)
+    transactions_url = f"/api/wallets/{wallet_id}/transactions"
+    assert client.get(transactions_url, headers=member_headers).status_code == 200
+
+    # Removed by another worker: this process's cache still holds the grant.
+    member_id = client.get("/api/auth/me", headers=member_headers).get_json()["user"]["id"]
+    with app.app_context():
+        WalletMember.query.filter_by(wallet_id=wallet_id, user_id=member_id).delete()
+        db.session.commit()
+
+    resp = client.post(
+        transactions_url,
+        json={"amount": -5, "category": "Food", "date": "2024-01-05T10:00:00"},
+        headers=member_headers,
+    )
+    assert resp.status_code == 404
+    assert client.get(transactions_url, headers=member_headers).status_code == 404
+
+
+def test_wallet_access_cache_expires_grants():
+    from services.wallet_access import WalletAccessCache
+
+    now = [0.0]
+    cache = WalletAccessCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    cache.put("w1", "u1", "owner")
+    cache.put("w1", "u2", "member")
+    assert cache.get("w1", "u1") == "owner"
+
+    now[0] = 10.5
+    assert cache.get("w1", "u1") is None
+
+    cache.put("w2", "u1", "owner")
+    cache.put("w3", "u1", "member")
+    cache.invalidate("w2")
+    assert cache.get("w2", "u1") is None
+    assert cache.get("w3", "u1") == "member"
+
+
+def test_list_invitations_uses_constant_queries_and_pages(app, client):
+    from sqlalchemy import event
+
+    from extensions import db
+
+    member_token = get_auth_token(client, "w22_member@example.com", "W22 Member")
+    member_headers = {"Authorization": f"Bearer {member_token}"}
+
+    def invite_from_new_owner(index):
+        owner_token = get_auth_token(client, f"w22_owner{index}@example.com", f"W22 Owner {index}")
+        headers = {"Authorization": f"Bearer {owner_token}"}
+        wallet_id = client.post(
+            "/api/wallets", json={"name": f"W22 Group {index}", "type": "group"}, headers=headers
+        ).get_json()["wallet"]["id"]
+        client.post(f"/api/wallets/{wallet_id}/members", json={"email": "w22_member@example.com"}, headers=headers)
+
+    def count_list_queries(url):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            resp = client.get(url, headers=member_headers)
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+        assert resp.status_code == 200
+        return len(statements), resp.get_json()
+
+    invite_from_new_owner(0)
+    baseline_count, data = count_list_queries("/api/wallets/invitations")
+    assert len(data["invitations"]) == 1
+
+    for index in range(1, 5):
+        invite_from_new_owner(index)
+    query_count, data = count_list_queries("/api/wallets/invitations")
+    assert query_count == baseline_count
+    assert [i["wallet"]["name"] for i in data["invitations"]] == [f"W22 Group {i}" for i in range(4, -1, -1)]
+    assert data["invitations"][0]["invited_by"]["email"] == "w22_owner4@example.com"
+    assert data["next_cursor"] is None
+
+    names = []
+    url = "/api/wallets/invitations?limit=2"
+    while url:
+        page = client.get(url, headers=member_headers).get_json()
+        assert len(page["invitations"]) <= 2
+        names += [i["wallet"]["name"] for i in page["invitations"]]
+        url = page["next_cursor"] and f"/api/wallets/invitations?limit=2&cursor={page['next_cursor']}"
+    assert names == [f"W22 Group {i}" for i in range(4, -1, -1)]
+
+    assert client.get("/api/wallets/invitations?status=accepted", headers=member_headers).get_json()["invitations"] == []
+    assert client.get("/api/wallets/invitations?cursor=bogus", headers=member_headers).status_code == 400
+    assert client.get("/api/wallets/invitations?limit=0", headers=member_headers).status_code == 400
+
+
+def test_wallet_reads_answer_304_until_the_wallet_changes(app, client):
+    from sqlalchemy import event
+
+    from extensions import db
+
+    owner_token = get_auth_token(client, "w30_owner@example.com", "W30 Owner")
+    member_token = get_auth_token(client, "w30_member@example.com", "W30 Member")
+    owner_headers = {"Authorization": f"Bearer {owner_token}"}
+    member_headers = {"Authorization": f"Bearer {member_token}"}
+    wallet_id = client.post(
+        "/api/wallets", json={"name": "W30 Group", "type": "group"}, headers=owner_headers
+    ).get_json()["wallet"]["id"]
+    urls = [
+        f"/api/wallets/{wallet_id}",
+        f"/api/wallets/{wallet_id}/members",
+        f"/api/wallets/{wallet_id}/transactions",
+        f"/api/wallets/{wallet_id}/transactions/export?format=ndjson",
+        f"/api/statistics/{wallet_id}/summary",
+        f"/api/statistics/{wallet_id}/monthly",
+        f"/api/statistics/{wallet_id}/categories",
+        f"/api/statistics/{wallet_id}/dashboard",
+    ]
+
+    def etags():
+        tags = {}
+        for url in urls:
+            resp = client.get(url, headers=owner_headers)
+            assert resp.status_code == 200
+            assert resp.headers["Cache-Control"] == "private, no-cache"
+            tags[url] = resp.headers["ETag"]
+        return tags
+
+    def assert_all_changed(before):
+        after = etags()
+        assert all(after[url] != before[url] for url in urls)
+        return after
+
+    tags = etags()
+    assert len(set(tags.values())) == len(urls)
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        for url in urls:
+            resp = client.get(url, headers={**owner_headers, "If-None-Match": tags[url]})
+            assert resp.status_code == 304
+            assert resp.headers["ETag"] == tags[url]
+            assert resp.data == b""
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    # Only the version lookup runs; the access check is cached.
+    assert len(statements) == len(urls)
+    assert not any("transactions" in statement for statement in statements)
+
+    # Tags are per user, so another member's cached copy never matches.
+    client.post(f"/api/wallets/{wallet_id}/members", json={"email": "w30_member@example.com"}, headers=owner_headers)
+    assert etags() == tags
+    invitation_id = client.get("/api/wallets/invitations", headers=member_headers).get_json()["invitations"][0]["id"]
+    client.post(f"/api/wallets/invitations/{invitation_id}/accept", headers=member_headers)
+    tags = assert_all_changed(tags)
+    resp = client.get(urls[0], headers={**member_headers, "If-None-Match": tags[urls[0]]})
+    assert resp.status_code == 200
+
+    tx_id = client.post(
+        f"/api/wallets/{wallet_id}/transactions",
+        json={"amount": -20, "category": "Food", "date": "2023-01-01T12:00:00"},
+        headers=owner_headers,
+    ).get_json()["transaction"]["id"]
+    tags = assert_all_changed(tags)
+    client.patch(f"/api/wallets/{wallet_id}/transactions/{tx_id}", json={"amount": -25}, headers=owner_headers)
+    tags = assert_all_changed(tags)
+    client.delete(f"/api/wallets/{wallet_id}/transactions/{tx_id}", headers=owner_headers)
+    tags = assert_all_changed(tags)
+    client.patch(f"/api/wallets/{wallet_id}", json={"name": "W30 Renamed"}, headers=owner_headers)
+    tags = assert_all_changed(tags)
+
+    member_id = client.get("/api/auth/me", headers=member_headers).get_json()["user"]["id"]
+    client.delete(f"/api/wallets/{wallet_id}/members/{member_id}", headers=owner_headers)
+    assert_all_changed(tags)
+    resp = client.get(urls[0], headers={**member_headers, "If-None-Match": tags[urls[0]]})
+    assert resp.status_code == 404